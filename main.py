@@ -3,59 +3,102 @@ Financial Report Analyzer - Main Pipeline
 Usage:
   python main.py AAPL                    # Nur Finanzkennzahlen
   python main.py AAPL --full-analysis    # + AI-Risikoanalyse (FinBERT + Keywords + Report)
+  python main.py AAPL --offline          # Lokales Filing, unveränderte Stufen aus dem Cache
+  python main.py ingest --companyfacts companyfacts.zip --ticker-map company_tickers.json
+                                         # Kennzahlen aus SEC-Bulk-Archiven in den Metrics-Store
+  python main.py catalog --year 2024 --plan
+                                         # EDGAR-Index → 10-K-Katalog → Batches für Backfill
+  python main.py batch AAPL MSFT NVDA --full-analysis
+                                         # Viele Filings, Download/Parsing/FinBERT überlappend
+  python main.py queue put AAPL MSFT --queue dir:/mnt/shared/queue
+  python main.py worker --queue dir:/mnt/shared/queue
+                                         # Backfill verteilt auf mehrere Prozesse/Rechner
+  python main.py calibrate               # FinBERT-Replikate × Threads für diesen Rechner messen
+  python main.py categories refine AAPL MSFT
+                                         # Semantische Kategorie-Zentroiden verfeinern (eigener Schritt)
+  python main.py serve --port 8765       # Lokaler HTTP-Dienst (FinBERT bleibt geladen)
+  python main.py watch --ticker-map company_tickers.json --tickers AAPL MSFT --full-analysis
+                                         # Neue 10-Ks aus dem EDGAR-Feed laufend analysieren
+  python main.py store compress --train-dictionary
+                                         # Rohdaten zstd-komprimieren (Leser dekomprimieren transparent)
+  python main.py AAPL --offline --no-cache --profile
+  python main.py profile compare alt.json neu.json
+                                         # cProfile + tracemalloc je Stufe, zwei Läufe vergleichen
 """
 
 import sys
+import json
 import argparse
+from datetime import datetime
 from pathlib import Path
-import numpy as np
 
 # Phase 1: Immer benötigt
-from src.scrapers.sec_downloader import SECDownloader
-from src.analyzers.unified_extractor import UnifiedExtractor as FinancialExtractor
-from src.utils.data_storage import DataStorage
+from src.utils.stage_cache import StageCache
+from src.utils.parser_backend import BACKENDS, DEFAULT_BACKEND
+from src.pipeline.filing_pipeline import (
+    find_filing_file, extract_metrics, extract_risk_paragraphs, sentiment_inputs, risk_metadata
+)
 
+# Zentroiden der semantischen Risikokategorien (--semantic-categories)
+CATEGORY_CENTROIDS_PATH = Path("data/processed/category_centroids.npz")
+# Kandidaten-Absätze für --adaptive (statt der festen 30)
+ADAPTIVE_MAX_PARAGRAPHS = 200
 
-def analyze_financials(ticker: str, company_name: str, email: str):
-    """Extrahiert und speichert Finanzkennzahlen aus dem 10-K."""
+
+def analyze_financials(ticker: str, company_name: str, email: str,
+                       cache: StageCache = None, offline: bool = False, num_filings: int = 1,
+                       parser: str = DEFAULT_BACKEND, output_format: str = "csv", compress: bool = False):
+    """Extrahiert und speichert Finanzkennzahlen aus dem 10-K (CSV oder Parquet).
+
+    Returns:
+        (filing_path, metrics) – filing_path ist None, wenn nichts gefunden wurde.
+    """
     ticker = ticker.upper()
+    cache = cache or StageCache()
     print(f"\n{'='*80}")
     print(f"FINANCIAL METRICS ANALYSIS: {ticker}")
     print(f"{'='*80}\n")
 
     try:
-        downloader = SECDownloader(company_name, email)
-        filing_paths = downloader.download_10k(ticker, num_filings=1)
+        from src.scrapers.sec_downloader import SECDownloader
+        from src.utils.data_storage import DataStorage
+
+        downloader = SECDownloader(company_name, email, compress=compress)
+        if offline:
+            filing_paths = downloader.find_local_10k(ticker, num_filings=num_filings)
+            print(f"Offline-Modus: {len(filing_paths)} lokale Filing(s) gefunden")
+        else:
+            with cache.profile("download"):
+                filing_paths = downloader.download_10k(ticker, num_filings=num_filings)
 
         if not filing_paths:
             print(f"Keine 10-K gefunden für {ticker}")
-            return None
-
-        filing_folder = Path(filing_paths[0])
-        filing_path = None
+            return None, {}
 
         # Flexibel: unterstützt .txt, .html, .htm
-        for pattern in ["full-submission.txt", "*.html", "*.htm"]:
-            matches = list(filing_folder.glob(pattern))
-            if matches:
-                filing_path = matches[0]
-                break
+        filing_path = find_filing_file(Path(filing_paths[0]))
 
         if not filing_path or not filing_path.exists():
             print("Fehler: Keine lesbare Filing-Datei gefunden.")
-            return None
+            return None, {}
 
         print(f"Analysiere: {filing_path.name}")
 
-        extractor = FinancialExtractor(filing_path)
-        metrics = extractor.get_clean_metrics()
+        metrics, metrics_hash = extract_metrics(filing_path, cache, parser)
 
         if not metrics:
             print("Keine Finanzkennzahlen extrahiert – möglicherweise ungewöhnliches Format.")
-            return filing_path  # trotzdem weiter, falls Risikoanalyse gewünscht
+            return filing_path, {}  # trotzdem weiter, falls Risikoanalyse gewünscht
 
+        # Datei nur neu schreiben, wenn sich die Kennzahlen geändert haben
         storage = DataStorage()
-        csv_path = storage.save_metrics(ticker, metrics)
+        csv_path = storage.metrics_path(ticker, output_format)
+        persist_key = cache.stage_key("metrics_csv", "1", {"metrics": metrics_hash, "path": str(csv_path)})
+        if cache.get("metrics_csv", persist_key) and csv_path.exists():
+            print("Kennzahlen unverändert – Datei wird nicht überschrieben")
+        else:
+            csv_path = storage.save_metrics(ticker, metrics, output_format)
+            cache.put("metrics_csv", persist_key, str(csv_path))
 
         # Zusammenfassung
         latest_sales = metrics.get("net_sales", [None])[0]
@@ -69,61 +112,196 @@ def analyze_financials(ticker: str, company_name: str, email: str):
         print(f"Latest Revenue     : {fmt(latest_sales)}")
         print(f"Latest Net Income  : {fmt(latest_income)}")
         print(f"Latest Total Assets: {fmt(latest_assets)}")
-        print(f"\nCSV gespeichert → {csv_path}")
+        print(f"\n{output_format.upper()} gespeichert → {csv_path}")
 
-        return filing_path
+        return filing_path, metrics
 
     except Exception as e:
         print(f"Fehler bei der Finanzanalyse: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        return None, {}
+
 
+def analyze_risks(ticker: str, filing_path: Path, metrics: dict = None, cache: StageCache = None,
+                  previous_filing_path: Path = None, parser: str = DEFAULT_BACKEND,
+                  semantic_categories: bool = False, adaptive=None, scan_document: bool = False):
+    """Führt die komplette AI-Risikoanalyse durch.
 
-def analyze_risks(ticker: str, filing_path: Path):
-    """Führt die komplette AI-Risikoanalyse durch."""
+    Jede Stufe wird über den StageCache ausgeführt: nur Stufen, deren Eingaben
+    (Filing, Modell, Keyword-Liste) sich geändert haben, werden neu berechnet.
+    Mit previous_filing_path werden die Risikofaktoren mit dem Vorjahres-10-K
+    verglichen und nur neue/geänderte Absätze durch FinBERT geschickt.
+    Mit semantic_categories wird jeder Absatz zusätzlich über sein FinBERT-Embedding
+    der nächstgelegenen Keyword-Kategorie zugeordnet (EmbeddingCategorizer).
+    Mit adaptive (AdaptiveScorer) werden Absätze nach Keyword-Dichte bewertet, bis
+    der Risikoscore konvergiert ist oder das Token-Budget aufgebraucht ist.
+    Mit scan_document werden Keywords im gesamten 10-K gezählt (je Item-Abschnitt).
+    """
+    cache = cache or StageCache()
     print(f"\n{'='*80}")
     print(f"AI-POWERED RISK ANALYSIS: {ticker}")
     print(f"{'='*80}\n")
 
     try:
         # Lazy Import – Modelle nur laden, wenn wirklich benötigt!
-        from src.analyzers.risk_extractor import RiskExtractor
         from src.analyzers.sentiment_analyzer import SentimentAnalyzer
         from src.analyzers.keyword_scanner import KeywordScanner
         from src.analyzers.risk_reporter import RiskReporter
+        from src.analyzers.peer_scoring import PeerRiskStore
+
+        filing_hash = StageCache.hash_file(filing_path)
 
         print("Schritt 1/4: Extrahiere Risikoabschnitte aus dem 10-K...")
-        risk_extractor = RiskExtractor(filing_path)
-        risk_paragraphs = risk_extractor.extract_risk_paragraphs(max_paragraphs=30)
+        extraction, paragraphs_hash = extract_risk_paragraphs(
+            filing_path, cache, parser, max_paragraphs=ADAPTIVE_MAX_PARAGRAPHS if adaptive else 30)
+        risk_paragraphs = extraction["paragraphs"]
         print(f"Extrahiert {len(risk_paragraphs)} Risikoabsätze\n")
 
         if len(risk_paragraphs) == 0:
             print("Keine Risikoabsätze gefunden – Bericht wird übersprungen.")
             return
 
+        categorizer, seed_analyzer = None, None
+        if semantic_categories:
+            from src.analyzers.risk_categorizer import EmbeddingCategorizer, apply_categories
+
+            categorizer = EmbeddingCategorizer.load(CATEGORY_CENTROIDS_PATH, model=SentimentAnalyzer.MODEL_NAME)
+            if not categorizer.fitted:
+                # Einmalig: Zentroiden müssen vor dem Cache-Schlüssel feststehen
+                print("Erstelle Kategorie-Zentroiden aus den Keyword-Phrasen...")
+                seed_analyzer = SentimentAnalyzer(return_embeddings=True)
+                categorizer.fit_seeds(seed_analyzer.embed, model=SentimentAnalyzer.MODEL_NAME)
+                categorizer.save(CATEGORY_CENTROIDS_PATH)
+            categories_key = f"{SentimentAnalyzer.EMBEDDING_POOLING}:{categorizer.version()}"
+        else:
+            categories_key = None
+
+        def sentiment_inputs_for(h):
+            return sentiment_inputs(h, SentimentAnalyzer.MODEL_NAME, categories_key)
+
+        score_inputs = sentiment_inputs_for(paragraphs_hash)
+        if adaptive:
+            score_inputs.update(adaptive.config())
+        diff, previous_results = None, None
+        if previous_filing_path and adaptive:
+            print("Adaptives Scoring ist mit dem Vorjahresvergleich nicht kombinierbar – Vergleich übersprungen.")
+        elif previous_filing_path:
+            from src.analyzers.risk_differ import RiskDiffer
+
+            print("Vergleiche mit Vorjahres-10-K...")
+            previous, previous_hash = extract_risk_paragraphs(previous_filing_path, cache, parser)
+            differ = RiskDiffer()
+            diff = differ.diff(previous["paragraphs"], risk_paragraphs)
+            summary = differ.summarize(diff, previous["paragraphs"], risk_paragraphs)
+            print(f"Neu: {summary['counts']['added']} | Entfernt: {summary['counts']['removed']} | "
+                  f"Geändert: {summary['counts']['modified']} | Unverändert: {summary['counts']['unchanged']}")
+
+            diff_path = Path("data/processed") / f"{ticker}_risk_diff_{datetime.now().strftime('%Y%m%d')}.json"
+            diff_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(diff_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            print(f"Risiko-Diff gespeichert → {diff_path}\n")
+
+            # Vorjahres-Scores nur aus dem Cache – kein zusätzlicher FinBERT-Lauf
+            previous_entry = cache.get("sentiment", cache.stage_key(
+                "sentiment", SentimentAnalyzer.VERSION, sentiment_inputs_for(previous_hash)))
+            if previous_entry:
+                previous_results = previous_entry["value"]["results"]
+                score_inputs["previous"] = previous_entry["output_hash"]
+
         print("Schritt 2/4: FinBERT Sentiment-Analyse wird gestartet...")
-        sentiment_analyzer = SentimentAnalyzer()
-        sentiment_results = sentiment_analyzer.analyze_risks(risk_paragraphs)
-        overall_risk_score = sentiment_analyzer.get_overall_risk_score(sentiment_results)
+
+        def score():
+            # FinBERT wird nur bei Cache-Miss geladen
+            sentiment_analyzer = seed_analyzer or SentimentAnalyzer(return_embeddings=categorizer is not None)
+            value = {}
+            if diff is not None:
+                results = differ.score_changes(diff, risk_paragraphs, sentiment_analyzer, previous_results)
+            elif adaptive:
+                from src.analyzers.adaptive_scoring import keyword_priority
+
+                order = keyword_priority(risk_paragraphs, KeywordScanner())
+                results, stats = adaptive.score(
+                    risk_paragraphs, lambda chunk: sentiment_analyzer.analyze_risks(chunk, deduplicate=True),
+                    order=order, count_tokens=sentiment_analyzer.count_tokens)
+                print(f"Adaptiv: {stats['scored']}/{stats['available']} Absätze, {stats['tokens']} Tokens "
+                      f"(±{stats['half_width']}, Stopp: {stats['stopped']})")
+                value["adaptive"] = stats
+            else:
+                results = sentiment_analyzer.analyze_risks(risk_paragraphs, deduplicate=True)
+            if categorizer is not None:
+                counts = apply_categories(results, categorizer)
+                print(f"Semantische Kategorien (Zentroiden {categorizer.version()}): {counts}")
+            value.update(results=results, score=sentiment_analyzer.get_overall_risk_score(results))
+            return value
+
+        sentiment, sentiment_hash = cache.run(
+            "sentiment", SentimentAnalyzer.VERSION, score_inputs, score
+        )
+        sentiment_results = sentiment["results"]
+        overall_risk_score = sentiment["score"]
         print(f"AI-Risikoscore: {overall_risk_score:.1f}/100\n")
 
         print("Schritt 3/4: Keyword-Scanning nach kritischen Themen...")
         keyword_scanner = KeywordScanner()
-        keyword_results = keyword_scanner.scan_risks(risk_paragraphs)
+        if scan_document:
+            from src.analyzers.document_scanner import DocumentKeywordScanner
+
+            document_scanner = DocumentKeywordScanner(keyword_scanner)
+            keyword_results, keywords_hash = cache.run(
+                "keywords", document_scanner.fingerprint(),
+                {"filing": filing_hash, "scope": "document"},
+                lambda: document_scanner.scan_file(filing_path)
+            )
+        else:
+            keyword_results, keywords_hash = cache.run(
+                "keywords",
+                keyword_scanner.fingerprint(),
+                {"paragraphs": paragraphs_hash},
+                lambda: keyword_scanner.scan_risks(risk_paragraphs)
+            )
         print(f"Gefundene kritische Keywords: {keyword_results['total_keywords']}\n")
 
         print("Schritt 4/4: Generiere Risikobericht...")
-        reporter = RiskReporter()
-        report_text = reporter.generate_report(
-            ticker=ticker,
-            sentiment_results=sentiment_results,
-            keyword_results=keyword_results,
-            overall_risk_score=overall_risk_score
-        )
+        report_key = cache.stage_key("report", str(RiskReporter.SCHEMA_VERSION), {
+            "sentiment": sentiment_hash,
+            "keywords": keywords_hash,
+            "metrics": StageCache.hash_value(metrics or {}),
+        })
+        previous = cache.get("report", report_key)
+        if previous and all(Path(p).exists() for p in previous["value"].values()):
+            print(f"Risikobericht unverändert → {previous['value']['report']}")
+            return
+
+        with cache.profile("report"):
+            metadata = risk_metadata(filing_path, filing_hash, SentimentAnalyzer.MODEL_NAME, keyword_scanner)
+            if "adaptive" in sentiment:
+                metadata["adaptive_scoring"] = sentiment["adaptive"]
+            reporter = RiskReporter()
+            result = reporter.build_result(
+                ticker=ticker,
+                sentiment_results=sentiment_results,
+                keyword_results=keyword_results,
+                overall_risk_score=overall_risk_score,
+                section_offsets=extraction["section_offsets"],
+                metrics=metrics,
+                metadata=metadata
+            )
+            report_text = reporter.render_report(result)
 
         report_path = reporter.save_report(report_text, ticker)
+        result_path = reporter.save_result(result)
+
+        # Paragraph-Wahrscheinlichkeiten für Peer-Vergleiche (Z-Scores, Perzentile) sammeln
+        store_path = Path("data/processed/peer_store.npz")
+        peer_store = PeerRiskStore.load(store_path)
+        peer_store.add_filing(ticker, sentiment_results, keyword_results,
+                              filing_id=filing_path.parent.name)
+        peer_store.save(store_path)
+        cache.put("report", report_key, {"report": str(report_path), "result": str(result_path)})
         print(f"Risikobericht gespeichert → {report_path}")
+        print(f"Strukturiertes Ergebnis   → {result_path}")
 
     except Exception as e:
         print(f"AI-Risikoanalyse fehlgeschlagen: {e}")
@@ -131,7 +309,658 @@ def analyze_risks(ticker: str, filing_path: Path):
         traceback.print_exc()
 
 
+def save_profile(profiler, ticker: str, cache: StageCache, output_dir: str = "data/processed"):
+    """Schreibt das Stufenprofil (--profile) neben den Risikobericht und zeigt die größten Posten."""
+    if profiler is None:
+        return
+    profiler.stop()
+    prefix = Path(output_dir) / f"{ticker}_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    paths = profiler.save(prefix)
+    summary = profiler.summary()
+
+    print(f"\n{'='*80}")
+    print("PROFIL JE STUFE")
+    print(f"{'='*80}")
+    for stage, entry in sorted(summary["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        print(f"{stage:<16} {entry['seconds']:8.3f}s  Spitze {entry['peak_bytes'] / 1e6:8.1f} MB")
+        for row in entry["functions"][:3]:
+            print(f"    {row['tottime']:8.3f}s  {row['calls']:>9}×  {row['function']}")
+        for row in entry["allocations"][:2]:
+            print(f"    {row['bytes'] / 1e6:8.1f} MB  {row['count']:>9}×  {row['site']}")
+    if cache.hits:
+        print(f"Hinweis: {cache.hits} Stufe(n) kamen aus dem Cache und fehlen im Profil (--no-cache)")
+    print(f"Profil gespeichert → {' | '.join(str(p) for p in paths.values())}")
+
+
+def ingest_command(argv):
+    """Lädt Kennzahlen aus lokalen SEC-Bulk-Archiven (companyfacts.zip / FSDS) in den Metrics-Store."""
+    from src.analyzers.ratio_engine import RatioEngine
+    from src.scrapers.sec_bulk_ingest import SECBulkIngestor
+    from src.utils.metrics_store import MetricsStore
+
+    parser = argparse.ArgumentParser(
+        prog="main.py ingest",
+        description="Bulk-Import von SEC companyfacts.zip / Financial Statement Data Sets"
+    )
+    parser.add_argument("--companyfacts", type=Path, help="Lokale companyfacts.zip")
+    parser.add_argument("--fsds", type=Path, nargs="*", default=[],
+                        help="Quartalsarchive der Financial Statement Data Sets (z.B. 2024q1.zip)")
+    parser.add_argument("--ticker-map", type=Path,
+                        help="company_tickers.json (CIK → Ticker); ohne Angabe werden alle CIKs importiert")
+    parser.add_argument("--tickers", nargs="*", help="Nur diese Ticker importieren")
+    parser.add_argument("--store", type=str, default="data/processed/metrics/metrics_store.csv",
+                        help="Zieldatei (.csv oder .parquet)")
+    parser.add_argument("--ratios", type=str, default="data/processed/metrics/ratios_store.csv",
+                        help="Kennzahlen-Store, inkrementell für die importierten Ticker/Jahre aktualisiert")
+    args = parser.parse_args(argv)
+
+    if not args.companyfacts and not args.fsds:
+        parser.error("mindestens --companyfacts oder --fsds angeben")
+    if args.tickers and not args.ticker_map:
+        parser.error("--tickers benötigt --ticker-map")
+
+    universe = SECBulkIngestor.load_ticker_map(args.ticker_map, args.tickers) if args.ticker_map else None
+    ingestor = SECBulkIngestor(universe=universe)
+
+    records = []
+    if args.companyfacts:
+        print(f"Lese {args.companyfacts} ...")
+        records.extend(ingestor.ingest_companyfacts(args.companyfacts))
+    for archive in args.fsds:
+        print(f"Lese {archive} ...")
+        records.extend(ingestor.ingest_financial_statements(archive))
+
+    store = MetricsStore(args.store)
+    total = store.upsert(records)
+    companies = len({r["ticker"] for r in records})
+    print(f"✅ {len(records)} Kennzahlen von {companies} Unternehmen importiert → {store.path} ({total} Zeilen)")
+
+    engine = RatioEngine(args.ratios)
+    updated = engine.update(store.load(), records)
+    print(f"📐 {updated['recomputed']} Ratios neu berechnet → {engine.path} ({updated['total']} Zeilen)")
+
+
+def ratios_command(argv):
+    """Berechnet abgeleitete Kennzahlen (Margen, Verschuldung, Wachstum) aus dem Metrics-Store."""
+    from src.analyzers.ratio_engine import RatioEngine
+    from src.utils.metrics_store import MetricsStore
+
+    parser = argparse.ArgumentParser(
+        prog="main.py ratios",
+        description="Ratio-Store neu aufbauen und anzeigen"
+    )
+    parser.add_argument("tickers", nargs="*", help="Nur diese Ticker anzeigen")
+    parser.add_argument("--store", type=str, default="data/processed/metrics/metrics_store.csv")
+    parser.add_argument("--ratios", type=str, default="data/processed/metrics/ratios_store.csv")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Alle Ticker und Jahre neu berechnen (sonst nur anzeigen)")
+    args = parser.parse_args(argv)
+
+    engine = RatioEngine(args.ratios)
+    if args.rebuild or not engine.path.exists():
+        total = engine.rebuild(MetricsStore(args.store).load())
+        print(f"✅ {total} Ratios berechnet → {engine.path}")
+    table = engine.table(args.tickers)
+    if table.empty:
+        print("Keine Kennzahlen vorhanden")
+        return
+    print(table.round(3).to_string())
+
+
+def catalog_command(argv):
+    """Baut den lokalen 10-K-Katalog aus dem EDGAR-Full-Index und plant/lädt Backfill-Batches."""
+    from src.scrapers.edgar_index import EdgarCatalog, fetch_batch
+    from src.scrapers.sec_bulk_ingest import SECBulkIngestor
+
+    parser = argparse.ArgumentParser(
+        prog="main.py catalog",
+        description="EDGAR-Full-Index → lokaler 10-K-Katalog → Arbeits-Batches"
+    )
+    parser.add_argument("--index", type=Path, nargs="*", default=[],
+                        help="Lokale form.idx/master.idx-Dateien (mit --year/--quarter)")
+    parser.add_argument("--year", type=int, help="Jahr der Indizes (ohne --index: Download von EDGAR)")
+    parser.add_argument("--quarter", type=int, nargs="*", choices=[1, 2, 3, 4],
+                        help="Quartale (Standard: alle vier)")
+    parser.add_argument("--db", type=str, default="data/processed/edgar_catalog.sqlite")
+    parser.add_argument("--plan", action="store_true", help="Batches für den Backfill schreiben")
+    parser.add_argument("--start", type=str, help="Frühestes Einreichungsdatum (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, help="Spätestes Einreichungsdatum (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-dir", type=str, default="data/processed/batches")
+    parser.add_argument("--ticker-map", type=Path,
+                        help="company_tickers.json – beschränkt den Plan auf diese Unternehmen")
+    parser.add_argument("--tickers", nargs="*", help="Nur diese Ticker (benötigt --ticker-map)")
+    parser.add_argument("--fetch", type=Path, nargs="*", default=[],
+                        help="Batch-Dateien herunterladen (parallel, SEC-Rate-Limit)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--compress", action="store_true",
+                        help="Filings zstd-komprimiert speichern (benötigt zstandard)")
+    parser.add_argument("--company-name", type=str, default="Investor")
+    parser.add_argument("--email", type=str, default="investor@example.com")
+    args = parser.parse_args(argv)
+
+    catalog = EdgarCatalog(args.db)
+    quarters = args.quarter or [1, 2, 3, 4]
+
+    if args.index:
+        if len(args.index) == 1 and args.year and len(quarters) == 1:
+            labels = [(args.year, quarters[0])]
+        else:
+            labels = [(None, None)] * len(args.index)
+        for path, (year, quarter) in zip(args.index, labels):
+            print(f"✅ {path}: {catalog.load_index_file(path, year, quarter)} Filings katalogisiert")
+    elif args.year:
+        for quarter in quarters:
+            count = catalog.download_index(args.year, quarter, args.company_name, args.email)
+            print(f"✅ {args.year} Q{quarter}: {count} Filings katalogisiert")
+
+    if args.plan:
+        universe = None
+        if args.ticker_map:
+            universe = SECBulkIngestor.load_ticker_map(args.ticker_map, args.tickers)
+        start = args.start or (f"{args.year}-01-01" if args.year else None)
+        end = args.end or (f"{args.year}-12-31" if args.year else None)
+        batches = catalog.plan_batches(args.batch_size, universe=universe, start=start, end=end)
+        paths = EdgarCatalog.write_batches(batches, args.batch_dir)
+        total = sum(len(b["filings"]) for b in batches)
+        print(f"✅ {total} Filings in {len(paths)} Batches → {args.batch_dir}/")
+
+    for batch_file in args.fetch:
+        batch = json.loads(batch_file.read_text(encoding='utf-8'))
+        fetched = fetch_batch(batch, args.company_name, args.email, workers=args.workers,
+                              compress=args.compress)
+        print(f"✅ {batch['batch_id']}: {len(fetched)}/{len(batch['filings'])} Filings lokal verfügbar")
+
+    catalog.close()
+
+
+def batch_command(argv):
+    """Analysiert viele Filings mit der Streaming-Pipeline (Download, Parsing und FinBERT überlappend).
+
+    Jeder Lauf wird im Run-Journal protokolliert; mit --resume <run-id> werden nur
+    offene und fehlgeschlagene Items erneut versucht.
+    """
+    from src.pipeline.filing_pipeline import FilingPipeline
+    from src.pipeline.run_journal import RunJournal
+
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Streaming-Pipeline für viele Ticker oder einen Backfill-Batch"
+    )
+    parser.add_argument("tickers", nargs="*", help="Aktien-Ticker")
+    parser.add_argument("--batch-file", type=Path, nargs="*", default=[],
+                        help="Batch-Dateien aus 'main.py catalog --plan' (zuvor mit --fetch geladen)")
+    parser.add_argument("--full-analysis", action="store_true")
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--download-workers", type=int, default=4)
+    parser.add_argument("--parse-workers", type=int, default=2, help="Prozesse für das Parsing")
+    parser.add_argument("--score-batch", type=int, default=4, help="Filings pro FinBERT-Aufruf")
+    parser.add_argument("--queue-size", type=int, default=8, help="Kapazität jeder Stufen-Queue")
+    parser.add_argument("--company-name", type=str, default="Investor")
+    parser.add_argument("--email", type=str, default="investor@example.com")
+    parser.add_argument("--resume", type=str, metavar="RUN_ID",
+                        help="Abgebrochenen Lauf fortsetzen (nur offene/fehlgeschlagene Items)")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Maximale Versuche pro Item (über alle Fortsetzungen)")
+    parser.add_argument("--journal", type=str, default="data/runs/journal.sqlite")
+    parser.add_argument("--scheduler", action="store_true",
+                        help="FinBERT-Replikate an CPU-Kerne gepinnt (Konfiguration aus 'main.py calibrate')")
+    parser.add_argument("--replicas", type=int, help="Scheduler: Anzahl Modell-Replikate")
+    parser.add_argument("--threads", type=int, help="Scheduler: Threads pro Replikat")
+    parser.add_argument("--compress", action="store_true",
+                        help="Heruntergeladene Filings zstd-komprimiert speichern (benötigt zstandard)")
+    args = parser.parse_args(argv)
+
+    journal = RunJournal(args.journal)
+    if args.resume:
+        info = journal.run_info(args.resume)
+        if info is None:
+            parser.error(f"unbekannter Lauf '{args.resume}'")
+        # Gleiche Konfiguration wie der ursprüngliche Lauf
+        max_attempts = args.max_attempts
+        args = parser.parse_args(info["command"]["argv"])
+        args.max_attempts = max_attempts
+        run_id = info["run_id"]
+        print(f"Setze Lauf {run_id} fort: {journal.summary(run_id)}")
+    else:
+        items = [{"key": t.upper(), "ticker": t.upper()} for t in args.tickers]
+        for batch_file in args.batch_file:
+            batch = json.loads(batch_file.read_text(encoding='utf-8'))
+            for filing in batch["filings"]:
+                folder = (Path("data/raw/sec-edgar-filings") / filing["ticker"]
+                          / filing["form"].replace("/", "-") / filing["accession"])
+                filing_path = find_filing_file(folder) if folder.exists() else None
+                if filing_path is None:
+                    print(f"⚠️  {filing['accession']} nicht lokal vorhanden – übersprungen")
+                    continue
+                items.append({"key": f"{filing['ticker']}/{filing['accession']}",
+                              "ticker": filing["ticker"], "filing_path": str(filing_path)})
+        if not items:
+            parser.error("keine Ticker oder Filings angegeben")
+        run_id = journal.start_run(items, {"argv": argv})
+        print(f"Lauf {run_id} gestartet ({len(items)} Items) – fortsetzen mit: "
+              f"python main.py batch --resume {run_id}")
+
+    inference = None
+    if args.full_analysis and (args.scheduler or args.replicas or args.threads):
+        from src.pipeline.inference_scheduler import InferenceScheduler
+        inference = InferenceScheduler.from_calibration(replicas=args.replicas, threads=args.threads)
+
+    pipeline = FilingPipeline(
+        company_name=args.company_name, email=args.email,
+        full_analysis=args.full_analysis, offline=args.offline, parser=args.parser,
+        cache=StageCache(enabled=not args.no_cache),
+        download_workers=args.download_workers, parse_workers=args.parse_workers,
+        score_batch=args.score_batch, queue_size=args.queue_size, inference=inference,
+        compress=args.compress,
+    )
+    try:
+        summary = pipeline.run_journaled(journal, run_id, max_attempts=args.max_attempts)
+    finally:
+        if inference is not None:
+            inference.close()
+
+    print(f"\n{'='*80}")
+    print(f"LAUF {run_id}: {summary.get('done', 0)} erledigt | {summary.get('failed', 0)} fehlgeschlagen")
+    print(f"{'='*80}")
+    if pipeline.pipeline is not None:
+        for name, stats in pipeline.pipeline.stats.items():
+            print(f"  {name:<10} {stats['processed']:>5} Items | {stats['busy_seconds']:>7.1f}s aktiv | "
+                  f"max. Queue {stats['max_queue']} | Fehler {stats['errors']}")
+    failed = journal.items(run_id, status="failed")
+    for item in failed:
+        print(f"  ✗ {item['item_key']} ({item['attempts']} Versuche): {item['last_error']}")
+    journal.close()
+    if failed:
+        sys.exit(1)
+
+
+def runs_command(argv):
+    """Zeigt die Läufe im Run-Journal bzw. den Status eines Laufs."""
+    from src.pipeline.run_journal import RunJournal
+
+    parser = argparse.ArgumentParser(prog="main.py runs", description="Run-Journal anzeigen")
+    parser.add_argument("run_id", nargs="?", help="Details zu diesem Lauf")
+    parser.add_argument("--journal", type=str, default="data/runs/journal.sqlite")
+    args = parser.parse_args(argv)
+
+    journal = RunJournal(args.journal)
+    if not args.run_id:
+        for run in journal.runs():
+            print(f"{run['run_id']}  {run['created']}  {run['status']:<8} {journal.summary(run['run_id'])}")
+    else:
+        for item in journal.items(args.run_id):
+            print(f"{item['item_key']:<30} {item['status']:<8} Versuche: {item['attempts']}"
+                  + (f" | {item['last_error']}" if item['last_error'] else ""))
+            for stage in journal.stages(args.run_id, item['item_key']):
+                print(f"    {stage['stage']:<18} {stage['status']:<7} {stage['seconds']:>8.3f}s"
+                      + (f" | {stage['error']}" if stage['error'] else ""))
+    journal.close()
+
+
+def queue_command(argv):
+    """Füllt die Work-Queue mit Tickern/Filings oder zeigt ihren Status."""
+    from src.pipeline.work_queue import open_queue
+
+    parser = argparse.ArgumentParser(prog="main.py queue", description="Work-Queue verwalten")
+    parser.add_argument("action", choices=["put", "status"])
+    parser.add_argument("tickers", nargs="*", help="Aktien-Ticker (put)")
+    parser.add_argument("--batch-file", type=Path, nargs="*", default=[],
+                        help="Batch-Dateien aus 'main.py catalog --plan'")
+    parser.add_argument("--queue", type=str, default="sqlite:data/queue/queue.sqlite",
+                        help="sqlite:<pfad> | dir:<geteiltes verzeichnis> | redis://host:port/db")
+    parser.add_argument("--full-analysis", action="store_true", help="Auch die Risikoanalyse ausführen")
+    parser.add_argument("--max-attempts", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    queue = open_queue(args.queue)
+    if args.action == "put":
+        tasks = [{"id": t.upper(), "payload": {"ticker": t.upper(), "full_analysis": args.full_analysis}}
+                 for t in args.tickers]
+        for batch_file in args.batch_file:
+            batch = json.loads(batch_file.read_text(encoding='utf-8'))
+            for filing in batch["filings"]:
+                key = f"{filing['ticker']}/{filing['accession']}"
+                tasks.append({"id": key, "payload": {
+                    "ticker": filing["ticker"], "filing": filing, "full_analysis": args.full_analysis}})
+        added = queue.put(tasks, max_attempts=args.max_attempts)
+        print(f"✅ {added} neue Tasks ({len(tasks) - added} bereits vorhanden)")
+    print(f"Queue-Status: {queue.stats()}")
+
+
+def worker_command(argv):
+    """Holt Tasks aus der Work-Queue und verarbeitet sie mit der Filing-Pipeline."""
+    from src.pipeline.filing_pipeline import FilingPipeline
+    from src.pipeline.work_queue import open_queue, run_worker
+
+    parser = argparse.ArgumentParser(prog="main.py worker", description="Worker für die Work-Queue")
+    parser.add_argument("--queue", type=str, default="sqlite:data/queue/queue.sqlite")
+    parser.add_argument("--worker-id", type=str, help="Standard: hostname-pid")
+    parser.add_argument("--lease-seconds", type=float, default=600)
+    parser.add_argument("--max-tasks", type=int, help="Nach N Tasks beenden")
+    parser.add_argument("--idle-exit", action="store_true", help="Beenden, sobald die Queue leer ist")
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--parse-workers", type=int, default=2)
+    parser.add_argument("--company-name", type=str, default="Investor")
+    parser.add_argument("--email", type=str, default="investor@example.com")
+    args = parser.parse_args(argv)
+
+    pipelines = {}
+
+    def handle(payload):
+        full_analysis = payload.get("full_analysis", False)
+        if full_analysis not in pipelines:
+            # Kein gemeinsamer Peer-Store: parallele Worker würden sich gegenseitig überschreiben;
+            # er lässt sich aus risk_results.jsonl neu aufbauen (PeerRiskStore.from_results)
+            pipelines[full_analysis] = FilingPipeline(
+                company_name=args.company_name, email=args.email, full_analysis=full_analysis,
+                offline=args.offline, parser=args.parser, parse_workers=args.parse_workers,
+                download_workers=1, peer_store_path=None)
+        item = {"key": payload["ticker"], "ticker": payload["ticker"]}
+        filing = payload.get("filing")
+        if filing:
+            item["key"] = f"{filing['ticker']}/{filing['accession']}"
+            folder = (Path("data/raw/sec-edgar-filings") / filing["ticker"]
+                      / filing["form"].replace("/", "-") / filing["accession"])
+            if not folder.exists():
+                from src.scrapers.edgar_index import fetch_batch
+                fetch_batch({"filings": [filing]}, args.company_name, args.email, workers=1)
+            filing_path = find_filing_file(folder) if folder.exists() else None
+            if filing_path is None:
+                raise FileNotFoundError(f"{item['key']} konnte nicht geladen werden")
+            item["filing_path"] = str(filing_path)
+
+        pipeline = pipelines[full_analysis]
+        outputs = pipeline.run([item])
+        if not outputs:
+            errors = "; ".join(f"{e['stage']}: {e['error']}" for e in pipeline.pipeline.errors)
+            raise RuntimeError(errors or "keine Ausgabe")
+        return outputs[0]
+
+    processed = run_worker(open_queue(args.queue), handle, worker_id=args.worker_id,
+                           lease_seconds=args.lease_seconds, max_tasks=args.max_tasks,
+                           idle_exit=args.idle_exit)
+    print(f"Worker beendet: {processed} Tasks verarbeitet")
+
+
+def calibrate_command(argv):
+    """Misst den FinBERT-Durchsatz je Konfiguration (Replikate × Threads) auf diesem Rechner."""
+    from src.pipeline.inference_scheduler import CALIBRATION_PATH, calibrate, candidate_configs, cpu_topology
+
+    parser = argparse.ArgumentParser(
+        prog="main.py calibrate",
+        description="Inference-Scheduler kalibrieren (Absätze pro Sekunde je Konfiguration)"
+    )
+    parser.add_argument("--ticker", type=str, help="Risikoabsätze dieses lokal vorhandenen 10-K verwenden")
+    parser.add_argument("--paragraphs", type=int, default=64, help="Absätze pro Messrunde")
+    parser.add_argument("--configs", nargs="*", default=[], metavar="RxT",
+                        help="Zu messende Konfigurationen, z.B. 1x8 2x4 4x2 (Standard: alle sinnvollen)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--output", type=Path, default=CALIBRATION_PATH)
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    args = parser.parse_args(argv)
+
+    if args.ticker:
+        from src.scrapers.sec_downloader import SECDownloader
+        local = SECDownloader("Investor", "investor@example.com").find_local_10k(args.ticker.upper())
+        filing_path = find_filing_file(Path(local[0])) if local else None
+        if filing_path is None:
+            parser.error(f"kein lokales 10-K für {args.ticker.upper()}")
+        sample = extract_risk_paragraphs(filing_path, StageCache(), args.parser)[0]["paragraphs"]
+    else:
+        sample = [
+            "The Company faces intense competition and pricing pressure in all of its markets, "
+            "which could adversely affect its results of operations and financial condition.",
+            "A cybersecurity incident or data breach could result in litigation, regulatory penalties "
+            "and damage to the Company's reputation.",
+            "Disruptions in the supply chain or manufacturing delays could reduce product availability.",
+        ]
+    paragraphs = (sample * (args.paragraphs // max(len(sample), 1) + 1))[:args.paragraphs]
+
+    configs = [tuple(int(x) for x in c.lower().split("x")) for c in args.configs] or None
+    cores = len(cpu_topology())
+    print(f"Physische Kerne: {cores} | Konfigurationen: {configs or candidate_configs(cores)}")
+    report = calibrate(paragraphs, configs, batch_size=args.batch_size, output=args.output)
+    best = report["best"]
+    print(f"\nBeste Konfiguration: {best['replicas']} × {best['threads']} Threads "
+          f"({best['paragraphs_per_second']} Absätze/s) → {args.output}")
+    print("Verwenden mit: python main.py batch ... --full-analysis --scheduler")
+
+
+def categories_command(argv):
+    """Verfeinert die semantischen Kategorie-Zentroiden (--semantic-categories) als eigener Schritt."""
+    from src.analyzers.keyword_scanner import KeywordScanner
+    from src.analyzers.risk_categorizer import EmbeddingCategorizer, refine_from_paragraphs
+    from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+    from src.scrapers.sec_downloader import SECDownloader
+
+    parser = argparse.ArgumentParser(
+        prog="main.py categories",
+        description="Kategorie-Zentroiden aus Keyword-Phrasen erstellen und mit eindeutig gelabelten Absätzen verfeinern"
+    )
+    parser.add_argument("action", choices=["seed", "refine", "show"])
+    parser.add_argument("tickers", nargs="*", help="refine: lokal vorhandene 10-Ks dieser Ticker")
+    parser.add_argument("--num-filings", type=int, default=1, help="refine: 10-Ks pro Ticker")
+    parser.add_argument("--output", type=Path, default=CATEGORY_CENTROIDS_PATH)
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    args = parser.parse_args(argv)
+
+    categorizer = EmbeddingCategorizer.load(args.output, model=SentimentAnalyzer.MODEL_NAME)
+    if args.action == "show":
+        if not categorizer.fitted:
+            print(f"Keine Zentroiden unter {args.output}")
+            return
+        for category, count in zip(categorizer.categories, categorizer._counts):
+            print(f"  {category:<14} {int(count):>6} Embeddings")
+        print(f"Version: {categorizer.version()}")
+        return
+    if args.action == "refine" and not args.tickers:
+        parser.error("refine benötigt mindestens einen Ticker")
+
+    analyzer = SentimentAnalyzer()
+    if args.action == "seed" or not categorizer.fitted:
+        categorizer.fit_seeds(analyzer.embed, model=SentimentAnalyzer.MODEL_NAME)
+        print(f"Zentroiden aus Keyword-Phrasen erstellt (Version {categorizer.version()})")
+
+    if args.action == "refine":
+        before = categorizer.version()
+        downloader, cache, scanner = SECDownloader("Investor", "investor@example.com"), StageCache(), KeywordScanner()
+        used = 0
+        for ticker in args.tickers:
+            for local in downloader.find_local_10k(ticker.upper(), num_filings=args.num_filings):
+                filing_path = find_filing_file(Path(local))
+                if filing_path is None:
+                    continue
+                paragraphs = extract_risk_paragraphs(filing_path, cache, args.parser)[0]["paragraphs"]
+                used += refine_from_paragraphs(categorizer, paragraphs, analyzer.embed, scanner)
+        print(f"{used} eindeutig gelabelte Absätze übernommen: Version {before} → {categorizer.version()}")
+
+    categorizer.save(args.output)
+    print(f"✅ Zentroiden gespeichert → {args.output} (gecachte Kategorien älterer Versionen werden neu berechnet)")
+
+
+def serve_command(argv):
+    """Startet den lokalen HTTP-Dienst für Kennzahlen, Risikoanalyse und Berichte."""
+    from src.pipeline.analysis_service import AnalysisService, create_server
+
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Lokaler Analyse-Dienst: /metrics/<TICKER>, /risks/<TICKER>, /report/<TICKER>, /stats"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-mb", type=int, default=256, help="Speicherbudget des Filing-LRU (MB)")
+    parser.add_argument("--download", action="store_true",
+                        help="Fehlende Filings von EDGAR laden (Standard: nur data/raw)")
+    parser.add_argument("--lazy-model", action="store_true",
+                        help="FinBERT erst bei der ersten Risikoanfrage laden")
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--company-name", type=str, default="Investor")
+    parser.add_argument("--email", type=str, default="investor@example.com")
+    args = parser.parse_args(argv)
+
+    service = AnalysisService(parser=args.parser, offline=not args.download,
+                              max_cache_bytes=args.cache_mb * 1024 * 1024,
+                              company_name=args.company_name, email=args.email)
+    if not args.lazy_model:
+        service.analyzer
+    server = create_server(service, args.host, args.port)
+    print(f"🚀 Analyse-Dienst läuft auf http://{args.host}:{server.server_port} (Strg+C beendet)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Dienst beendet – {service.stats()}")
+
+
+def store_command(argv):
+    """Komprimiert den Rohdaten-Speicher (zstd) bzw. misst Dekompression gegen gesparte I/O."""
+    from src.utils import filing_store
+
+    parser = argparse.ArgumentParser(prog="main.py store", description="Komprimierter Filing-Speicher (zstd)")
+    parser.add_argument("action", choices=["compress", "bench"])
+    parser.add_argument("--root", type=Path, default=Path("data/raw/sec-edgar-filings"))
+    parser.add_argument("--level", type=int, default=filing_store.DEFAULT_LEVEL, help="zstd-Level (1-22)")
+    parser.add_argument("--train-dictionary", action="store_true",
+                        help="Vorher ein Wörterbuch auf den zu komprimierenden Filings trainieren")
+    parser.add_argument("--dictionary", type=Path, help="Vorhandenes Wörterbuch verwenden")
+    parser.add_argument("--limit", type=int, help="Höchstens N Filings")
+    parser.add_argument("--bandwidth", type=float, default=100.0,
+                        help="bench: Lesebandbreite des Speichers in MB/s (Netzlaufwerk ~100, NVMe ~1000+)")
+    args = parser.parse_args(argv)
+
+    if args.action == "compress":
+        stats = filing_store.compress_store(args.root, args.level, args.train_dictionary, args.dictionary,
+                                            args.limit)
+        print(f"✅ {stats['files']} Filings komprimiert: {stats['raw_bytes'] / 1e6:,.1f} MB → "
+              f"{stats['compressed_bytes'] / 1e6:,.1f} MB (Faktor {stats['ratio']})")
+        return
+
+    paths = sorted(args.root.glob("**/full-submission.txt*"))[:args.limit]
+    stats = filing_store.benchmark(paths, args.bandwidth)
+    print(json.dumps(stats, indent=2))
+    if stats["files"]:
+        verdict = "lohnt sich" if stats["net_seconds_saved_per_filing"] > 0 else "lohnt sich nicht"
+        print(f"Bei {args.bandwidth:.0f} MB/s {verdict}: {stats['net_seconds_saved_per_filing'] * 1000:+.1f} ms "
+              f"pro Filing (Dekompression {stats['throughput_mb_s']} MB/s)")
+
+
+def watch_command(argv):
+    """Verfolgt den EDGAR-Feed der neuesten Filings und analysiert neue 10-Ks sofort."""
+    from src.pipeline.filing_pipeline import FilingPipeline
+    from src.scrapers.edgar_index import EdgarCatalog
+    from src.scrapers.edgar_watch import FEED_URL, FilingWatcher
+    from src.scrapers.sec_bulk_ingest import SECBulkIngestor
+
+    parser = argparse.ArgumentParser(prog="main.py watch",
+                                     description="EDGAR-Atom-Feed beobachten, neue 10-K/10-K/A verarbeiten")
+    parser.add_argument("--ticker-map", type=Path, help="company_tickers.json – Watchlist (CIK → Ticker)")
+    parser.add_argument("--tickers", nargs="*", help="Nur diese Ticker (benötigt --ticker-map)")
+    parser.add_argument("--all", action="store_true", help="Alle Filer statt einer Watchlist")
+    parser.add_argument("--interval", type=float, default=120, help="Sekunden zwischen zwei Abrufen")
+    parser.add_argument("--once", action="store_true", help="Nur ein Abruf (z.B. per cron)")
+    parser.add_argument("--pages", type=int, default=1, help="Feed-Seiten à 100 Einträge pro Abruf")
+    parser.add_argument("--feed-url", type=str, default=FEED_URL)
+    parser.add_argument("--db", type=str, default="data/processed/edgar_catalog.sqlite")
+    parser.add_argument("--full-analysis", action="store_true")
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--compress", action="store_true", help="Filings zstd-komprimiert speichern")
+    parser.add_argument("--company-name", type=str, default="Investor")
+    parser.add_argument("--email", type=str, default="investor@example.com")
+    args = parser.parse_args(argv)
+
+    if not args.all and not args.ticker_map:
+        parser.error("--ticker-map (Watchlist) oder --all angeben")
+    universe = None if args.all else SECBulkIngestor.load_ticker_map(args.ticker_map, args.tickers)
+
+    catalog = EdgarCatalog(args.db)
+    watcher = FilingWatcher(catalog, universe, company_name=args.company_name, email=args.email,
+                            feed_url=args.feed_url, pages=args.pages)
+    pipeline = FilingPipeline(company_name=args.company_name, email=args.email,
+                              full_analysis=args.full_analysis, offline=True, parser=args.parser,
+                              download_workers=1)
+
+    def handle(filings):
+        summary = watcher.process(filings, pipeline, compress=args.compress)
+        print(f"✅ {summary['done']} verarbeitet | {summary['failed']} fehlgeschlagen")
+
+    print(f"Beobachte EDGAR ({'alle Filer' if universe is None else f'{len(universe)} Unternehmen'}, "
+          f"alle {args.interval:.0f}s) – Strg+C beendet")
+    try:
+        watcher.run(handle, interval=args.interval, max_polls=1 if args.once else None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        catalog.close()
+
+
+def profile_command(argv):
+    """Zeigt ein gespeichertes Stufenprofil (--profile) oder vergleicht zwei Läufe."""
+    from src.utils.profiler import compare_profiles, load_profile
+
+    parser = argparse.ArgumentParser(
+        prog="main.py profile",
+        description="Profile aus 'main.py TICKER --profile' anzeigen und vergleichen"
+    )
+    parser.add_argument("action", choices=["show", "compare"])
+    parser.add_argument("profiles", type=Path, nargs="+",
+                        help="show: eine Profil-JSON | compare: Basislauf und neuer Lauf")
+    parser.add_argument("--top", type=int, default=10, help="Funktionen/Allokationsstellen je Stufe")
+    args = parser.parse_args(argv)
+
+    if args.action == "show":
+        for stage, entry in load_profile(args.profiles[0])["stages"].items():
+            print(f"\n{stage}: {entry['seconds']:.3f}s in {entry['runs']} Lauf/Läufen, "
+                  f"Spitze {entry['peak_bytes'] / 1e6:.1f} MB")
+            for row in entry["functions"][:args.top]:
+                print(f"  {row['tottime']:8.3f}s eigen {row['cumtime']:8.3f}s gesamt "
+                      f"{row['calls']:>9}×  {row['function']}")
+            for row in entry["allocations"][:args.top]:
+                print(f"  {row['bytes'] / 1e6:8.2f} MB {row['count']:>9}×  {row['site']}")
+        return
+
+    if len(args.profiles) != 2:
+        parser.error("compare benötigt genau zwei Profile (Basis, neu)")
+    diff = compare_profiles(load_profile(args.profiles[0]), load_profile(args.profiles[1]), args.top)
+    for stage, entry in diff.items():
+        before, after, delta = entry["seconds"]
+        change = f" ({delta / before:+.0%})" if before else ""
+        print(f"\n{stage}: {before:.3f}s → {after:.3f}s{change} | Spitze "
+              f"{entry['peak_bytes'][0] / 1e6:.1f} → {entry['peak_bytes'][1] / 1e6:.1f} MB")
+        for row in entry["functions"]:
+            print(f"  {row['delta']:+8.3f}s  {row['function']}")
+        for row in entry["allocations"]:
+            print(f"  {row['delta'] / 1e6:+8.2f} MB  {row['site']}")
+
+
+# Unterbefehle; alles andere wird als Ticker interpretiert (python main.py AAPL)
+COMMANDS = {
+    "ingest": ingest_command,
+    "ratios": ratios_command,
+    "catalog": catalog_command,
+    "batch": batch_command,
+    "runs": runs_command,
+    "queue": queue_command,
+    "worker": worker_command,
+    "calibrate": calibrate_command,
+    "categories": categories_command,
+    "serve": serve_command,
+    "store": store_command,
+    "watch": watch_command,
+    "profile": profile_command,
+}
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Financial Report Analyzer – Finanzkennzahlen + AI-Risikoanalyse",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -150,21 +979,76 @@ Beispiele:
                         help="Dein Name/Firma für SEC User-Agent (Pflicht!)")
     parser.add_argument("--email", type=str, default="investor@example.com",
                         help="Deine E-Mail für SEC User-Agent (Pflicht!)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Alle Stufen neu berechnen (Stage-Cache ignorieren)")
+    parser.add_argument("--offline", action="store_true",
+                        help="Kein Download – bereits vorhandenes Filing aus data/raw verwenden")
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help="HTML/XML-Parser-Backend (lxml = schnell, bs4 = Kompatibilitäts-Fallback)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Ausgabeformat der Finanzkennzahlen (Parquet benötigt pyarrow)")
+    parser.add_argument("--compare-previous", action="store_true",
+                        help="Risikofaktoren mit dem Vorjahres-10-K vergleichen (neu/entfernt/geändert)")
+    parser.add_argument("--semantic-categories", action="store_true",
+                        help="Absätze per FinBERT-Embedding den Risikokategorien zuordnen (auch ohne Keyword)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Absätze nach Keyword-Dichte bewerten, bis der Risikoscore konvergiert ist")
+    parser.add_argument("--tolerance", type=float, default=2.0,
+                        help="Adaptiv: Ziel-Halbbreite des 95%%-Konfidenzintervalls (Scorepunkte)")
+    parser.add_argument("--token-budget", type=int,
+                        help="Adaptiv: maximale FinBERT-Tokens pro Filing")
+    parser.add_argument("--scan-document", action="store_true",
+                        help="Keywords im gesamten 10-K zählen statt nur in den Risikoabsätzen (je Abschnitt)")
+    parser.add_argument("--compress", action="store_true",
+                        help="Heruntergeladene Filings zstd-komprimiert speichern (benötigt zstandard)")
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile + tracemalloc je Stufe aufzeichnen (Artefakte neben dem Bericht)")
+    parser.add_argument("--profile-no-alloc", action="store_true",
+                        help="Mit --profile: nur Funktionsprofil, ohne Allokations-Tracking (geringerer Overhead)")
 
     args = parser.parse_args()
 
     ticker = args.ticker.upper()
 
+    profiler = None
+    if args.profile:
+        from src.utils.profiler import StageProfiler
+
+        profiler = StageProfiler(allocations=not args.profile_no_alloc)
+        profiler.start()
+
     # Phase 1: Finanzanalyse (immer)
-    filing_path = analyze_financials(ticker, args.company_name, args.email)
+    cache = StageCache(enabled=not args.no_cache, profiler=profiler)
+    filing_path, metrics = analyze_financials(ticker, args.company_name, args.email,
+                                              cache=cache, offline=args.offline,
+                                              num_filings=2 if args.compare_previous else 1,
+                                              parser=args.parser, output_format=args.format,
+                                              compress=args.compress)
 
     if filing_path is None:
+        save_profile(profiler, ticker, cache)
         print(f"\nAnalyse für {ticker} fehlgeschlagen – Programm wird beendet.")
         sys.exit(1)
 
     # Phase 2: Risikoanalyse (optional)
     if args.full_analysis:
-        analyze_risks(ticker, filing_path)
+        adaptive = None
+        if args.adaptive:
+            from src.analyzers.adaptive_scoring import AdaptiveScorer
+            adaptive = AdaptiveScorer(tolerance=args.tolerance, token_budget=args.token_budget)
+        previous_filing_path = None
+        if args.compare_previous:
+            from src.scrapers.sec_downloader import SECDownloader
+            local = SECDownloader(args.company_name, args.email).find_local_10k(ticker, num_filings=2)
+            if len(local) > 1:
+                previous_filing_path = find_filing_file(local[1])
+            else:
+                print("Kein Vorjahres-10-K gefunden – Vergleich wird übersprungen.")
+
+        analyze_risks(ticker, filing_path, metrics, cache=cache,
+                      previous_filing_path=previous_filing_path, parser=args.parser,
+                      semantic_categories=args.semantic_categories,
+                      adaptive=adaptive, scan_document=args.scan_document)
 
         print(f"\n{'='*80}")
         print(f"VOLLSTÄNDIGE ANALYSE FÜR {ticker} ABGESCHLOSSEN!")
@@ -172,11 +1056,13 @@ Beispiele:
         print("Ergebnisse:")
         print("   → Finanzkennzahlen: data/processed/metrics/")
         print("   → Risikobericht:    data/processed/")
+        print("   → Ergebnisse JSONL: data/processed/risk_results.jsonl")
         print("   → Rohdaten:         data/raw/sec_filings/")
     else:
         print(f"\nTipp: Nutze '--full-analysis' für die komplette AI-Risikoanalyse!")
         print(f"Beispiel: python main.py {ticker} --full-analysis")
 
+    save_profile(profiler, ticker, cache)
     print(f"\nDanke für die Nutzung! 🚀")
 
 
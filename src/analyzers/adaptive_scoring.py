@@ -0,0 +1,145 @@
+"""
+Adaptive Scoring - Early-stopping FinBERT inference per filing
+
+Instead of scoring a fixed number of paragraphs, paragraphs are scored in
+priority order (keyword density first) and scoring stops as soon as the
+running risk score is known precisely enough:
+
+    half_width = z * s / sqrt(n) * sqrt((N - n) / (N - 1))   ≤ tolerance
+
+s is the standard deviation of the per-paragraph risk contributions (the
+terms get_overall_risk_score averages) and the last factor the finite-
+population correction – after all N paragraphs the score is exact. A token
+budget caps the inference spent on a single filing.
+
+Note: the score covers the scored paragraphs, like the fixed mode covers the
+first 30. Prioritising keyword-dense paragraphs puts the risk-heavy text first.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Zweiseitige Normal-Quantile für gängige Konfidenzniveaus
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+def keyword_priority(paragraphs: List[str], keyword_scanner) -> List[int]:
+    """
+    Paragraph indices ordered by keyword hits per 100 words (ties keep document order).
+    """
+    def density(text: str) -> float:
+        words = max(len(text.split()), 1)
+        hits = sum(len(pattern.findall(text.lower())) for pattern in keyword_scanner.patterns.values())
+        return hits * 100 / words
+
+    densities = [density(p) for p in paragraphs]
+    return sorted(range(len(paragraphs)), key=lambda i: (-densities[i], i))
+
+
+class AdaptiveScorer:
+    """
+    Scores paragraphs in priority order until the risk score has converged.
+
+    Args:
+        tolerance (float): Target half-width of the confidence interval (score points, 0-100 scale).
+        confidence (float): Confidence level of the interval (0.8, 0.9, 0.95 or 0.99).
+        token_budget (int): Maximum tokens sent to the model per filing (None = unlimited).
+        min_paragraphs (int): Never stop before this many paragraphs were scored.
+        step (int): Paragraphs scored per model call between convergence checks.
+        weights (dict): Sentiment weights (default: SentimentAnalyzer.SCORE_WEIGHTS).
+    """
+
+    VERSION = "1"
+
+    def __init__(self, tolerance: float = 2.0, confidence: float = 0.95, token_budget: Optional[int] = None,
+                 min_paragraphs: int = 5, step: int = 4, weights: Optional[Dict[str, float]] = None):
+        if confidence not in Z_SCORES:
+            raise ValueError(f"confidence muss eines von {sorted(Z_SCORES)} sein")
+        if weights is None:
+            from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+            weights = SentimentAnalyzer.SCORE_WEIGHTS
+        self.tolerance = tolerance
+        self.confidence = confidence
+        self.z = Z_SCORES[confidence]
+        self.token_budget = token_budget
+        self.min_paragraphs = min_paragraphs
+        self.step = max(1, step)
+        self.weights = weights
+
+    def config(self) -> Dict[str, str]:
+        """Settings that change the result (part of the sentiment cache key)."""
+        return {"adaptive": self.VERSION, "tolerance": str(self.tolerance), "confidence": str(self.confidence),
+                "token_budget": str(self.token_budget), "min_paragraphs": str(self.min_paragraphs)}
+
+    def contribution(self, result: Dict) -> float:
+        """Risk-score term of one paragraph (get_overall_risk_score averages these)."""
+        return sum(result[label] * weight for label, weight in self.weights.items())
+
+    def half_width(self, contributions: List[float], population: int) -> float:
+        """Confidence-interval half-width of the mean contribution, finite-population corrected."""
+        n = len(contributions)
+        if n >= population:
+            return 0.0
+        if n < 2:
+            return float("inf")
+        fpc = np.sqrt((population - n) / (population - 1))
+        return float(self.z * np.std(contributions, ddof=1) / np.sqrt(n) * fpc)
+
+    def score(self, paragraphs: List[str], score_fn: Callable[[List[str]], List[Dict]],
+              order: Optional[List[int]] = None,
+              count_tokens: Callable[[str], int] = lambda text: len(re.findall(r"\w+|[^\w\s]", text))
+              ) -> Tuple[List[Dict], Dict]:
+        """
+        Score paragraphs in the given order until converged or out of budget.
+
+        Args:
+            paragraphs: All candidate paragraphs (document order)
+            score_fn: Scoring function, e.g. SentimentAnalyzer.analyze_risks
+            order: Paragraph indices in priority order (default: document order)
+            count_tokens: Tokens a paragraph costs, e.g. SentimentAnalyzer.count_tokens
+
+        Returns:
+            (results, stats) – results in document order with their original
+            paragraph_number; stats: scored, available, tokens, half_width, stopped
+            ("converged", "budget" or "exhausted")
+        """
+        order = list(range(len(paragraphs))) if order is None else list(order)
+        results, contributions = [], []
+        tokens, stopped, position = 0, "exhausted", 0
+
+        while position < len(order):
+            # Nächste Gruppe, solange das Token-Budget reicht
+            chunk = []
+            while position < len(order) and len(chunk) < self.step:
+                cost = count_tokens(paragraphs[order[position]])
+                if self.token_budget is not None and tokens + cost > self.token_budget:
+                    break
+                tokens += cost
+                chunk.append(order[position])
+                position += 1
+            if not chunk:
+                stopped = "budget"
+                break
+
+            for index, result in zip(chunk, score_fn([paragraphs[i] for i in chunk])):
+                result = dict(result, paragraph_number=index + 1)
+                results.append(result)
+                contributions.append(self.contribution(result))
+
+            if (len(results) >= self.min_paragraphs
+                    and self.half_width(contributions, len(paragraphs)) <= self.tolerance
+                    and position < len(order)):
+                stopped = "converged"
+                break
+
+        half_width = self.half_width(contributions, len(paragraphs))
+        stats = {
+            "scored": len(results),
+            "available": len(paragraphs),
+            "tokens": tokens,
+            "half_width": round(half_width, 3) if np.isfinite(half_width) else None,
+            "stopped": stopped,
+        }
+        return sorted(results, key=lambda r: r["paragraph_number"]), stats
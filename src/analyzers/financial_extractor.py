@@ -1,78 +1,196 @@
-from bs4 import BeautifulSoup
 from pathlib import Path
+from typing import Dict, List, Optional
 import re
 
+from src.utils.filing_store import open_filing
+from src.utils.parser_backend import parse_document
+
 class FinancialExtractor:
     """
     Extracts important numbers from the HTML/XML File and returns it
     Inputs:
         search_text (str): The text (or part of it) to search for inside <td> or <a> tags.
+
+    All tables are indexed in a single pass when the filing is loaded
+    (normalized row label → numeric cells), so metric lookups never walk
+    the document tree again.
     """
     
-    def __init__(self, filing_path: Path):
+    # Row labels per metric, tried in order (first label with values wins)
+    METRIC_LABELS = {
+        "net_sales":          ["Net sales", "Total net sales", "Revenue", "Total revenue"],
+        "total_assets":       ["Total assets"],
+        "total_liabilities":  ["Total liabilities"],
+        "shareholders_equity":["Stockholders' equity", "Total stockholders' equity", "Shareholders' equity"],
+        "net_income":         ["Net income", "Net earnings", "Net profit", "Net loss"],
+        "operating_income":   ["Operating income", "Income from operations"],
+        "gross_profit":       ["Gross profit"],
+        "cash_and_equivalents": ["Cash and cash equivalents"],
+    }
+
+    def __init__(self, filing_path: Path, synonyms: Optional[Dict[str, List[str]]] = None,
+                 backend: Optional[str] = None):
+        """
+        Args:
+            filing_path: Path to the filing (full-submission.txt or HTML)
+            synonyms: Additional row labels per metric, e.g. {"net_sales": ["Net revenues"]}
+            backend: Parser backend ("lxml" or "bs4", default: lxml)
+        """
         self.filing_path = filing_path
-        self.soup = None
+        self.backend = backend
+        self.document = None
+        self.synonyms = synonyms or {}
+        # normalized label → [{"table": table_no, "values": [...]}, ...]
+        self.table_index: Dict[str, List[Dict]] = {}
+        self._label_matches: Dict[str, List[str]] = {}
         self._load_filing()
+        self._build_table_index()
     
     def _load_filing(self):
         """Load and parse the HTML/XML filing."""
-        with open(self.filing_path, 'r', encoding='utf-8') as f:
+        with open_filing(self.filing_path) as f:
             content = f.read()
-        self.soup = BeautifulSoup(content, 'lxml')
-        print(f"✅ Loaded filing: {self.filing_path.name}")
+        self.document = parse_document(content, backend=self.backend)
+        print(f"✅ Loaded filing: {self.filing_path.name} ({self.document.backend})")
     
+    @staticmethod
+    def _normalize_label(text: str) -> str:
+        """Lowercase, unify apostrophes/whitespace and drop trailing colons."""
+        text = text.replace('’', "'").replace('\xa0', ' ')
+        return re.sub(r'\s+', ' ', text).strip().rstrip(':').strip().lower()
+
+    @staticmethod
+    def _parse_number(text: str) -> Optional[float]:
+        """Parse a numeric cell ("$ 1,234", "(56)" → -56); returns None for non-numeric text."""
+        cleaned = text.replace(',', '').strip()
+        cleaned = cleaned.replace('\xa0', '').replace('$', '').replace(' ', '')
+        negative = cleaned.startswith('(') and cleaned.endswith(')')
+        if negative:
+            cleaned = cleaned[1:-1]
+        try:
+            value = float(cleaned)
+        except ValueError:
+            return None
+        return -value if negative else value
+
+    @staticmethod
+    def _parse_period(text: str) -> Dict:
+        """Extract fiscal year and period length from a header cell ("Sep. 27, 2025", "12 Months Ended")."""
+        period = {}
+        years = re.findall(r'\b((?:19|20)\d{2})\b', text)
+        if years:
+            period["year"] = int(years[-1])
+        months = re.search(r'(\d+)\s+Months?\s+Ended', text, re.I)
+        if months:
+            period["months"] = int(months.group(1))
+        return period
+
+    def _build_table_index(self):
+        """
+        Walk every table row once and index it by its label cell(s).
+        Only <td class="nump"/"num"> cells are treated as values (SEC R-file layout).
+
+        Header rows are parsed into fiscal periods per column once per table
+        (colspan/rowspan aware); every value remembers its period, so
+        period-aware lookups cost no extra tree walk.
+        """
+        doc = self.document
+        tables = {}
+        for row in doc.find_all('tr'):
+            table = doc.ancestor(row, 'table')
+            state = tables.get(id(table))
+            if state is None:
+                # Referenz auf die Tabelle halten, damit id() eindeutig bleibt
+                state = tables[id(table)] = {"no": len(tables), "table": table, "spans": {}, "periods": {}}
+
+            # Spalten, die noch durch rowspan aus vorherigen Zeilen belegt sind
+            spans = state["spans"]
+            occupied = {c for c, r in spans.items() if r > 0}
+            for c in occupied:
+                spans[c] -= 1
+
+            values, periods, labels, header_cells = [], [], [], []
+            col = 0
+            for cell in doc.children(row, ['td', 'th']):
+                while col in occupied:
+                    col += 1
+                colspan = self._span(cell, 'colspan')
+                rowspan = self._span(cell, 'rowspan')
+                columns = range(col, col + colspan)
+                if rowspan > 1:
+                    for c in columns:
+                        spans[c] = rowspan - 1
+                col += colspan
+
+                text = doc.text(cell)
+                name = doc.tag_name(cell)
+                classes = (doc.attr(cell, 'class') or "").split()
+                if name == 'td' and 'nump' in classes:
+                    value = self._parse_number(text)
+                    if value is not None:
+                        values.append(value)
+                        periods.append(dict(state["periods"].get(columns[0], {})))
+                elif text:
+                    header_cells.append((columns, name, text))
+                    if name == 'td':
+                        labels.append(self._normalize_label(text))
+
+            # Kopfzeile: keine Werte, aber th-Zellen oder Jahreszahlen
+            if not values:
+                for columns, name, text in header_cells:
+                    period = self._parse_period(text)
+                    if period and (name == 'th' or "year" in period):
+                        for c in columns:
+                            state["periods"].setdefault(c, {}).update(period)
+                continue
+
+            for label in set(labels):
+                self.table_index.setdefault(label, []).append(
+                    {"table": state["no"], "values": values, "periods": periods}
+                )
+
+        print(f"Tabellen-Index: {len(tables)} Tabellen, {len(self.table_index)} Zeilen-Labels")
+
+    def _span(self, cell, attribute: str) -> int:
+        try:
+            return max(1, int(self.document.attr(cell, attribute) or 1))
+        except (TypeError, ValueError):
+            return 1
+
+    def _matching_labels(self, search_text: str) -> List[str]:
+        """Index labels containing search_text (case-insensitive), memoized per search text."""
+        needle = self._normalize_label(search_text)
+        if needle not in self._label_matches:
+            self._label_matches[needle] = [label for label in self.table_index if needle in label]
+        return self._label_matches[needle]
+
     def extract_metric(self, search_text: str) -> list:
         """
-        Searches for the search_text in <td> or <a> tags and returns the numbers 
-        from the <td class="nump"> elements in the same table row(s).
+        Looks up all table rows whose label contains search_text and returns the
+        numbers from the <td class="nump"> elements in those row(s).
 
         Args:
-            search_text (str): The text (or part of it) to search for inside <td> or <a> tags.
+            search_text (str): The text (or part of it) to search for in the row labels.
 
         Returns:
             List[float]: List of all numeric values found in <td class="nump"> cells 
                         of the matching rows.
         """
         results = []
-
-        for tag in self.soup.find_all(['td', 'a'], string=re.compile(re.escape(search_text), re.IGNORECASE)):
-            row = tag.find_parent('tr')
-            if not row:
-                continue
-            num_cells = row.find_all('td', class_='nump')
-
-            for cell in num_cells:
-                text = cell.get_text(strip=True)
-                cleaned = text.replace(',', '').strip()
-                cleaned = cleaned.replace('\xa0', '')
-
-                try:
-                    value = float(cleaned)
-                    results.append(value)
-                except ValueError:
-                    continue
-        
+        for label in self._matching_labels(search_text):
+            for row in self.table_index[label]:
+                results.extend(row["values"])
         return results
     
     def get_basic_metrics(self) -> dict:
         """
         Extract the most important financial metrics using multiple possible keywords.
+        User-defined synonyms are tried after the built-in labels.
         """
-        searches = {
-            "net_sales":          ["Net sales", "Total net sales", "Revenue", "Total revenue"],
-            "total_assets":       ["Total assets"],
-            "total_liabilities":  ["Total liabilities"],
-            "shareholders_equity":["Stockholders' equity", "Total stockholders' equity", "Shareholders' equity"],
-            "net_income":         ["Net income", "Net earnings", "Net profit", "Net loss"],
-            "operating_income":   ["Operating income", "Income from operations"],
-            "gross_profit":       ["Gross profit"],
-            "cash_and_equivalents": ["Cash and cash equivalents"],
-        }
-
         metrics = {}
 
-        for key, keywords in searches.items():
-            for keyword in keywords:
+        for key, keywords in self.METRIC_LABELS.items():
+            for keyword in keywords + self.synonyms.get(key, []):
                 values = self.extract_metric(keyword)
                 if values:
                     metrics[key] = values
@@ -82,15 +200,23 @@ class FinancialExtractor:
     def get_clean_metrics(self) -> dict:
         """
         Get cleaned, deduplicated financial metrics.
-        Takes the 3 LARGEST unique values (assumption: larger = annual data).
+        Uses the fiscal periods from the table headers (newest year first) when
+        available; otherwise falls back to the 3 LARGEST unique values
+        (assumption: larger = annual data).
         
         Returns:
             dict: Cleaned metrics with max 3 values per metric
         """
         raw_metrics = self.get_basic_metrics()
+        metrics_by_year = self.get_metrics_with_years()
         cleaned = {}
         
         for metric_name, values in raw_metrics.items():
+            by_year = metrics_by_year.get(metric_name)
+            if by_year:
+                cleaned[metric_name] = [by_year[year] for year in sorted(by_year, reverse=True)][:3]
+                continue
+
             unique_values = list(set(values))
             
             unique_values.sort(reverse=True)
@@ -106,11 +232,35 @@ class FinancialExtractor:
         """
         Extract metric values WITH their corresponding years.
         
+        Rows whose label equals search_text are preferred over rows that merely
+        contain it; per year the first annual (or point-in-time) value wins.
+        Quarterly columns ("3 Months Ended") are ignored.
+        
         Returns:
             dict: {year: value} mapping, e.g., {2025: 416161, 2024: 391035, ...}
+        """
+        needle = self._normalize_label(search_text)
+        labels = sorted(self._matching_labels(search_text), key=lambda label: label != needle)
         
-        TODO für später: Das werden wir in Phase 2 implementieren!
+        by_year = {}
+        for label in labels:
+            for row in self.table_index[label]:
+                for value, period in zip(row["values"], row["periods"]):
+                    year = period.get("year")
+                    if year is None or period.get("months", 12) != 12:
+                        continue
+                    by_year.setdefault(year, value)
+        return by_year
+
+    def get_metrics_with_years(self) -> Dict[str, Dict[int, float]]:
+        """
+        Period-aware variant of get_basic_metrics: {metric: {year: value}}.
         """
-        # Für jetzt: Return empty dict
-        # In Phase 2 werden wir die Table Headers parsen
-        return {}
\ No newline at end of file
+        metrics = {}
+        for key, keywords in self.METRIC_LABELS.items():
+            for keyword in keywords + self.synonyms.get(key, []):
+                by_year = self.extract_metric_with_years(keyword)
+                if by_year:
+                    metrics[key] = by_year
+                    break
+        return metrics
@@ -0,0 +1,165 @@
+"""
+iXBRL Numbers - Vectorised decoding of numeric facts
+
+An ix:nonFraction shows the number as formatted on the page; the actual value
+comes from its attributes:
+
+    value = (-1 if sign == "-") × parse(text, format) × 10^scale
+
+This module decodes a whole column of facts at once. The texts are laid out
+as a (facts × characters) code-point matrix and parsed with NumPy: digit
+masks, decimal-separator positions and place values, no Python loop per fact.
+
+Supported transformation formats (ixt, ixt-sec; legacy names included):
+    num-dot-decimal   1,234,567.89  (default, also for plain XBRL values)
+    num-comma-decimal 1.234.567,89
+    fixed-zero / zerodash           "—", "-" → 0
+    num-word (numwordsen)           "no", "none", "one" ... "twenty"
+    everything else                 NaN
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+COMMA_DECIMAL = {"numcommadecimal", "num-comma-decimal", "numspacecomma", "numdotcomma"}
+ZERO = {"zerodash", "fixed-zero", "fixedzero", "numzerodash"}
+WORDS = {"numwordsen", "num-word-en", "numwords", "num-word"}
+NUMBER_WORDS = {word: i for i, word in enumerate(
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen "
+    "fifteen sixteen seventeen eighteen nineteen twenty".split())}
+NUMBER_WORDS.update({"no": 0, "none": 0, "nil": 0})
+
+_DIGIT_0, _DIGIT_9 = ord("0"), ord("9")
+_MINUS, _OPEN_PAREN = ord("-"), ord("(")
+
+
+def format_name(fmt: Optional[str]) -> str:
+    """'ixt:num-dot-decimal' → 'num-dot-decimal' (prefix and case dropped)."""
+    return (fmt or "").split(":")[-1].strip().lower()
+
+
+def parse_numbers(texts: Sequence[str], decimal_comma: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Parse formatted numbers to floats, all at once.
+
+    Every character that is not a digit or the decimal separator is ignored
+    (thousands separators, currency symbols, spaces). A '-' before the first
+    digit or a '(' makes the value negative (plain XBRL / legacy text).
+
+    Args:
+        texts: Formatted numbers
+        decimal_comma: Bool per text – ',' is the decimal separator
+
+    Returns:
+        float64 array, NaN where a text contains no digit
+    """
+    n = len(texts)
+    if n == 0:
+        return np.empty(0)
+    chars = np.array(texts, dtype=str)
+    width = max(chars.dtype.itemsize // 4, 1)
+    codes = chars.view(np.uint32).reshape(n, width)  # UCS-4 Code Points, mit 0 aufgefüllt
+
+    digits = (codes >= _DIGIT_0) & (codes <= _DIGIT_9)
+    values = np.where(digits, codes.astype(np.int64) - _DIGIT_0, 0)
+    columns = np.arange(width)
+
+    separator = np.full(n, ord("."), dtype=np.uint32)
+    if decimal_comma is not None:
+        separator[np.asarray(decimal_comma, dtype=bool)] = ord(",")
+    is_separator = codes == separator[:, None]
+    # Erstes Dezimaltrennzeichen; ohne Trennzeichen liegt es hinter dem Ende
+    decimal_at = np.where(is_separator.any(axis=1), is_separator.argmax(axis=1), width)
+
+    # Alle Ziffern als ganzzahlige Mantisse, dann einmal durch 10^(Nachkommastellen):
+    # exakt bis 15 Stellen, statt pro Nachkommaziffer zu runden
+    fraction = digits & (columns > decimal_at[:, None])
+    place = np.cumsum(digits[:, ::-1], axis=1)[:, ::-1] - 1
+    powers = 10.0 ** np.arange(width + 1)  # Tabelle statt ** pro Zelle
+    mantissa = (values * powers[np.clip(place, 0, None)]).sum(axis=1)
+    result = mantissa / powers[fraction.sum(axis=1)]
+
+    first_digit = np.where(digits.any(axis=1), digits.argmax(axis=1), width)
+    negative = ((codes == _MINUS) & (columns < first_digit[:, None])).any(axis=1) | \
+               (codes == _OPEN_PAREN).any(axis=1)
+    result = np.where(negative, -result, result)
+    return np.where(digits.any(axis=1), result, np.nan)
+
+
+def decode_facts(texts: Sequence[str], formats: Optional[Sequence[Optional[str]]] = None,
+                 scales: Optional[Sequence[Optional[str]]] = None,
+                 signs: Optional[Sequence[Optional[str]]] = None) -> np.ndarray:
+    """
+    Decode ix:nonFraction facts (or plain XBRL values) to their actual values.
+
+    Args:
+        texts: Displayed text of each fact
+        formats: format attribute (None = num-dot-decimal)
+        scales: scale attribute, power of ten (None = 0)
+        signs: sign attribute ("-" negates)
+
+    Returns:
+        float64 array of values in the fact's unit (e.g. dollars), NaN if undecodable
+    """
+    n = len(texts)
+    # Attribute haben nur eine Handvoll verschiedener Werte: einmal je Wert auswerten
+    kinds = _codes(formats, n, _format_kind)
+    comma = kinds == _COMMA
+    values = parse_numbers([t or "" for t in texts], decimal_comma=comma)
+
+    values[kinds == _ZERO] = 0.0
+    # Zahlwörter sind selten, hier reicht eine Python-Schleife
+    for i in np.flatnonzero(kinds == _WORDS):
+        values[i] = NUMBER_WORDS.get(str(texts[i]).strip().lower(), np.nan)
+    values[kinds == _UNKNOWN] = np.nan
+
+    if scales is not None:
+        values = values * 10.0 ** _codes(scales, n, _to_int)
+    if signs is not None:
+        values = np.where(_codes(signs, n, lambda s: s == "-"), -values, values)
+    return values
+
+
+_DOT, _COMMA, _ZERO, _WORDS, _UNKNOWN = range(5)
+
+
+def _format_kind(fmt: Optional[str]) -> int:
+    name = format_name(fmt)
+    if name in ("", "numdotdecimal", "num-dot-decimal"):
+        return _DOT
+    if name in COMMA_DECIMAL:
+        return _COMMA
+    if name in ZERO:
+        return _ZERO
+    if name in WORDS:
+        return _WORDS
+    return _UNKNOWN
+
+
+def _codes(column: Optional[Sequence], n: int, convert) -> np.ndarray:
+    """Apply convert once per distinct attribute value and broadcast the results."""
+    if column is None:
+        return np.full(n, convert(None))
+    cache = {}
+    return np.array([cache[v] if v in cache else cache.setdefault(v, convert(v)) for v in column])
+
+
+def _to_int(value: Optional[str]) -> int:
+    try:
+        return int(value) if value not in (None, "") else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def to_millions(values: np.ndarray, monetary: np.ndarray) -> np.ndarray:
+    """Monetary values in millions (as stored by DataStorage); other units unchanged."""
+    return np.where(monetary, values / 1_000_000, values)
+
+
+def decode_number(text: str, fmt: Optional[str] = None, scale: Optional[str] = None,
+                  sign: Optional[str] = None) -> Optional[float]:
+    """Single-fact convenience wrapper around decode_facts (None if undecodable)."""
+    value = decode_facts([text], [fmt], [scale], [sign])[0]
+    return None if np.isnan(value) else float(value)
+
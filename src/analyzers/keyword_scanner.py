@@ -1,8 +1,16 @@
 import re
+import hashlib
+import json
 from typing import List, Dict
 from collections import Counter
 
 
+def categories_fingerprint(keyword_categories: Dict[str, List[str]]) -> str:
+    """Hash of a keyword dictionary (category → phrases)."""
+    payload = json.dumps(keyword_categories, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
 class KeywordScanner:
     """
     Scans risk text for critical keywords and phrases.
@@ -46,6 +54,12 @@ class KeywordScanner:
             pattern = r'\b(?:' + '|'.join(escaped) + r')\b'
             self.patterns[category] = re.compile(pattern, re.IGNORECASE)
 
+    def fingerprint(self) -> str:
+        """
+        Hash of the keyword dictionary – changes whenever the keyword list is updated.
+        """
+        return categories_fingerprint(self.keyword_categories)
+
     def scan_text(self, text: str) -> Dict[str, List[str]]:
         """
         Scan text for keywords in each category.
@@ -0,0 +1,149 @@
+"""
+Paragraph Deduplicator - Collapses near-identical paragraphs before FinBERT
+
+Risk sections repeat a lot of boilerplate, within one filing and across
+companies. Paragraphs are fingerprinted with SimHash; fingerprints within a
+small Hamming distance are treated as the same text, scored once and the
+scores are fanned back out to every occurrence.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.utils.text_hashing import hamming_distance, simhash
+
+
+class ParagraphDeduplicator:
+    """
+    SimHash-based near-duplicate detection with a score memory across calls.
+
+    The 64-bit fingerprint is split into (max_distance + 1) blocks; two
+    fingerprints within max_distance bits must agree exactly on at least one
+    block (pigeonhole), so lookups only compare against that block's bucket.
+
+    The memory is an LRU of near-duplicate groups: once more than max_groups
+    are known, the least recently seen groups and their scores are dropped
+    (long-running processes such as the AnalysisService keep one instance).
+
+    Args:
+        max_distance (int): Maximum Hamming distance for near-duplicates.
+        shingle_size (int): Words per SimHash feature.
+        max_groups (int): Near-duplicate groups (and their scores) kept in memory.
+    """
+
+    def __init__(self, max_distance: int = 6, shingle_size: int = 2, max_groups: int = 20_000):
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.num_blocks = max_distance + 1
+        self.block_bits = 64 // self.num_blocks
+        self.max_groups = max_groups
+
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+        self._groups: "OrderedDict[int, None]" = OrderedDict()  # Repräsentanten, zuletzt gesehene am Ende
+        self._scores: Dict[int, Dict] = {}  # fingerprint → Scores (bleibt über Ticker hinweg erhalten)
+        self.calls_saved = 0
+
+    def _blocks(self, fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << self.block_bits) - 1
+        return [(i, (fingerprint >> (i * self.block_bits)) & mask) for i in range(self.num_blocks)]
+
+    def _find(self, fingerprint: int) -> Optional[int]:
+        """Return a known fingerprint within max_distance, or None."""
+        for block in self._blocks(fingerprint):
+            for known in self._buckets.get(block, []):
+                if hamming_distance(known, fingerprint) <= self.max_distance:
+                    return known
+        return None
+
+    def _add(self, fingerprint: int):
+        for block in self._blocks(fingerprint):
+            self._buckets.setdefault(block, []).append(fingerprint)
+
+    def _evict(self):
+        """Drop the least recently seen groups beyond max_groups."""
+        while len(self._groups) > self.max_groups:
+            fingerprint, _ = self._groups.popitem(last=False)
+            self._scores.pop(fingerprint, None)
+            for block in self._blocks(fingerprint):
+                bucket = self._buckets[block]
+                bucket.remove(fingerprint)
+                if not bucket:
+                    del self._buckets[block]
+
+    def _representative(self, paragraph: str) -> int:
+        """Fingerprint of the near-duplicate group the paragraph belongs to."""
+        fp = simhash(paragraph, self.shingle_size)
+        representative = self._find(fp)
+        if representative is None:
+            self._add(fp)
+            representative = fp
+        self._groups[representative] = None
+        self._groups.move_to_end(representative)
+        return representative
+
+    def collapse(self, paragraphs: List[str]) -> Tuple[List[str], List[int]]:
+        """
+        Collapse near-identical paragraphs.
+
+        Returns:
+            (unique_paragraphs, mapping) – mapping[i] is the index of paragraph i
+            in unique_paragraphs.
+        """
+        unique, mapping, seen = [], [], {}
+        for para in paragraphs:
+            representative = self._representative(para)
+            if representative not in seen:
+                seen[representative] = len(unique)
+                unique.append(para)
+            mapping.append(seen[representative])
+        self._evict()
+        return unique, mapping
+
+    def analyze(self, paragraphs: List[str],
+                score_fn: Callable[[List[str]], List[Dict]]) -> List[Dict]:
+        """
+        Score paragraphs with score_fn, sending each near-duplicate group only once.
+        Groups already scored in an earlier call (e.g. another ticker) are not sent at all.
+
+        Args:
+            paragraphs: Risk paragraphs in original order
+            score_fn: Scoring function, e.g. SentimentAnalyzer.analyze_risks
+
+        Returns:
+            One result per input paragraph (analyze_risks format, original numbering)
+        """
+        fingerprints = [self._representative(para) for para in paragraphs]
+
+        # Jede neue Gruppe genau einmal bewerten
+        pending = {}
+        for fp, para in zip(fingerprints, paragraphs):
+            if fp not in self._scores and fp not in pending:
+                pending[fp] = para
+        if pending:
+            for fp, scores in zip(pending, score_fn(list(pending.values()))):
+                self._scores[fp] = scores
+
+        self.calls_saved += len(paragraphs) - len(pending)
+        print(f"Deduplizierung: {len(pending)} von {len(paragraphs)} Absätzen an FinBERT gesendet")
+
+        results = []
+        for i, (fp, para) in enumerate(zip(fingerprints, paragraphs)):
+            scores = self._scores[fp]
+            preview = para.strip().replace("\n", " ")[:100]
+            if len(para) > 100:
+                preview += "..."
+            result = {
+                "paragraph_number": i + 1,
+                "text_preview": preview,
+                "positive": scores["positive"],
+                "negative": scores["negative"],
+                "neutral":  scores["neutral"],
+                "sentiment": scores["sentiment"]
+            }
+            # Embedding des Repräsentanten (nur wenn mit return_embeddings bewertet)
+            if "embedding" in scores:
+                result["embedding"] = scores["embedding"]
+            results.append(result)
+        # Erst nach dem Auffächern: Gruppen dieses Aufrufs werden gebraucht
+        self._evict()
+        return results
@@ -0,0 +1,221 @@
+"""
+Peer Scoring - Cross-sectional risk scoring over many scored filings
+
+Keeps the paragraph probabilities of every scored filing in flat NumPy
+arrays (one row per paragraph, offsets per filing). Re-scoring the whole
+universe after a weighting change is a handful of vectorised passes
+instead of a FinBERT re-run.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .keyword_scanner import KeywordScanner
+
+# Spaltenreihenfolge der Wahrscheinlichkeiten = FinBERT-Labelreihenfolge
+PROB_COLUMNS = ["positive", "negative", "neutral"]
+
+
+class PeerRiskStore:
+    """
+    Columnar store of paragraph sentiment probabilities for many filings.
+
+    Args:
+        categories (list): Keyword categories stored per filing
+            (defaults to the KeywordScanner categories).
+    """
+
+    def __init__(self, categories: Optional[List[str]] = None):
+        self.categories = list(categories or KeywordScanner().keyword_categories)
+        self.filing_ids: List[str] = []
+        self.tickers: List[str] = []
+        self.sectors: List[str] = []
+        self._probs: List[np.ndarray] = []        # je Filing: (n_paragraphs, 3)
+        self._category_counts: List[np.ndarray] = []  # je Filing: (n_categories,)
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return len(self.filing_ids)
+
+    def add_filing(self, ticker: str, sentiment_results: List[Dict],
+                   keyword_results: Optional[Dict] = None, sector: Optional[str] = None,
+                   filing_id: Optional[str] = None):
+        """
+        Add (or replace) the scored paragraphs of one filing.
+
+        Args:
+            ticker: Company ticker
+            sentiment_results: Output of SentimentAnalyzer.analyze_risks
+            keyword_results: Output of KeywordScanner.scan_risks (for category weights)
+            sector: Peer group, e.g. SIC code or sector name (default: "ALL")
+            filing_id: Unique id such as the accession number (default: ticker)
+        """
+        filing_id = filing_id or ticker.upper()
+        if filing_id in self.filing_ids:
+            self._remove(self.filing_ids.index(filing_id))
+
+        probs = np.array([[r[c] for c in PROB_COLUMNS] for r in sentiment_results],
+                         dtype=np.float32).reshape(-1, len(PROB_COLUMNS))
+        by_category = (keyword_results or {}).get("by_category", {})
+        counts = np.array([by_category.get(c, 0) for c in self.categories], dtype=np.float32)
+
+        self.filing_ids.append(filing_id)
+        self.tickers.append(ticker.upper())
+        self.sectors.append(sector or "ALL")
+        self._probs.append(probs)
+        self._category_counts.append(counts)
+        self._arrays = None
+
+    def _remove(self, index: int):
+        for column in (self.filing_ids, self.tickers, self.sectors, self._probs, self._category_counts):
+            del column[index]
+        self._arrays = None
+
+    def set_sectors(self, sectors: Dict[str, str]):
+        """Assign peer groups by ticker (e.g. after loading a sector mapping)."""
+        self.sectors = [sectors.get(t, s) for t, s in zip(self.tickers, self.sectors)]
+        self._arrays = None
+
+    def _consolidate(self) -> Dict[str, np.ndarray]:
+        """Concatenate the per-filing buffers once; cached until the store changes."""
+        if self._arrays is None:
+            lengths = np.array([len(p) for p in self._probs], dtype=np.int64)
+            self._arrays = {
+                "probs": (np.concatenate(self._probs) if self._probs
+                          else np.empty((0, len(PROB_COLUMNS)), dtype=np.float32)),
+                "offsets": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                "lengths": lengths,
+                "category_counts": (np.stack(self._category_counts) if self._category_counts
+                                    else np.empty((0, len(self.categories)), dtype=np.float32)),
+            }
+        return self._arrays
+
+    def score(self, weights: Optional[Dict[str, float]] = None,
+              category_weights: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Score every filing and rank it against its peer group.
+
+        Args:
+            weights: Per-probability weights (default: SentimentAnalyzer.SCORE_WEIGHTS)
+            category_weights: Multiplier per keyword category; a filing's multiplier is
+                the keyword-share-weighted average (missing categories count as 1.0)
+
+        Returns:
+            dict of arrays aligned with filing_ids: 'absolute_score' (same as
+            get_overall_risk_score), 'weighted_score', 'peer_zscore', 'peer_percentile'
+        """
+        if weights is None:
+            from .sentiment_analyzer import SentimentAnalyzer
+            weights = SentimentAnalyzer.SCORE_WEIGHTS
+
+        arrays = self._consolidate()
+        n_filings = len(self)
+        if n_filings == 0:
+            empty = np.empty(0, dtype=np.float64)
+            return {"absolute_score": empty, "weighted_score": empty,
+                    "peer_zscore": empty, "peer_percentile": empty}
+
+        # 1. Absolutscore: Mittelwert je Filing, dann gewichtete Summe (= get_overall_risk_score)
+        lengths = arrays["lengths"]
+        non_empty = lengths > 0
+        sums = np.zeros((n_filings, len(PROB_COLUMNS)), dtype=np.float64)
+        if arrays["probs"].shape[0]:
+            sums[non_empty] = np.add.reduceat(arrays["probs"].astype(np.float64),
+                                              arrays["offsets"][:-1][non_empty], axis=0)
+        means = sums / np.maximum(lengths, 1)[:, None]
+        w = np.array([weights[c] for c in PROB_COLUMNS], dtype=np.float64)
+        absolute = np.where(non_empty, np.clip(means @ w, 0, 100), 0.0)
+
+        # 2. Kategorie-Gewichtung über Keyword-Anteile
+        cw = np.array([(category_weights or {}).get(c, 1.0) for c in self.categories], dtype=np.float64)
+        counts = arrays["category_counts"].astype(np.float64)
+        totals = counts.sum(axis=1)
+        shares = counts / np.where(totals > 0, totals, 1)[:, None]
+        multiplier = np.where(totals > 0, shares @ cw, 1.0)
+        weighted = np.clip(absolute * multiplier, 0, 100)
+
+        # 3. Peer-Statistik je Sektor
+        _, group_index = np.unique(np.array(self.sectors), return_inverse=True)
+        group_count = np.bincount(group_index).astype(np.float64)
+        group_mean = np.bincount(group_index, weights=weighted) / group_count
+        group_var = np.bincount(group_index, weights=weighted ** 2) / group_count - group_mean ** 2
+        group_std = np.sqrt(np.maximum(group_var, 0))
+        std = group_std[group_index]
+        zscore = np.where(std > 0, (weighted - group_mean[group_index]) / np.where(std > 0, std, 1), 0.0)
+
+        # Perzentil (mid-rank bei Gleichstand) über sortierten Schlüssel (Gruppe, Score)
+        span = weighted.max() - weighted.min() + 1.0
+        key = group_index * span + (weighted - weighted.min())
+        sorted_key = np.sort(key)
+        left = np.searchsorted(sorted_key, key, side='left')
+        right = np.searchsorted(sorted_key, key, side='right')
+        group_start = np.searchsorted(sorted_key, group_index * span, side='left')
+        percentile = (left - group_start + 0.5 * (right - left)) / group_count[group_index] * 100
+
+        return {
+            "absolute_score": absolute,
+            "weighted_score": weighted,
+            "peer_zscore": zscore,
+            "peer_percentile": percentile,
+        }
+
+    def ranking(self, **score_kwargs) -> List[Dict]:
+        """Scores as rows, riskiest first (weighted score)."""
+        scores = self.score(**score_kwargs)
+        rows = [
+            {"filing_id": f, "ticker": t, "sector": s,
+             **{name: round(float(values[i]), 2) for name, values in scores.items()}}
+            for i, (f, t, s) in enumerate(zip(self.filing_ids, self.tickers, self.sectors))
+        ]
+        return sorted(rows, key=lambda r: r["weighted_score"], reverse=True)
+
+    def save(self, path: Path) -> Path:
+        """Save the store as a single .npz file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = self._consolidate()
+        meta = {"categories": self.categories, "filing_ids": self.filing_ids,
+                "tickers": self.tickers, "sectors": self.sectors}
+        # Temp-Datei + rename, damit ein Abbruch den Store nicht beschädigt
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, probs=arrays["probs"], offsets=arrays["offsets"],
+                                category_counts=arrays["category_counts"],
+                                meta=np.array(json.dumps(meta)))
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "PeerRiskStore":
+        """Load a store written by save(); returns an empty store if the file is missing."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            store = cls(categories=meta["categories"])
+            offsets = data["offsets"]
+            probs = data["probs"]
+            store._probs = [probs[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            store._category_counts = list(data["category_counts"])
+        store.filing_ids = meta["filing_ids"]
+        store.tickers = meta["tickers"]
+        store.sectors = meta["sectors"]
+        return store
+
+    @classmethod
+    def from_results(cls, results: List[Dict], sectors: Optional[Dict[str, str]] = None) -> "PeerRiskStore":
+        """Build a store from RiskReporter result documents (risk_results.jsonl)."""
+        store = cls()
+        for result in results:
+            store.add_filing(
+                ticker=result["ticker"],
+                sentiment_results=result["paragraphs"],
+                keyword_results=result.get("keywords"),
+                sector=(sectors or {}).get(result["ticker"]),
+                filing_id=result.get("metadata", {}).get("accession") or result["ticker"],
+            )
+        return store
@@ -0,0 +1,190 @@
+"""
+Ratio Engine - Derived financial ratios over the metrics store
+
+Ratios are declared once as plain data and computed for all tickers and
+fiscal years at the same time (column arithmetic on a ticker × year table,
+no loop per company):
+
+    "gross_margin":   {"numerator": "gross_profit", "denominator": "net_sales"}
+    "revenue_growth": {"growth": "net_sales"}          # YoY, vs. fiscal year - 1
+
+Results are kept in a long-format ratio store next to the MetricsStore
+(one row per ticker, fiscal year and ratio). update() only recomputes the
+(ticker, fiscal year) cells touched by new metric records, plus the following
+year whose growth rates use them as the base.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Kennzahl → Definition; Metriken wie in XBRLExtractor.XBRL_TAGS (Millionen USD)
+RATIOS = {
+    "gross_margin": {"numerator": "gross_profit", "denominator": "net_sales"},
+    "operating_margin": {"numerator": "operating_income", "denominator": "net_sales"},
+    "net_margin": {"numerator": "net_income", "denominator": "net_sales"},
+    # Ohne eigene Finanzschulden-Metrik: Verbindlichkeiten gesamt / Eigenkapital
+    "debt_to_equity": {"numerator": "total_liabilities", "denominator": "shareholders_equity"},
+    "return_on_assets": {"numerator": "net_income", "denominator": "total_assets"},
+    "return_on_equity": {"numerator": "net_income", "denominator": "shareholders_equity"},
+    "revenue_growth": {"growth": "net_sales"},
+    "net_income_growth": {"growth": "net_income"},
+}
+
+
+class RatioEngine:
+    """
+    Computes declared ratios from MetricsStore rows and keeps them in a ratio store.
+
+    Args:
+        path (str): Ratio store file (CSV, or Parquet if the path ends in .parquet).
+        ratios (dict): Ratio name → definition (default: RATIOS). A definition is either
+            {"numerator": metric, "denominator": metric} or {"growth": metric}.
+    """
+
+    COLUMNS = ['ticker', 'fiscal_year', 'period_end', 'ratio_name', 'value', 'definition']
+    KEY = ['ticker', 'fiscal_year', 'ratio_name']
+
+    def __init__(self, path: str = "data/processed/metrics/ratios_store.csv",
+                 ratios: Optional[Dict[str, Dict[str, str]]] = None):
+        self.path = Path(path)
+        self.ratios = ratios or RATIOS
+        for name, spec in self.ratios.items():
+            if "growth" not in spec and not {"numerator", "denominator"} <= set(spec):
+                raise ValueError(f"Kennzahl '{name}': 'growth' oder 'numerator' + 'denominator' angeben")
+
+    def fingerprint(self, name: str) -> str:
+        """Hash of one ratio definition; stored with every value to detect changed definitions."""
+        payload = json.dumps(self.ratios[name], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+    # ── Berechnung ──────────────────────────────────────────────────────────
+    def compute(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        """
+        All ratios for every (ticker, fiscal year) in the metrics rows.
+
+        Growth rates need the previous fiscal year in `metrics`; a negative or
+        zero base, a zero denominator or a missing metric give no row.
+        """
+        if metrics.empty:
+            return pd.DataFrame(columns=self.COLUMNS)
+        # Ein Wert je (Ticker, Metrik, Geschäftsjahr): der späteste Stichtag
+        latest = (metrics.sort_values('period_end')
+                  .drop_duplicates(['ticker', 'metric_name', 'fiscal_year'], keep='last'))
+        latest = latest.assign(fiscal_year=latest['fiscal_year'].astype(int),
+                               value=latest['value'].astype(float))
+        wide = latest.pivot(index=['ticker', 'fiscal_year'], columns='metric_name', values='value')
+        # Nach period_end sortiert: letzter Eintrag je Zeile = spätester Stichtag (ohne Python-Aggregation)
+        period_end = (latest.drop_duplicates(['ticker', 'fiscal_year'], keep='last')
+                      .set_index(['ticker', 'fiscal_year'])['period_end'])
+
+        # Vorjahr derselben Zeile: Index um ein Geschäftsjahr verschieben und ausrichten
+        previous = wide.copy()
+        previous.index = pd.MultiIndex.from_arrays(
+            [wide.index.get_level_values('ticker'), wide.index.get_level_values('fiscal_year') + 1],
+            names=wide.index.names)
+        previous = previous.reindex(wide.index)
+
+        def column(frame: pd.DataFrame, metric: str) -> pd.Series:
+            return frame[metric] if metric in frame else pd.Series(np.nan, index=frame.index)
+
+        values = {}
+        for name, spec in self.ratios.items():
+            if "growth" in spec:
+                current, base = column(wide, spec["growth"]), column(previous, spec["growth"])
+                values[name] = (current / base.where(base > 0)) - 1
+            else:
+                denominator = column(wide, spec["denominator"])
+                values[name] = column(wide, spec["numerator"]) / denominator.where(denominator != 0)
+
+        table = pd.DataFrame(values, index=wide.index)
+        result = table.stack(future_stack=True).rename('value').reset_index()
+        result.columns = ['ticker', 'fiscal_year', 'ratio_name', 'value']
+        result = result[np.isfinite(result['value'])]
+        result['period_end'] = period_end.reindex(
+            pd.MultiIndex.from_frame(result[['ticker', 'fiscal_year']])).to_numpy()
+        result['definition'] = result['ratio_name'].map({name: self.fingerprint(name) for name in self.ratios})
+        return result[self.COLUMNS].reset_index(drop=True)
+
+    # ── Ratio-Store ─────────────────────────────────────────────────────────
+    def load(self) -> pd.DataFrame:
+        if not self.path.exists():
+            return pd.DataFrame(columns=self.COLUMNS)
+        if self.path.suffix == ".parquet":
+            return pd.read_parquet(self.path)
+        return pd.read_csv(self.path, dtype={'definition': str})
+
+    def _save(self, ratios: pd.DataFrame):
+        ratios = ratios.sort_values(self.KEY).reset_index(drop=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix == ".parquet":
+            ratios.to_parquet(self.path, index=False)
+        else:
+            ratios.to_csv(self.path, index=False)
+
+    def rebuild(self, metrics: pd.DataFrame) -> int:
+        """Recompute every ratio from the full metrics table. Returns the number of ratio rows."""
+        ratios = self.compute(metrics)
+        self._save(ratios)
+        return len(ratios)
+
+    @staticmethod
+    def touched(records: Iterable[Dict]) -> Set[Tuple[str, int]]:
+        """(ticker, fiscal year) cells affected by new metric records (incl. the next year's growth)."""
+        cells = set()
+        for record in records:
+            year = int(record["fiscal_year"])
+            cells.update({(record["ticker"], year), (record["ticker"], year + 1)})
+        return cells
+
+    def update(self, metrics: pd.DataFrame, records: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Recompute only the cells touched by `records` (already upserted into `metrics`).
+
+        Falls back to a full rebuild when there is no ratio store yet, or when
+        ratios were added, removed or redefined since the store was written –
+        otherwise cells not touched by `records` would stay missing or stale.
+
+        Returns:
+            {"recomputed": rows written for touched cells, "total": rows in the store}
+        """
+        existing = self.load()
+        current = {name: self.fingerprint(name) for name in self.ratios}
+        stored = dict(zip(existing['ratio_name'], existing['definition'].astype(str)))
+        if existing.empty or set(stored) != set(current) or any(stored[name] != fp for name, fp in current.items()):
+            if existing.empty:
+                print("Kein Ratio-Store vorhanden – wird komplett berechnet")
+            else:
+                print("Kennzahl-Definitionen geändert – Ratio-Store wird komplett neu berechnet")
+            total = self.rebuild(metrics)
+            return {"recomputed": total, "total": total}
+
+        cells = self.touched(records)
+        if not cells:
+            return {"recomputed": 0, "total": len(existing)}
+        # Nur die betroffenen Zellen und ihre Vorjahre aus dem Store rechnen
+        needed = cells | {(ticker, year - 1) for ticker, year in cells}
+        keys = pd.MultiIndex.from_frame(metrics[['ticker', 'fiscal_year']].astype({'fiscal_year': int}))
+        subset = metrics[keys.isin(list(needed))]
+        fresh = self.compute(subset)
+        fresh = fresh[pd.MultiIndex.from_frame(fresh[['ticker', 'fiscal_year']]).isin(list(cells))]
+
+        if existing.empty:
+            kept = existing
+        else:
+            existing_keys = pd.MultiIndex.from_frame(existing[['ticker', 'fiscal_year']].astype({'fiscal_year': int}))
+            kept = existing[~existing_keys.isin(list(cells))]
+        combined = pd.concat([kept, fresh], ignore_index=True) if not kept.empty else fresh
+        self._save(combined)
+        return {"recomputed": len(fresh), "total": len(combined)}
+
+    def table(self, tickers: Optional[List[str]] = None) -> pd.DataFrame:
+        """Wide view of the ratio store: one row per (ticker, fiscal year), one column per ratio."""
+        ratios = self.load()
+        if tickers:
+            ratios = ratios[ratios['ticker'].isin([t.upper() for t in tickers])]
+        return ratios.pivot_table(index=['ticker', 'fiscal_year'], columns='ratio_name', values='value')
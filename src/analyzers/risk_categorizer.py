@@ -0,0 +1,219 @@
+"""
+Risk Categorizer - Semantic risk categories from FinBERT embeddings
+
+The keyword scanner only tags a paragraph when one of its exact phrases
+occurs. This categoriser assigns every paragraph to the nearest of the same
+keyword_categories in FinBERT's embedding space, so a paragraph about
+"threat actors encrypting our systems" lands in "cybersecurity" without
+containing a keyword.
+
+Centroids are seeded from the embedded keyword phrases of each category and
+kept in one .npz file. Analysis runs only read them, so a paragraph's
+category does not depend on which filings were analysed before. Refining
+them with paragraphs the keyword scanner labels unambiguously (weak
+supervision) is a separate step:
+
+    python main.py categories refine AAPL MSFT NVDA
+
+Every centroid state has a version (hash of sums, counts and model); it is
+part of the sentiment cache key, so cached categories always match the
+centroids they were computed with.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.analyzers.keyword_scanner import categories_fingerprint
+
+
+class EmbeddingCategorizer:
+    """
+    Nearest-centroid classifier over pooled FinBERT embeddings.
+
+    Args:
+        categories (dict): Category → keyword phrases (default: KeywordScanner.keyword_categories).
+        min_similarity (float): At or below this cosine similarity a paragraph stays uncategorised.
+    """
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None, min_similarity: float = 0.0):
+        if categories is None:
+            from src.analyzers.keyword_scanner import KeywordScanner
+            categories = KeywordScanner().keyword_categories
+        self.keyword_categories = categories
+        self.categories = list(categories)
+        self.min_similarity = min_similarity
+        self.model = None
+        # Summe und Anzahl der Embeddings je Kategorie (Zentroid = Summe / Anzahl)
+        self._sums: Optional[np.ndarray] = None
+        self._counts = np.zeros(len(self.categories), dtype=np.int64)
+
+    def fingerprint(self) -> str:
+        """Hash of the category phrases; stored centroids are discarded when it changes."""
+        return categories_fingerprint(self.keyword_categories)
+
+    def version(self) -> str:
+        """Hash of the current centroid state (phrases, model, sums and counts)."""
+        if self._sums is None:
+            raise RuntimeError("Zentroiden nicht initialisiert – zuerst fit_seeds() aufrufen")
+        digest = hashlib.sha256(f"{self.fingerprint()}:{self.model}".encode('utf-8'))
+        digest.update(np.ascontiguousarray(self._sums, dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(self._counts, dtype=np.int64).tobytes())
+        return digest.hexdigest()[:16]
+
+    @property
+    def fitted(self) -> bool:
+        return self._sums is not None and bool(self._counts.all())
+
+    def fit_seeds(self, embed_fn: Callable[[List[str]], np.ndarray], model: Optional[str] = None):
+        """
+        Seed each centroid with the embeddings of its keyword phrases.
+
+        Args:
+            embed_fn: Texts → (n, dim) array, e.g. SentimentAnalyzer.embed
+            model: Name of the embedding model (stored with the centroids)
+        """
+        phrases = [(i, phrase) for i, cat in enumerate(self.categories)
+                   for phrase in self.keyword_categories[cat]]
+        embeddings = np.asarray(embed_fn([phrase for _, phrase in phrases]), dtype=np.float64)
+        self._sums = np.zeros((len(self.categories), embeddings.shape[1]))
+        self._counts[:] = 0
+        np.add.at(self._sums, [i for i, _ in phrases], self._normalize(embeddings))
+        np.add.at(self._counts, [i for i, _ in phrases], 1)
+        self.model = model
+
+    def refine(self, embeddings: np.ndarray, labels: List[List[str]]) -> int:
+        """
+        Refine the centroids with keyword-labelled paragraphs (explicit step, never during analysis).
+
+        Only paragraphs with exactly one keyword category are used – mixed
+        paragraphs would pull centroids towards each other.
+
+        Args:
+            embeddings: (n, dim) paragraph embeddings
+            labels: Keyword categories found in each paragraph (KeywordScanner.scan_text keys)
+
+        Returns:
+            Number of paragraphs added to a centroid
+        """
+        if self._sums is None:
+            raise RuntimeError("Zentroiden nicht initialisiert – zuerst fit_seeds() aufrufen")
+        index = {cat: i for i, cat in enumerate(self.categories)}
+        rows = [(row, index[found[0]]) for row, found in enumerate(labels)
+                if len(found) == 1 and found[0] in index]
+        if not rows:
+            return 0
+        normalized = self._normalize(np.asarray(embeddings, dtype=np.float64))
+        np.add.at(self._sums, [c for _, c in rows], normalized[[r for r, _ in rows]])
+        np.add.at(self._counts, [c for _, c in rows], 1)
+        return len(rows)
+
+    def centroids(self) -> np.ndarray:
+        """Unit-length centroid per category, shape (n_categories, dim)."""
+        return self._normalize(self._sums / np.maximum(self._counts, 1)[:, None])
+
+    def categorize(self, embeddings: np.ndarray) -> List[Dict]:
+        """
+        Assign each embedding to the most similar centroid.
+
+        Returns:
+            One dict per row: semantic_category (None at or below min_similarity), category_similarity
+        """
+        if not self.fitted:
+            raise RuntimeError("Zentroiden nicht initialisiert – zuerst fit_seeds() aufrufen")
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        if len(embeddings) == 0:
+            return []
+        similarity = self._normalize(embeddings) @ self.centroids().T
+        best = similarity.argmax(axis=1)
+        scores = similarity[np.arange(len(best)), best]
+        return [{
+            "semantic_category": self.categories[b] if s > self.min_similarity else None,
+            "category_similarity": round(float(s), 4),
+        } for b, s in zip(best, scores)]
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    # ── Persistenz ──────────────────────────────────────────────────────────
+    def save(self, path: Path) -> Path:
+        """Save the centroid sums and counts as a single .npz file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"categories": self.categories, "fingerprint": self.fingerprint(), "model": self.model,
+                "version": self.version()}
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, sums=self._sums, counts=self._counts, meta=np.array(json.dumps(meta)))
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, categories: Optional[Dict[str, List[str]]] = None,
+             model: Optional[str] = None, **kwargs) -> "EmbeddingCategorizer":
+        """
+        Load centroids written by save(). Returns an unfitted categoriser if the
+        file is missing or was built for other categories or another model.
+        """
+        categorizer = cls(categories, **kwargs)
+        path = Path(path)
+        if not path.exists():
+            return categorizer
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["fingerprint"] != categorizer.fingerprint() or (model and meta["model"] != model):
+                print("Kategorie-Zentroiden veraltet (Keywords/Modell geändert) – werden neu erstellt")
+                return categorizer
+            categorizer._sums = data["sums"]
+            categorizer._counts = data["counts"]
+        categorizer.model = meta["model"]
+        return categorizer
+
+
+def refine_from_paragraphs(categorizer: EmbeddingCategorizer, paragraphs: List[str],
+                           embed_fn: Callable[[List[str]], np.ndarray], keyword_scanner) -> int:
+    """
+    Refine the centroids with the paragraphs the keyword scanner labels unambiguously.
+
+    Only those paragraphs are embedded. Returns the number of paragraphs used.
+    """
+    labelled = [(text, list(keyword_scanner.scan_text(text))) for text in paragraphs]
+    labelled = [(text, found) for text, found in labelled if len(found) == 1]
+    if not labelled:
+        return 0
+    embeddings = embed_fn([text for text, _ in labelled])
+    return categorizer.refine(embeddings, [found for _, found in labelled])
+
+
+def apply_categories(results: List[Dict], categorizer: EmbeddingCategorizer) -> Dict[str, int]:
+    """
+    Categorise scored paragraphs in place and drop their embeddings.
+
+    Paragraphs with an "embedding" (newly scored) are assigned a
+    semantic_category / category_similarity; the centroids are not changed.
+    Results without one (e.g. copied from last year's filing) keep their fields.
+
+    Args:
+        results: SentimentAnalyzer.analyze_risks output (return_embeddings=True)
+
+    Returns:
+        Number of paragraphs per semantic category
+    """
+    rows = [i for i, r in enumerate(results) if "embedding" in r]
+    if rows:
+        embeddings = np.stack([results[i]["embedding"] for i in rows])
+        for i, assignment in zip(rows, categorizer.categorize(embeddings)):
+            results[i].update(assignment)
+    for r in results:
+        r.pop("embedding", None)
+
+    counts = {}
+    for r in results:
+        if r.get("semantic_category"):
+            counts[r["semantic_category"]] = counts.get(r["semantic_category"], 0) + 1
+    return counts
@@ -0,0 +1,149 @@
+"""
+Risk Differ - Year-over-year comparison of 10-K risk factor paragraphs
+
+Paragraphs of two filings are aligned with MinHash + LSH banding, so only
+candidate pairs that share a band are compared (sub-quadratic instead of
+comparing every old paragraph with every new one).
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from src.utils.text_hashing import MinHasher, jaccard, shingles
+
+OPTIONAL_FIELDS = ("embedding", "semantic_category", "category_similarity")
+
+
+class RiskDiffer:
+    """
+    Classifies the risk paragraphs of a new filing against the previous filing
+    as unchanged, modified, added or removed.
+
+    Args:
+        num_perm (int): MinHash signature length.
+        bands (int): Number of LSH bands (num_perm must be divisible by bands).
+        shingle_size (int): Words per shingle.
+        match_threshold (float): Minimum Jaccard similarity to align two paragraphs.
+        unchanged_threshold (float): Similarity from which a pair counts as unchanged.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, shingle_size: int = 5,
+                 match_threshold: float = 0.3, unchanged_threshold: float = 0.9):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.match_threshold = match_threshold
+        self.unchanged_threshold = unchanged_threshold
+
+    def diff(self, old_paragraphs: List[str], new_paragraphs: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Align the paragraphs of two filings.
+
+        Returns:
+            dict with lists 'unchanged', 'modified' (old_index, new_index, similarity),
+            'added' (new_index) and 'removed' (old_index). Indices are 0-based.
+        """
+        old_shingles = [shingles(p, self.shingle_size) for p in old_paragraphs]
+        new_shingles = [shingles(p, self.shingle_size) for p in new_paragraphs]
+
+        # LSH-Index über die alten Absätze
+        buckets = defaultdict(set)
+        for i, sh in enumerate(old_shingles):
+            for key in self.hasher.band_keys(self.hasher.signature(sh), self.bands):
+                buckets[key].add(i)
+
+        # Kandidatenpaare nur aus gemeinsamen Buckets, exakte Jaccard-Ähnlichkeit
+        pairs = []
+        for j, sh in enumerate(new_shingles):
+            candidates = set()
+            for key in self.hasher.band_keys(self.hasher.signature(sh), self.bands):
+                candidates |= buckets.get(key, set())
+            for i in candidates:
+                similarity = jaccard(old_shingles[i], sh)
+                if similarity >= self.match_threshold:
+                    pairs.append((similarity, i, j))
+
+        # Greedy 1:1-Zuordnung, beste Ähnlichkeit zuerst
+        pairs.sort(key=lambda p: (-p[0], p[2], p[1]))
+        matched_old, matched_new = set(), set()
+        unchanged, modified = [], []
+        for similarity, i, j in pairs:
+            if i in matched_old or j in matched_new:
+                continue
+            matched_old.add(i)
+            matched_new.add(j)
+            entry = {"old_index": i, "new_index": j, "similarity": round(similarity, 4)}
+            (unchanged if similarity >= self.unchanged_threshold else modified).append(entry)
+
+        return {
+            "unchanged": sorted(unchanged, key=lambda e: e["new_index"]),
+            "modified": sorted(modified, key=lambda e: e["new_index"]),
+            "added": [{"new_index": j} for j in range(len(new_paragraphs)) if j not in matched_new],
+            "removed": [{"old_index": i} for i in range(len(old_paragraphs)) if i not in matched_old],
+        }
+
+    def changed_indices(self, diff: Dict[str, List[Dict]]) -> List[int]:
+        """New-paragraph indices that need (re-)scoring: added + modified."""
+        return sorted([e["new_index"] for e in diff["added"]] +
+                      [e["new_index"] for e in diff["modified"]])
+
+    def score_changes(self, diff: Dict[str, List[Dict]], new_paragraphs: List[str],
+                      analyzer, previous_results: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Score only added/modified paragraphs with the SentimentAnalyzer and reuse
+        the previous year's scores for unchanged ones.
+
+        Args:
+            diff: Output of diff()
+            new_paragraphs: Paragraphs of the new filing
+            analyzer: SentimentAnalyzer instance
+            previous_results: analyze_risks output of the previous filing
+                (without it, unchanged paragraphs are scored as well)
+
+        Returns:
+            Sentiment results for all new paragraphs, in analyze_risks format
+        """
+        reused = {}
+        if previous_results:
+            for entry in diff["unchanged"]:
+                old = previous_results[entry["old_index"]]
+                reused[entry["new_index"]] = old
+
+        to_score = [j for j in range(len(new_paragraphs)) if j not in reused]
+        print(f"Diff: {len(to_score)} geänderte/neue Absätze werden bewertet, "
+              f"{len(reused)} unverändert übernommen")
+        scored = dict(zip(to_score, analyzer.analyze_risks([new_paragraphs[j] for j in to_score])))
+
+        results = []
+        for j, para in enumerate(new_paragraphs):
+            source = reused.get(j) or scored[j]
+            preview = para.strip().replace("\n", " ")[:100]
+            if len(para) > 100:
+                preview += "..."
+            results.append({
+                "paragraph_number": j + 1,
+                "text_preview": preview,
+                "positive": source["positive"],
+                "negative": source["negative"],
+                "neutral":  source["neutral"],
+                "sentiment": source["sentiment"],
+                # Embedding / semantische Kategorie werden mit übernommen, falls vorhanden
+                **{k: source[k] for k in OPTIONAL_FIELDS if k in source},
+            })
+        return results
+
+    def summarize(self, diff: Dict[str, List[Dict]], old_paragraphs: List[str],
+                  new_paragraphs: List[str]) -> Dict:
+        """JSON-friendly diff report with text previews, e.g. for data/processed."""
+        def preview(text):
+            return text[:100] + ("..." if len(text) > 100 else "")
+
+        return {
+            "counts": {k: len(v) for k, v in diff.items()},
+            "added": [{**e, "text_preview": preview(new_paragraphs[e["new_index"]])} for e in diff["added"]],
+            "removed": [{**e, "text_preview": preview(old_paragraphs[e["old_index"]])} for e in diff["removed"]],
+            "modified": [{**e, "text_preview": preview(new_paragraphs[e["new_index"]])} for e in diff["modified"]],
+            "unchanged": diff["unchanged"],
+        }
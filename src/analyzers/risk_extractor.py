@@ -1,7 +1,9 @@
-from bs4 import BeautifulSoup
 from pathlib import Path
 import re
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from src.utils.filing_store import open_filing
+from src.utils.parser_backend import parse_document
 
 
 class RiskExtractor:
@@ -9,24 +11,31 @@ class RiskExtractor:
     Extracts the 'Risk Factors' section from SEC 10-K filings.
     """
 
-    def __init__(self, filing_path: Path):
+    # Bump when the extraction logic changes (invalidates cached paragraphs)
+    VERSION = "2"
+
+    def __init__(self, filing_path: Path, backend: Optional[str] = None):
         self.filing_path = filing_path
-        self.soup = None
+        self.backend = backend
+        self.document = None
+        # Character offsets of the returned paragraphs within the cleaned risk section
+        self.section_offsets: List[Dict] = []
         self._load_filing()
 
     def _load_filing(self):
         """Load and parse the filing."""
         try:
-            with open(self.filing_path, 'r', encoding='utf-8') as f:
+            with open_filing(self.filing_path) as f:
                 content = f.read()
-            self.soup = BeautifulSoup(content, 'lxml')
-            print(f"Loaded filing for risk analysis: {self.filing_path.name}")
+            self.document = parse_document(content, backend=self.backend)
+            print(f"Loaded filing for risk analysis: {self.filing_path.name} ({self.document.backend})")
         except Exception as e:
             print(f"Error loading filing: {e}")
             raise
 
     def find_risk_section(self) -> str:
-        if not self.soup:
+        doc = self.document
+        if doc is None:
             return ""
 
         print("Suche Item 1A Risk Factors – Apple-2025-Edition aktiviert...")
@@ -38,34 +47,34 @@ class RiskExtractor:
             "dei:riskfactorstextblock",
         ]
         for tag_name in xbrl_tags:
-            tag = self.soup.find(tag_name)
-            if tag:
-                text = tag.get_text(separator=" ", strip=True)
+            tag = doc.find(tag_name)
+            if tag is not None:
+                text = doc.text(tag, separator=" ")
                 text = re.sub(r'\s+', ' ', text)
                 if len(text) > 20000:
                     print(f"Found via XBRL <{tag_name}> – Länge: {len(text)} Zeichen")
                     return text
 
         # ───── 2. Inline XBRL (ix:nonFraction) – Apple 2025 Hauptmethode ─────
-        ix_tags = self.soup.find_all("ix:nonfraction", string=re.compile(r"risk\s*factors", re.I))
+        risk_pattern = re.compile(r"risk\s*factors", re.I)
+        ix_tags = [ix for ix in doc.find_all("ix:nonfraction") if risk_pattern.search(doc.text(ix))]
         if ix_tags:
             # Nimm den ersten großen Block nach dem Treffer
             for ix in ix_tags:
-                parent = ix.parent
-                while parent and parent.name not in ["div", "span", "td", "p"]:
-                    parent = parent.parent
-                if parent:
-                    full_div = parent.find_next_sibling()
-                    if not full_div:
+                parent = doc.ancestor(ix, ["div", "span", "td", "p"])
+                if parent is not None:
+                    full_div = doc.next_sibling(parent)
+                    if full_div is None:
                         full_div = parent
-                    text = full_div.get_text(separator=" ", strip=True)
+                    text = doc.text(full_div, separator=" ")
                     text = re.sub(r'\s+', ' ', text)
                     if len(text) > 30000 and "material adverse" in text.lower():
                         print(f"Found via inline XBRL (ix:nonFraction) – Länge: {len(text)}")
                         return text
 
         # ───── 3. Fallback: Suche im gesamten Roh-HTML nach typischen Risikosätzen ─────
-        full_html = str(self.soup)
+        # Roh-Quelltext statt str(soup) – spart die komplette Re-Serialisierung
+        full_html = doc.source
         patterns = [
             r"(Item\s*1A\.?\s*Risk\s*Factors.*?)(?=Item\s*1B\.?|Item\s*2\.?)",
             r"(?s)The Company.*?operations and performance depend significantly on.{0,5000}?(?=Item\s*1B\.?)",
@@ -165,4 +174,23 @@ class RiskExtractor:
                 risks.append(cleaned)
 
         print(f"Extracted {len(risks)} echte Risikoparagraphen")
-        return risks[:max_paragraphs]
\ No newline at end of file
+        risks = risks[:max_paragraphs]
+        self.section_offsets = self._locate_paragraphs(risk_text, risks)
+        return risks
+
+    def _locate_paragraphs(self, risk_text: str, paragraphs: List[str]) -> List[Dict]:
+        """
+        Find start/end offsets of each paragraph in the cleaned risk section text.
+        Paragraphs are searched in order, so repeated boilerplate maps to the right occurrence.
+        """
+        offsets = []
+        cursor = 0
+        for i, para in enumerate(paragraphs):
+            start = risk_text.find(para[:80], cursor)
+            if start == -1:
+                offsets.append({"paragraph_number": i + 1, "start": None, "end": None})
+                continue
+            end = start + len(para)
+            offsets.append({"paragraph_number": i + 1, "start": start, "end": end})
+            cursor = start + 1
+        return offsets
\ No newline at end of file
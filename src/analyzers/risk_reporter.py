@@ -1,13 +1,23 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
+import json
 import numpy as np
 
 
 class RiskReporter:
     """
     Generates comprehensive risk analysis reports.
+
+    The analysis is first collected into a machine-readable result document
+    (see build_result). The German text report is only a rendering of that
+    document, so downstream tools can read the JSON-lines file instead of
+    scraping the text.
     """
+
+    # Bump when the layout of the result document changes
+    SCHEMA_VERSION = 1
+    RESULTS_FILENAME = "risk_results.jsonl"
     
     def _get_risk_level(self, score: float) -> str:
         if score <= 30:
@@ -28,6 +38,78 @@ class RiskReporter:
             cats = ", ".join(top_categories[:3]) if top_categories else "mehrere kritische Bereiche"
             return f"HOHES RISIKO! Dringende Handlungsempfehlung: Sofortige Analyse der Bereiche {cats}, mögliche Reduzierung der Position oder Absicherung."
 
+    def build_result(
+        self,
+        ticker: str,
+        sentiment_results: List[Dict],
+        keyword_results: Dict,
+        overall_risk_score: float,
+        section_offsets: Optional[List[Dict]] = None,
+        metrics: Optional[Dict[str, List[float]]] = None,
+        metadata: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Build the structured result document for one analysis run.
+
+        Args:
+            ticker: Company ticker symbol
+            sentiment_results: Output of SentimentAnalyzer.analyze_risks
+            keyword_results: Output of KeywordScanner.scan_risks
+            overall_risk_score: Output of SentimentAnalyzer.get_overall_risk_score
+            section_offsets: Paragraph offsets from RiskExtractor.section_offsets
+            metrics: Financial metrics as returned by get_clean_metrics
+            metadata: Model/version information (model name, filing, ...)
+
+        Returns:
+            JSON-serialisable dict, one line in the results file
+        """
+        offsets = {o["paragraph_number"]: o for o in (section_offsets or [])}
+
+        paragraphs = []
+        for r in sentiment_results:
+            offset = offsets.get(r["paragraph_number"], {})
+            paragraphs.append({
+                "paragraph_number": r["paragraph_number"],
+                "start": offset.get("start"),
+                "end": offset.get("end"),
+                "positive": float(r["positive"]),
+                "negative": float(r["negative"]),
+                "neutral": float(r["neutral"]),
+                "sentiment": r["sentiment"],
+                "text_preview": r["text_preview"],
+            })
+            if r.get("semantic_category") is not None:
+                paragraphs[-1]["semantic_category"] = r["semantic_category"]
+                paragraphs[-1]["category_similarity"] = float(r["category_similarity"])
+
+        semantic_counts = {}
+        for para in paragraphs:
+            if "semantic_category" in para:
+                semantic_counts[para["semantic_category"]] = semantic_counts.get(para["semantic_category"], 0) + 1
+
+        result = {
+            "schema_version": self.SCHEMA_VERSION,
+            "ticker": ticker.upper(),
+            "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "overall_risk_score": float(overall_risk_score),
+            "risk_level": self._get_risk_level(overall_risk_score),
+            "paragraphs": paragraphs,
+            "keywords": {
+                "total_keywords": keyword_results.get("total_keywords", 0),
+                "by_category": dict(keyword_results.get("by_category", {})),
+                "top_keywords": [list(kw) for kw in keyword_results.get("top_keywords", [])],
+                "keyword_details": dict(keyword_results.get("keyword_details", {})),
+                # Nur beim Scan des gesamten Dokuments (DocumentKeywordScanner)
+                **({"scope": keyword_results["scope"], "by_section": keyword_results["by_section"]}
+                   if "by_section" in keyword_results else {}),
+            },
+            "metrics": {name: [float(v) for v in values] for name, values in (metrics or {}).items()},
+            "metadata": dict(metadata or {}),
+        }
+        if semantic_counts:
+            result["semantic_categories"] = semantic_counts
+        return result
+
     def generate_report(
         self, 
         ticker: str,
@@ -38,13 +120,23 @@ class RiskReporter:
         """
         Generate a formatted risk analysis report.
         """
+        result = self.build_result(ticker, sentiment_results, keyword_results, overall_risk_score)
+        return self.render_report(result)
+
+    def render_report(self, result: Dict) -> str:
+        """
+        Render the German text report from a result document.
+        """
         report = []
-        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        ticker = result["ticker"]
+        overall_risk_score = result["overall_risk_score"]
+        sentiment_results = result["paragraphs"]
+        keyword_results = result["keywords"]
         
         report.append("=" * 80)
         report.append(f"         RISK ANALYSIS REPORT: {ticker.upper()}")
         report.append("=" * 80)
-        report.append(f"Generiert am: {now}")
+        report.append(f"Generiert am: {result['generated_at']}")
         report.append("")
 
         # 1. OVERALL RISK SCORE
@@ -98,6 +190,19 @@ class RiskReporter:
             report.append("Top 5 Keywords:")
             for kw, count in top_keywords[:5]:
                 report.append(f"   • \"{kw}\" → {count}x")
+        by_section = keyword_results.get("by_section")
+        if by_section:
+            report.append("")
+            report.append("Treffer nach Abschnitt (gesamtes 10-K):")
+            section_totals = sorted(((sum(c.values()), s) for s, c in by_section.items()), reverse=True)
+            for total, section in section_totals[:5]:
+                report.append(f"   • {section}: {total}")
+        semantic = result.get("semantic_categories")
+        if semantic:
+            report.append("")
+            report.append("Semantische Kategorien (FinBERT-Embeddings):")
+            for cat, count in sorted(semantic.items(), key=lambda x: x[1], reverse=True):
+                report.append(f"   • {cat.replace('_', ' ').title()}: {count} Absätze")
         report.append("")
 
         # 4. DETAILED FINDINGS – Top 3 riskiest paragraphs
@@ -137,4 +242,36 @@ class RiskReporter:
             f.write(report)
         
         print(f"Bericht gespeichert: {filepath}")
-        return filepath
\ No newline at end of file
+        return filepath
+
+    def save_result(self, result: Dict, output_dir: str = "data/processed") -> Path:
+        """
+        Append a result document as one line to the JSON-lines results file.
+
+        Appending is O(1) per run, so the file can collect thousands of runs.
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        filepath = output_path / self.RESULTS_FILENAME
+        with open(filepath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+        print(f"Ergebnis angehängt: {filepath}")
+        return filepath
+
+    def load_results(self, path: Path, ticker: Optional[str] = None) -> List[Dict]:
+        """
+        Read result documents from a JSON-lines file, optionally for one ticker only.
+        """
+        results = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                result = json.loads(line)
+                if ticker and result.get("ticker") != ticker.upper():
+                    continue
+                results.append(result)
+        return results
@@ -1,5 +1,3 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
 from typing import List, Dict
 import numpy as np
 
@@ -7,13 +5,34 @@ import numpy as np
 class SentimentAnalyzer:
     """
     Analyzes sentiment of financial text using FinBERT.
+
+    torch/transformers are imported when the model is loaded, not on import,
+    so importing this module (e.g. for MODEL_NAME/VERSION in cache keys) is cheap.
     """
+
+    MODEL_NAME = "ProsusAI/finbert"
+    # Gewichte des Risikoscores pro Sentiment-Wahrscheinlichkeit (auch für Peer-Scoring)
+    SCORE_WEIGHTS = {"positive": -50, "negative": 100, "neutral": 10}
+    # Bump when scoring/pre-processing changes (invalidates cached sentiment results)
+    VERSION = "1"
+    # Pooling der Embeddings (Teil des Cache-Schlüssels, wenn Embeddings angefordert werden)
+    EMBEDDING_POOLING = "mean-last-hidden-v1"
     
-    def __init__(self):
+    def __init__(self, return_embeddings: bool = False):
+        """
+        Args:
+            return_embeddings: Also return the pooled last hidden state of each
+                paragraph ("embedding", float32 array) – taken from the same forward pass.
+        """
         print("Loading FinBERT model...")
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        self._torch = torch
         
         # 1. Lade FinBERT Tokenizer und Modell
-        model_name = "ProsusAI/finbert"
+        model_name = self.MODEL_NAME
+        self.model_name = model_name
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
         
@@ -23,6 +42,10 @@ class SentimentAnalyzer:
         # Reihenfolge der Labels bei FinBERT: positive, negative, neutral
         self.labels = ["positive", "negative", "neutral"]
         
+        # SimHash-Deduplizierung, bleibt über mehrere Ticker hinweg bestehen
+        self.deduplicator = None
+        self.return_embeddings = return_embeddings
+
         print("FinBERT erfolgreich geladen!")
     
     def analyze_text(self, text: str) -> Dict[str, float]:
@@ -39,11 +62,11 @@ class SentimentAnalyzer:
         )
         
         # Kein Gradientenberechnung nötig (spart Speicher & ist schneller)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        with self._torch.no_grad():
+            outputs = self.model(**inputs, output_hidden_states=self.return_embeddings)
         
         # Softmax über die Logits → Wahrscheinlichkeiten
-        probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
+        probabilities = self._torch.nn.functional.softmax(outputs.logits, dim=-1)
         probs = probabilities[0].cpu().numpy()  # [positive, negative, neutral]
         
         # Scores zuordnen
@@ -56,13 +79,51 @@ class SentimentAnalyzer:
         # Dominantes Sentiment bestimmen
         dominant_sentiment = max(scores, key=scores.get)
         scores["sentiment"] = dominant_sentiment
+
+        if self.return_embeddings:
+            scores["embedding"] = self._pool(outputs.hidden_states[-1], inputs["attention_mask"])[0]
         
         return scores
+
+    def count_tokens(self, text: str) -> int:
+        """Number of model tokens the text costs (after truncation to 512)."""
+        return len(self.tokenizer(text, max_length=512, truncation=True)["input_ids"])
+
+    def _pool(self, hidden_state, attention_mask) -> np.ndarray:
+        """Mean of the last hidden state over the real (non-padding) tokens."""
+        mask = attention_mask.unsqueeze(-1).to(hidden_state.dtype)
+        pooled = (hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return pooled.cpu().numpy().astype(np.float32)
+
+    def embed(self, texts: List[str], batch_size: int = 16) -> np.ndarray:
+        """
+        Pooled FinBERT embeddings of short texts (e.g. category seed phrases).
+
+        Returns:
+            array of shape (len(texts), hidden_size)
+        """
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(texts[start:start + batch_size], max_length=512, truncation=True,
+                                    padding=True, return_tensors="pt")
+            with self._torch.no_grad():
+                outputs = self.model(**inputs, output_hidden_states=True)
+            embeddings.append(self._pool(outputs.hidden_states[-1], inputs["attention_mask"]))
+        return np.concatenate(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
     
-    def analyze_risks(self, risk_paragraphs: List[str]) -> List[Dict]:
+    def analyze_risks(self, risk_paragraphs: List[str], deduplicate: bool = False) -> List[Dict]:
         """
         Analyze sentiment for multiple risk paragraphs.
+
+        With deduplicate=True, near-identical paragraphs (also from earlier calls
+        on this instance, e.g. other tickers in a batch) are scored only once.
         """
+        if deduplicate:
+            if self.deduplicator is None:
+                from .paragraph_dedup import ParagraphDeduplicator
+                self.deduplicator = ParagraphDeduplicator()
+            return self.deduplicator.analyze(risk_paragraphs, self.analyze_risks)
+
         results = []
         
         print(f"Analysiere Sentiment von {len(risk_paragraphs)} Risiko-Absätzen...")
@@ -85,6 +146,8 @@ class SentimentAnalyzer:
                 "neutral":  sentiment["neutral"],
                 "sentiment": sentiment["sentiment"]
             }
+            if "embedding" in sentiment:
+                result["embedding"] = sentiment["embedding"]
             results.append(result)
             
             # Fortschrittsanzeige alle 5 Absätze
@@ -93,7 +156,8 @@ class SentimentAnalyzer:
         
         return results
     
-    def get_overall_risk_score(self, sentiment_results: List[Dict]) -> float:
+    @classmethod
+    def get_overall_risk_score(cls, sentiment_results: List[Dict]) -> float:
         """
         Calculate overall risk score (0-100) based on sentiment analysis.
         Höher = mehr negative Stimmung = höheres Risiko
@@ -112,9 +176,9 @@ class SentimentAnalyzer:
         
         # Gewichtete Risikobewertung
         raw_score = (
-            avg_negative * 100 +      # Negativ treibt Risiko hoch
-            avg_positive * (-50) +    # Positiv mindert das Risiko
-            avg_neutral  * 10         # Neutral leicht risikobeitragend
+            avg_negative * cls.SCORE_WEIGHTS["negative"] +   # Negativ treibt Risiko hoch
+            avg_positive * cls.SCORE_WEIGHTS["positive"] +   # Positiv mindert das Risiko
+            avg_neutral  * cls.SCORE_WEIGHTS["neutral"]      # Neutral leicht risikobeitragend
         )
         
         risk_score = np.clip(raw_score, 0, 100)
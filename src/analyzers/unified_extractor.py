@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from .xbrl_extractor import XBRLExtractor
 from .financial_extractor import FinancialExtractor
+from src.utils.filing_store import open_filing
 
 
 class UnifiedExtractor:
@@ -17,9 +18,13 @@ class UnifiedExtractor:
     2. Fallback to HTML parsing if XBRL fails
     3. Return best available results
     """
+
+    # Bump when XBRL or HTML extraction changes (invalidates cached metrics)
+    VERSION = "4"
     
-    def __init__(self, filing_path: Path):
+    def __init__(self, filing_path: Path, backend: Optional[str] = None):
         self.filing_path = filing_path
+        self.backend = backend
         self.extractor = None
         self.method_used = None
         self._select_extractor()
@@ -28,7 +33,7 @@ class UnifiedExtractor:
         """Select the best extractor based on filing content."""
         
         # Read first 10000 chars to detect format
-        with open(self.filing_path, 'r', encoding='utf-8') as f:
+        with open_filing(self.filing_path) as f:
             content_sample = f.read(10000).lower()
         
         # Check for XBRL indicators
@@ -40,7 +45,7 @@ class UnifiedExtractor:
         if has_xbrl:
             try:
                 print("🔍 XBRL format detected - using XBRL extractor (100% reliable)")
-                self.extractor = XBRLExtractor(self.filing_path)
+                self.extractor = XBRLExtractor(self.filing_path, backend=self.backend)
                 self.method_used = "XBRL"
                 
                 # Quick validation: try to extract one metric
@@ -52,7 +57,7 @@ class UnifiedExtractor:
         
         # Fallback to HTML parsing
         print("🔍 Using HTML parser (works for most companies)")
-        self.extractor = FinancialExtractor(self.filing_path)
+        self.extractor = FinancialExtractor(self.filing_path, backend=self.backend)
         self.method_used = "HTML"
     
     def get_clean_metrics(self) -> Dict[str, List[float]]:
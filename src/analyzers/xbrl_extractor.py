@@ -3,10 +3,15 @@ XBRL Extractor - Production-grade financial metrics extraction
 Uses XBRL/iXBRL format for 100% reliability across all SEC filers.
 """
 
-from bs4 import BeautifulSoup
 from pathlib import Path
-from typing import Dict, List, Optional
-import re
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from datetime import datetime
+
+from src.utils.filing_store import open_filing
+from src.utils.parser_backend import parse_document
+
+if TYPE_CHECKING:  # zur Laufzeit wird NumPy erst beim Aufbau der Faktentabelle importiert
+    import numpy as np
 
 
 class XBRLExtractor:
@@ -48,49 +53,160 @@ class XBRLExtractor:
         ]
     }
     
-    def __init__(self, filing_path: Path):
+    def __init__(self, filing_path: Path, backend: Optional[str] = None):
         self.filing_path = filing_path
-        self.soup = None
+        self.backend = backend
+        self.document = None
+        # context id → {"start", "end", "instant", "days", "dimensions": {axis: member}}
+        self.contexts: Dict[str, Dict] = {}
+        # unit id → monetary (iso4217-Maß ohne Division)
+        self.units: Dict[str, bool] = {}
+        # Faktentabelle: eine NumPy-Spalte je Feld (name, context, unit, value, annual)
+        self.facts: Dict[str, "np.ndarray"] = {}
+        # (name, ((axis, member), ...)) → Zeilen der Faktentabelle; () = konsolidiert
+        self.fact_index: Dict[Tuple, "np.ndarray"] = {}
+        # Invertierter Index: (axis, member) → Zeilen aller Fakten mit diesem Member
+        self.dimension_index: Dict[Tuple[str, str], "np.ndarray"] = {}
+        # axis → Member in Dokumentreihenfolge
+        self.axes: Dict[str, List[str]] = {}
         self._load_filing()
+        self._build_context_index()
+        self._build_unit_index()
+        self._build_fact_table()
     
     def _load_filing(self):
         """Load and parse the filing with XBRL namespace support."""
-        with open(self.filing_path, 'r', encoding='utf-8') as f:
+        with open_filing(self.filing_path) as f:
             content = f.read()
-        self.soup = BeautifulSoup(content, 'lxml-xml')
+        self.document = parse_document(content, xml=True, backend=self.backend)
         
-        # Fallback to html parser if xml doesn't work
-        if not self.soup.find_all():
-            self.soup = BeautifulSoup(content, 'lxml')
-        
-        print(f"✅ Loaded XBRL filing: {self.filing_path.name}")
-    
-    def _clean_number(self, value_str: str) -> Optional[float]:
-        """Clean and convert XBRL value to float."""
-        if not value_str:
-            return None
+        # Fallback to html parser if xml doesn't work (e.g. SGML-wrapped inline XBRL)
+        if not self.document.find_all(['context', 'ix:nonfraction']):
+            self.document = parse_document(content, backend=self.backend)
         
-        try:
-            # Remove commas and whitespace
-            cleaned = value_str.replace(',', '').strip()
-            
-            # Handle negative numbers in parentheses
-            if '(' in cleaned and ')' in cleaned:
-                cleaned = '-' + cleaned.replace('(', '').replace(')', '')
-            
-            # Convert to float
-            value = float(cleaned)
-            
-            # XBRL values are often in actual dollars, convert to millions
-            # If value > 1 billion, it's likely already in dollars
-            if abs(value) > 1_000_000_000:
-                return value / 1_000_000  # Convert to millions
-            
-            return value
-            
-        except (ValueError, TypeError):
-            return None
-    
+        print(f"✅ Loaded XBRL filing: {self.filing_path.name} ({self.document.backend})")
+
+    def _build_context_index(self):
+        """Index all context definitions once (instead of one document search per fact)."""
+        doc = self.document
+        for context in doc.find_all('context'):
+            context_id = doc.attr(context, 'id')
+            if not context_id:
+                continue
+
+            entry = {}
+            for field, tag in (("start", "startDate"), ("end", "endDate"), ("instant", "instant")):
+                node = doc.find(tag, root=context)
+                if node is not None:
+                    entry[field] = doc.text(node, separator="")
+
+            if "start" in entry and "end" in entry:
+                try:
+                    start = datetime.strptime(entry["start"], '%Y-%m-%d')
+                    end = datetime.strptime(entry["end"], '%Y-%m-%d')
+                    entry["days"] = (end - start).days
+                except ValueError:
+                    pass
+
+            # Segment/Scenario: explizite Member (QName) und typisierte Member (Wert)
+            dimensions = {}
+            for member in doc.find_all(['explicitMember', 'typedMember'], root=context):
+                axis = doc.attr(member, 'dimension')
+                if axis:
+                    value = doc.text(member, separator="").strip()
+                    explicit = doc.tag_name(member).endswith('explicitmember')
+                    dimensions[self._local(axis)] = self._local(value) if explicit else value
+            if dimensions:
+                entry["dimensions"] = dimensions
+
+            self.contexts[context_id] = entry
+
+    @staticmethod
+    def _local(qname: str) -> str:
+        """'us-gaap:StatementBusinessSegmentsAxis' → 'StatementBusinessSegmentsAxis'"""
+        return qname.strip().split(':')[-1]
+
+    def _build_unit_index(self):
+        """Index unit definitions: monetary units are normalised to millions."""
+        doc = self.document
+        for unit in doc.find_all('unit'):
+            unit_id = doc.attr(unit, 'id')
+            if not unit_id:
+                continue
+            measures = [doc.text(m, separator="").lower() for m in doc.find_all('measure', root=unit)]
+            divided = doc.find('divide', root=unit) is not None
+            self.units[unit_id] = bool(measures) and not divided and measures[0].startswith('iso4217:')
+
+    def _is_monetary(self, unit_id: Optional[str]) -> bool:
+        if not unit_id:
+            return False
+        if unit_id in self.units:
+            return self.units[unit_id]
+        # Inline-XBRL ohne (gefundene) Unit-Definition: übliche IDs wie "usd", "U_USD"
+        lower = unit_id.lower()
+        return "usd" in lower and "share" not in lower and "per" not in lower
+
+    def _build_fact_table(self):
+        """
+        Collect all numeric facts once (inline ix:nonFraction and plain XBRL
+        elements of XBRL_TAGS) and decode their values in one vectorised pass.
+        """
+        doc = self.document
+        columns = {key: [] for key in ("name", "context", "unit", "text", "format", "scale", "sign")}
+
+        def add(node, name):
+            columns["name"].append(name.split(':')[-1].lower())
+            columns["context"].append(doc.attr(node, 'contextRef'))
+            columns["unit"].append(doc.attr(node, 'unitRef'))
+            columns["text"].append(doc.text(node, separator=""))
+            columns["format"].append(doc.attr(node, 'format'))
+            columns["scale"].append(doc.attr(node, 'scale'))
+            columns["sign"].append(doc.attr(node, 'sign'))
+
+        for node in doc.find_all('ix:nonfraction'):
+            name = doc.attr(node, 'name')
+            if name:
+                add(node, name)
+        plain_names = {t for tags in self.XBRL_TAGS.values() for t in tags}
+        for node in doc.find_all(plain_names | {t.split(':')[-1] for t in plain_names}):
+            if doc.attr(node, 'contextRef'):
+                add(node, doc.tag_name(node))
+        if not columns["name"]:
+            return  # z.B. R-Dateien: kein numpy nötig
+
+        # Lazy: reine Kennzahlen-Läufe ohne XBRL-Fakten laden numpy nicht
+        import numpy as np
+        from src.analyzers.ixbrl_numbers import decode_facts, to_millions
+
+        values = decode_facts(columns["text"], columns["format"], columns["scale"], columns["sign"])
+        monetary = np.array([self._is_monetary(u) for u in columns["unit"]], dtype=bool)
+        annual = {c: self._is_annual_context(c, None) for c in set(columns["context"])}
+        self.facts = {
+            "name": np.array(columns["name"], dtype=object),
+            "context": np.array(columns["context"], dtype=object),
+            "unit": np.array(columns["unit"], dtype=object),
+            "value": to_millions(values, monetary),
+            "annual": np.array([annual[c] for c in columns["context"]], dtype=bool),
+        }
+        self._build_dimension_index(columns["name"], columns["context"])
+
+    def _build_dimension_index(self, names: List[str], contexts: List[str]):
+        """Group fact rows by (name, dimensions) and by (axis, member) – lookups without re-scanning."""
+        import numpy as np
+
+        keys = {c: tuple(sorted(self.contexts.get(c, {}).get("dimensions", {}).items())) for c in set(contexts)}
+        by_fact, by_member = {}, {}
+        for row, (name, context) in enumerate(zip(names, contexts)):
+            dimensions = keys[context]
+            by_fact.setdefault((name, dimensions), []).append(row)
+            for axis, member in dimensions:
+                by_member.setdefault((axis, member), []).append(row)
+                members = self.axes.setdefault(axis, [])
+                if member not in members:
+                    members.append(member)
+        self.fact_index = {key: np.array(rows) for key, rows in by_fact.items()}
+        self.dimension_index = {key: np.array(rows) for key, rows in by_member.items()}
+
     def _is_annual_context(self, context_id: str, tag) -> bool:
         """
         Check if a context represents annual data (not quarterly).
@@ -99,11 +215,9 @@ class XBRLExtractor:
         if not context_id:
             return False
         
-        # Try to find the context definition
-        context = self.soup.find('context', {'id': context_id}) or \
-                  self.soup.find('xbrli:context', {'id': context_id})
+        context = self.contexts.get(context_id)
         
-        if not context:
+        if context is None:
             # Heuristic: Annual contexts often have 'FY' or full year indicators
             context_lower = context_id.lower()
             if any(indicator in context_lower for indicator in ['fy', 'annual', 'y', 'duration']):
@@ -114,22 +228,9 @@ class XBRLExtractor:
             return True
         
         # Check period duration
-        period = context.find('period') or context.find('xbrli:period')
-        if period:
-            start_date = period.find('startDate') or period.find('xbrli:startDate')
-            end_date = period.find('endDate') or period.find('xbrli:endDate')
-            
-            if start_date and end_date:
-                try:
-                    from datetime import datetime
-                    start = datetime.strptime(start_date.get_text(strip=True), '%Y-%m-%d')
-                    end = datetime.strptime(end_date.get_text(strip=True), '%Y-%m-%d')
-                    days = (end - start).days
-                    
-                    # Annual data spans ~330-400 days (accounting for fiscal years)
-                    return 330 <= days <= 400
-                except:
-                    pass
+        # Annual data spans ~330-400 days (accounting for fiscal years)
+        if "days" in context:
+            return 330 <= context["days"] <= 400
         
         return True
     
@@ -143,38 +244,68 @@ class XBRLExtractor:
         Returns:
             List of values in millions (sorted by size, largest first)
         """
-        values = []
-        
-        for tag_name in tag_names:
-            # Search with and without namespace
-            tags = self.soup.find_all(tag_name) + \
-                   self.soup.find_all(tag_name.split(':')[-1])
-            
-            # Also search in inline XBRL format
-            inline_tags = self.soup.find_all('ix:nonfraction', {'name': tag_name}) + \
-                          self.soup.find_all('ix:nonFraction', {'name': tag_name})
-            
-            tags.extend(inline_tags)
-            
-            for tag in tags:
-                # Check if this is annual data
-                context_ref = tag.get('contextref') or tag.get('contextRef')
-                
-                if not self._is_annual_context(context_ref, tag):
-                    continue
-                
-                # Get the value
-                value_str = tag.get_text(strip=True)
-                value = self._clean_number(value_str)
-                
-                if value is not None and abs(value) > 0:
-                    values.append(value)
-        
+        return self.consolidated(tag_names)
+
+    def _lookup(self, tag_names: List[str], dimensions: Tuple, annual: bool = True) -> List[float]:
+        """Values of the facts indexed under (tag, dimensions), largest first, top 3."""
+        import numpy as np
+
+        rows = [self.fact_index[key] for key in ((t.split(':')[-1].lower(), dimensions) for t in tag_names)
+                if key in self.fact_index]
+        if not rows:
+            return []
+        rows = np.concatenate(rows)
+        values = self.facts["value"][rows]
+        mask = ~np.isnan(values) & (values != 0)
+        if annual:
+            mask &= self.facts["annual"][rows]
+
         # Remove duplicates and sort by size
-        unique_values = list(set(values))
-        unique_values.sort(key=abs, reverse=True)
-        
-        return unique_values[:3]  # Return top 3
+        unique_values = np.unique(values[mask])
+        unique_values = unique_values[np.argsort(-np.abs(unique_values), kind="stable")]
+
+        return [float(v) for v in unique_values[:3]]  # Return top 3
+
+    def consolidated(self, tag_names: List[str], annual: bool = True) -> List[float]:
+        """
+        Values of facts without any dimension (the consolidated totals).
+
+        Segment and geography facts share the tag with the total
+        (e.g. Revenues per StatementBusinessSegmentsAxis member) and are excluded.
+        """
+        return self._lookup(tag_names, (), annual)
+
+    def breakdown(self, tag_names: List[str], axis: str, annual: bool = True) -> Dict[str, List[float]]:
+        """
+        Values per member of one axis, e.g. revenue by segment.
+
+        Only facts whose context has exactly this one dimension are used –
+        facts crossing two axes (segment × product) would be double-counted.
+
+        Args:
+            tag_names: XBRL tags of the metric
+            axis: Dimension, with or without prefix ('srt:StatementGeographicalAxis')
+
+        Returns:
+            member → values in millions (members without values are omitted)
+        """
+        axis = self._local(axis)
+        result = {}
+        for member in self.axes.get(axis, []):
+            values = self._lookup(tag_names, ((axis, member),), annual)
+            if values:
+                result[member] = values
+        return result
+
+    def facts_for_member(self, axis: str, member: str) -> List[Dict]:
+        """All facts reported for one axis member (any tag, any other dimensions)."""
+        rows = self.dimension_index.get((self._local(axis), self._local(member)), [])
+        return [{"name": self.facts["name"][row], "context": self.facts["context"][row],
+                 "value": float(self.facts["value"][row])} for row in rows]
+
+    def get_breakdown(self, metric_name: str, axis: str) -> Dict[str, List[float]]:
+        """breakdown() for one of the standard metrics (XBRL_TAGS key)."""
+        return self.breakdown(self.XBRL_TAGS[metric_name], axis)
     
     def get_basic_metrics(self) -> Dict[str, List[float]]:
         """
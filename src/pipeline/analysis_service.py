@@ -0,0 +1,345 @@
+"""
+Analysis Service - Long-running local HTTP API for metrics, risk analysis and reports
+
+`python main.py TICKER` pays interpreter start, parsing and FinBERT loading on
+every call. The service keeps all of that in one process:
+
+    python main.py serve --port 8765
+    curl localhost:8765/metrics/AAPL
+    curl localhost:8765/risks/AAPL?accession=0000320193-25-000079
+    curl localhost:8765/report/AAPL
+
+- FinBERT is loaded once (at start, or on the first risk request) and shared
+- parsed filings (metrics, risk paragraphs, section offsets) and risk results
+  live in a memory-bounded LRU keyed by (ticker, accession)
+- concurrent requests for the same (ticker, accession) are coalesced: one
+  request computes, the others wait for its result
+
+All stages go through the StageCache with the same keys as main.py and the
+batch pipeline, so results computed by either are reused. The service does not
+write reports or the peer store – it only answers requests.
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.pipeline.filing_pipeline import (
+    extract_metrics, extract_risk_paragraphs, find_filing_file, risk_metadata, sentiment_inputs
+)
+from src.utils.parser_backend import DEFAULT_BACKEND
+from src.utils.stage_cache import StageCache
+
+# Ticker inkl. Aktiengattung (BRK.B, BRK-B); kein "/" und kein führender "." – der Ticker wird Verzeichnisname
+TICKER_PATTERN = re.compile(r"[A-Z0-9][A-Z0-9.\-]{0,9}")
+
+
+class ParsedFilingLRU:
+    """
+    Thread-safe LRU bounded by the approximate size of its values.
+
+    Sizes are estimated from the JSON encoding (the values are the same
+    JSON-able dicts the StageCache stores); a value larger than the whole
+    budget is not cached.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def estimate_size(value) -> int:
+        return len(json.dumps(value, default=str))
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value, size: Optional[int] = None):
+        size = self.estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+class RequestCoalescer:
+    """
+    Runs fn once per key at a time; callers arriving while it runs get the same
+    result (or exception) instead of starting a second computation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.computed = 0
+        self.coalesced = 0
+
+    def run(self, key: Hashable, fn: Callable):
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.computed += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class AnalysisService:
+    """
+    Metrics, risk results and reports of local (or downloaded) 10-K filings.
+
+    Args:
+        cache (StageCache): Shared stage cache (default: StageCache()).
+        parser (str): Parser backend.
+        offline (bool): Only use filings in data/raw (no EDGAR download).
+        max_cache_bytes (int): Budget of the in-memory LRU.
+        analyzer_factory (callable): Returns the sentiment model (default: SentimentAnalyzer).
+        company_name, email: SEC user agent for downloads
+    """
+
+    def __init__(self, cache: Optional[StageCache] = None, parser: str = DEFAULT_BACKEND,
+                 offline: bool = True, max_cache_bytes: int = 256 * 1024 * 1024,
+                 analyzer_factory: Optional[Callable] = None,
+                 company_name: str = "Investor", email: str = "investor@example.com"):
+        self.cache = cache or StageCache()
+        self.parser = parser
+        self.offline = offline
+        self.lru = ParsedFilingLRU(max_cache_bytes)
+        self.coalescer = RequestCoalescer()
+        self.analyzer_factory = analyzer_factory
+        self.company_name = company_name
+        self.email = email
+        self._analyzer = None
+        self._keyword_scanner = None
+        self._downloader = None
+        self._model_lock = threading.Lock()
+
+    # ── Modell ──────────────────────────────────────────────────────────────
+    @property
+    def analyzer(self):
+        """The sentiment model, loaded once and shared by all requests."""
+        with self._model_lock:
+            if self._analyzer is None:
+                if self.analyzer_factory is not None:
+                    self._analyzer = self.analyzer_factory()
+                else:
+                    from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+                    self._analyzer = SentimentAnalyzer()
+            return self._analyzer
+
+    @property
+    def keyword_scanner(self):
+        if self._keyword_scanner is None:
+            from src.analyzers.keyword_scanner import KeywordScanner
+            self._keyword_scanner = KeywordScanner()
+        return self._keyword_scanner
+
+    # ── Filings ─────────────────────────────────────────────────────────────
+    def resolve(self, ticker: str, accession: Optional[str] = None) -> Tuple[str, Path]:
+        """
+        Filing file of a ticker (newest 10-K, or the given accession).
+
+        Returns:
+            (accession, filing_path)
+        """
+        from src.scrapers.sec_downloader import SECDownloader
+
+        ticker = ticker.upper()
+        if not TICKER_PATTERN.fullmatch(ticker):
+            raise ValueError(f"Ungültiger Ticker: {ticker}")
+        if self._downloader is None:
+            self._downloader = SECDownloader(self.company_name, self.email)
+        folders = self._downloader.find_local_10k(ticker, num_filings=None)
+        if not folders and not self.offline:
+            folders = self._downloader.download_10k(ticker)
+        if accession:
+            folders = [f for f in folders if Path(f).name == accession]
+        filing_path = find_filing_file(Path(folders[0])) if folders else None
+        if filing_path is None:
+            raise FileNotFoundError(f"Kein 10-K für {ticker}" + (f" ({accession})" if accession else ""))
+        return Path(folders[0]).name, filing_path
+
+    def _cached(self, key: Tuple, compute: Callable):
+        """LRU lookup, otherwise one coalesced computation whose result enters the LRU."""
+        value = self.lru.get(key)
+        if value is not None:
+            return value
+
+        def run():
+            # Zweiter Blick: ein gerade beendeter Lauf hat das Ergebnis evtl. schon abgelegt
+            value = self.lru.get(key)
+            if value is None:
+                value = compute()
+                self.lru.put(key, value)
+            return value
+
+        return self.coalescer.run(key, run)
+
+    def filing(self, ticker: str, accession: Optional[str] = None) -> Dict:
+        """Parsed filing: metrics, risk paragraphs and their section offsets."""
+        ticker = ticker.upper()
+        accession, filing_path = self.resolve(ticker, accession)
+
+        def parse():
+            filing_hash = StageCache.hash_file(filing_path)
+            metrics, metrics_hash = extract_metrics(filing_path, self.cache, self.parser, filing_hash)
+            extraction, paragraphs_hash = extract_risk_paragraphs(filing_path, self.cache, self.parser,
+                                                                  filing_hash)
+            return {"ticker": ticker, "accession": accession, "filing_path": str(filing_path),
+                    "filing_hash": filing_hash, "metrics": metrics, "metrics_hash": metrics_hash,
+                    "extraction": extraction, "paragraphs_hash": paragraphs_hash}
+
+        return self._cached(("filing", ticker, accession), parse)
+
+    def metrics(self, ticker: str, accession: Optional[str] = None) -> Dict:
+        filing = self.filing(ticker, accession)
+        return {"ticker": filing["ticker"], "accession": filing["accession"], "metrics": filing["metrics"]}
+
+    def risks(self, ticker: str, accession: Optional[str] = None) -> Dict:
+        """Structured risk result (RiskReporter.build_result) of a filing."""
+        filing = self.filing(ticker, accession)
+        return self._cached(("risks", filing["ticker"], filing["accession"]), lambda: self._analyze(filing))
+
+    def report(self, ticker: str, accession: Optional[str] = None) -> str:
+        from src.analyzers.risk_reporter import RiskReporter
+
+        return RiskReporter().render_report(self.risks(ticker, accession))
+
+    def _analyze(self, filing: Dict) -> Dict:
+        from src.analyzers.risk_reporter import RiskReporter
+        from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+
+        paragraphs = filing["extraction"]["paragraphs"]
+        if not paragraphs:
+            raise FileNotFoundError(f"Keine Risikoabsätze in {filing['ticker']} ({filing['accession']})")
+
+        def score():
+            analyzer = self.analyzer
+            with self._model_lock:  # ein Modell, eine Inferenz zur Zeit
+                results = analyzer.analyze_risks(paragraphs, deduplicate=True)
+            return {"results": results, "score": SentimentAnalyzer.get_overall_risk_score(results)}
+
+        sentiment, _ = self.cache.run(
+            "sentiment", SentimentAnalyzer.VERSION,
+            sentiment_inputs(filing["paragraphs_hash"], SentimentAnalyzer.MODEL_NAME), score)
+        scanner = self.keyword_scanner
+        keywords, _ = self.cache.run(
+            "keywords", scanner.fingerprint(), {"paragraphs": filing["paragraphs_hash"]},
+            lambda: scanner.scan_risks(paragraphs))
+
+        return RiskReporter().build_result(
+            ticker=filing["ticker"],
+            sentiment_results=sentiment["results"],
+            keyword_results=keywords,
+            overall_risk_score=sentiment["score"],
+            section_offsets=filing["extraction"]["section_offsets"],
+            metrics=filing["metrics"],
+            metadata=risk_metadata(Path(filing["filing_path"]), filing["filing_hash"],
+                                   SentimentAnalyzer.MODEL_NAME, scanner),
+        )
+
+    def stats(self) -> Dict:
+        return {"lru": self.lru.stats(),
+                "requests": {"computed": self.coalescer.computed, "coalesced": self.coalescer.coalesced},
+                "model_loaded": self._analyzer is not None}
+
+
+# ── HTTP ────────────────────────────────────────────────────────────────────
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /health | /stats | /metrics/<TICKER> | /risks/<TICKER> | /report/<TICKER>
+    (optional ?accession=...). JSON responses, the report as text/plain.
+    """
+
+    service: AnalysisService = None
+    quiet = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        accession = parse_qs(url.query).get("accession", [None])[0]
+        try:
+            if parts == ["health"]:
+                self._send(200, {"status": "ok"})
+            elif parts == ["stats"]:
+                self._send(200, self.service.stats())
+            elif len(parts) == 2 and parts[0] == "metrics":
+                self._send(200, self.service.metrics(parts[1], accession))
+            elif len(parts) == 2 and parts[0] == "risks":
+                self._send(200, self.service.risks(parts[1], accession))
+            elif len(parts) == 2 and parts[0] == "report":
+                self._send(200, self.service.report(parts[1], accession), "text/plain; charset=utf-8")
+            else:
+                self._send(404, {"error": f"Unbekannter Pfad: {url.path}"})
+        except FileNotFoundError as e:
+            self._send(404, {"error": str(e)})
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _send(self, status: int, body, content_type: str = "application/json"):
+        data = (body if isinstance(body, str) else json.dumps(body, ensure_ascii=False)).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(service: AnalysisService, host: str = "127.0.0.1", port: int = 8765,
+                  quiet: bool = False) -> ThreadingHTTPServer:
+    """HTTP server for the service (one thread per request; port 0 = free port)."""
+    handler = type("BoundAnalysisRequestHandler", (AnalysisRequestHandler,), {"service": service, "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,377 @@
+"""
+Filing Pipeline - Streaming analysis of many 10-K filings
+
+    download ─► split ─► extract ─► segment ─► score ─► aggregate ─► persist
+    (threads)  (thread)  (processes) (thread)  (batch)   (thread)    (thread)
+
+download  fetch (or locate) the filing folder
+split     hash the submission and split it into independent jobs
+          (financial metrics, risk paragraphs)
+extract   parse the filing in a process pool (through the StageCache)
+segment   sentiment cache lookup + keyword scan of the risk paragraphs
+score     one FinBERT instance, paragraphs of several filings per call
+aggregate join the jobs of a filing again
+persist   metrics CSV, result JSONL, text report, peer store
+
+All stage caches use the same keys as the sequential path in main.py, so
+both paths share cached results.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.pipeline.streaming import Stage, StreamingPipeline
+from src.utils.parser_backend import DEFAULT_BACKEND
+from src.utils.stage_cache import StageCache
+
+DEDUP_VERSION = "simhash-v1"
+
+
+def find_filing_file(filing_folder: Path):
+    """Sucht die lesbare Filing-Datei im Download-Ordner (.txt, .txt.zst, .html, .htm)."""
+    for pattern in ["full-submission.txt", "full-submission.txt.zst", "*.html", "*.htm"]:
+        matches = list(filing_folder.glob(pattern))
+        if matches:
+            return matches[0]
+    return None
+
+
+def extract_metrics(filing_path: Path, cache: StageCache, parser: str = DEFAULT_BACKEND,
+                    filing_hash: Optional[str] = None):
+    """Finanzkennzahlen eines Filings (gecacht nach Filing-Hash).
+
+    Returns:
+        (metrics, metrics_hash)
+    """
+    from src.analyzers.unified_extractor import UnifiedExtractor
+
+    return cache.run(
+        "metrics", UnifiedExtractor.VERSION,
+        {"filing": filing_hash or StageCache.hash_file(filing_path), "parser": parser},
+        lambda: UnifiedExtractor(filing_path, backend=parser).get_clean_metrics()
+    )
+
+
+def extract_risk_paragraphs(filing_path: Path, cache: StageCache, parser: str = DEFAULT_BACKEND,
+                            filing_hash: Optional[str] = None, max_paragraphs: int = 30):
+    """Risikoabsätze eines Filings (gecacht nach Filing-Hash).
+
+    max_paragraphs > 30 liefert mehr Kandidaten, z.B. für das adaptive Scoring.
+
+    Returns:
+        (extraction, paragraphs_hash) – extraction enthält 'paragraphs' und 'section_offsets'.
+    """
+    from src.analyzers.risk_extractor import RiskExtractor
+
+    def extract():
+        risk_extractor = RiskExtractor(filing_path, backend=parser)
+        paragraphs = risk_extractor.extract_risk_paragraphs(max_paragraphs=max_paragraphs)
+        return {"paragraphs": paragraphs, "section_offsets": risk_extractor.section_offsets}
+
+    inputs = {"filing": filing_hash or StageCache.hash_file(filing_path), "parser": parser}
+    if max_paragraphs != 30:  # Standard-Schlüssel unverändert lassen (bestehende Cache-Einträge)
+        inputs["max_paragraphs"] = str(max_paragraphs)
+    return cache.run("risk_paragraphs", RiskExtractor.VERSION, inputs, extract)
+
+
+def sentiment_inputs(paragraphs_hash: str, model_name: str, categories: Optional[str] = None) -> Dict[str, str]:
+    """Cache-Eingaben der Sentiment-Stufe (categories: Fingerprint der semantischen Kategorisierung)."""
+    inputs = {"paragraphs": paragraphs_hash, "model": model_name, "dedup": DEDUP_VERSION}
+    if categories:
+        inputs["categories"] = categories
+    return inputs
+
+
+def risk_metadata(filing_path: Path, filing_hash: str, model_name: str, keyword_scanner) -> Dict:
+    """Metadaten eines Risiko-Ergebnisdokuments (RiskReporter.build_result)."""
+    return {
+        "filing": str(filing_path),
+        "accession": filing_path.parent.name,
+        "filing_sha256": filing_hash,
+        "model": model_name,
+        "keyword_categories": sorted(keyword_scanner.keyword_categories),
+        "keyword_fingerprint": keyword_scanner.fingerprint(),
+    }
+
+
+def extract_job(job: Dict) -> Dict:
+    """
+    Parse one job in a worker process. Module-level so the process pool can pickle it.
+    The cache is file-based, so workers share it with the main process.
+    """
+    cache = StageCache(cache_dir=job["cache_dir"], enabled=job["cache_enabled"])
+    filing_path = Path(job["filing_path"])
+    if job["job"] == "metrics":
+        job["metrics"], job["metrics_hash"] = extract_metrics(
+            filing_path, cache, job["parser"], job["filing_hash"])
+    else:
+        job["extraction"], job["paragraphs_hash"] = extract_risk_paragraphs(
+            filing_path, cache, job["parser"], job["filing_hash"])
+    return job
+
+
+class FilingPipeline:
+    """
+    Builds and runs the streaming pipeline for a list of tickers/filings.
+
+    Args:
+        company_name, email: SEC user agent
+        full_analysis (bool): Also run the risk analysis (otherwise metrics only)
+        offline (bool): Use already downloaded filings only
+        parser (str): Parser backend
+        cache (StageCache): Shared stage cache
+        download_workers / parse_workers: Parallelism of the I/O and parsing stages
+        score_batch (int): Filings per FinBERT call
+        queue_size (int): Capacity of every stage inbox
+        inference (InferenceScheduler): Score on pinned model replicas instead of
+            one in-process FinBERT (the caller closes it)
+        compress (bool): Store downloaded submissions zstd-compressed
+        output_dir (str): Metrics and reports go to <output_dir>/filings/<TICKER>/<accession>/,
+            results are appended to <output_dir>/risk_results.jsonl
+    """
+
+    def __init__(self, company_name: str = "Investor", email: str = "investor@example.com",
+                 full_analysis: bool = False, offline: bool = False,
+                 parser: str = DEFAULT_BACKEND, cache: Optional[StageCache] = None,
+                 download_workers: int = 4, parse_workers: int = 2, score_batch: int = 4,
+                 queue_size: int = 8, output_dir: str = "data/processed",
+                 peer_store_path: Optional[str] = "data/processed/peer_store.npz",
+                 inference=None, compress: bool = False):
+        self.company_name = company_name
+        self.email = email
+        self.full_analysis = full_analysis
+        self.offline = offline
+        self.parser = parser
+        self.cache = cache or StageCache()
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers
+        self.score_batch = score_batch
+        self.queue_size = queue_size
+        self.output_dir = Path(output_dir)
+        self.peer_store_path = peer_store_path
+        self.inference = inference
+        self.compress = compress
+
+        self._downloader = None
+        self._analyzer = None
+        self._deduplicator = None
+        self._keyword_scanner = None
+        self._pending: Dict[str, Dict] = {}
+        self._peer_store = None
+        self.pipeline = None  # letzte StreamingPipeline (errors, stats)
+
+    # ── Stufen ──────────────────────────────────────────────────────────────
+    def download(self, item: Dict) -> Dict:
+        if item.get("filing_path"):
+            return item
+        from src.scrapers.sec_downloader import SECDownloader
+
+        if self._downloader is None:
+            self._downloader = SECDownloader(self.company_name, self.email, compress=self.compress)
+        ticker = item["ticker"].upper()
+        if self.offline:
+            folders = self._downloader.find_local_10k(ticker)
+        else:
+            folders = self._downloader.download_10k(ticker)
+        filing_path = find_filing_file(Path(folders[0])) if folders else None
+        if filing_path is None:
+            raise FileNotFoundError(f"Kein 10-K für {ticker} gefunden")
+        return {**item, "ticker": ticker, "filing_path": str(filing_path)}
+
+    def split(self, item: Dict) -> List[Dict]:
+        filing_hash = StageCache.hash_file(Path(item["filing_path"]))
+        kinds = ["metrics", "risks"] if self.full_analysis else ["metrics"]
+        return [{
+            "job": kind,
+            "parts": len(kinds),
+            "key": item.get("key", item["ticker"]),
+            "ticker": item["ticker"],
+            "filing_path": item["filing_path"],
+            "filing_hash": filing_hash,
+            "parser": self.parser,
+            "cache_dir": str(self.cache.cache_dir),
+            "cache_enabled": self.cache.enabled,
+        } for kind in kinds]
+
+    def segment(self, job: Dict) -> Dict:
+        if job["job"] != "risks":
+            return job
+        from src.analyzers.keyword_scanner import KeywordScanner
+        from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+
+        if self._keyword_scanner is None:
+            self._keyword_scanner = KeywordScanner()
+        paragraphs = job["extraction"]["paragraphs"]
+        job["keywords"], job["keywords_hash"] = self.cache.run(
+            "keywords", self._keyword_scanner.fingerprint(), {"paragraphs": job["paragraphs_hash"]},
+            lambda: self._keyword_scanner.scan_risks(paragraphs)
+        )
+        job["sentiment_key"] = self.cache.stage_key(
+            "sentiment", SentimentAnalyzer.VERSION,
+            sentiment_inputs(job["paragraphs_hash"], SentimentAnalyzer.MODEL_NAME))
+        entry = self.cache.get("sentiment", job["sentiment_key"]) if paragraphs else None
+        if entry is not None:
+            print(f"  ♻️  Cache-Treffer: sentiment ({job['ticker']})")
+            job["sentiment"] = entry["value"]
+        return job
+
+    def score(self, jobs: List[Dict]) -> List[Dict]:
+        """Score the paragraphs of all uncached filings in this batch with one FinBERT call."""
+        todo = [j for j in jobs if j["job"] == "risks" and "sentiment" not in j
+                and j["extraction"]["paragraphs"]]
+        if todo:
+            from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+
+            paragraphs = [p for j in todo for p in j["extraction"]["paragraphs"]]
+            if self.inference is not None:
+                from src.analyzers.paragraph_dedup import ParagraphDeduplicator
+
+                if self._deduplicator is None:
+                    self._deduplicator = ParagraphDeduplicator()
+                results = self._deduplicator.analyze(paragraphs, self.inference.score)
+            else:
+                if self._analyzer is None:
+                    self._analyzer = SentimentAnalyzer()
+                results = self._analyzer.analyze_risks(paragraphs, deduplicate=True)
+
+            start = 0
+            for job in todo:
+                count = len(job["extraction"]["paragraphs"])
+                own = [dict(r, paragraph_number=i + 1) for i, r in enumerate(results[start:start + count])]
+                start += count
+                job["sentiment"] = {"results": own, "score": SentimentAnalyzer.get_overall_risk_score(own)}
+                self.cache.put("sentiment", job["sentiment_key"], job["sentiment"])
+        return jobs
+
+    def aggregate(self, job: Dict) -> Optional[Dict]:
+        """Collect the jobs of one filing; emits the filing once all parts arrived."""
+        key = job["key"]
+        filing = self._pending.setdefault(key, {
+            "key": key, "ticker": job["ticker"], "filing_path": job["filing_path"],
+            "filing_hash": job["filing_hash"], "received": 0,
+        })
+        filing["received"] += 1
+        if job["job"] == "metrics":
+            filing["metrics"] = job["metrics"]
+        else:
+            filing.update(extraction=job["extraction"], keywords=job["keywords"],
+                          sentiment=job.get("sentiment"))
+        if filing["received"] < job["parts"]:
+            return None
+        del self._pending[key]
+        filing.pop("received")
+        return filing
+
+    def filing_output_dir(self, ticker: str, filing_path: Path) -> Path:
+        """Output folder of one filing: <output_dir>/filings/<TICKER>/<accession>/."""
+        return self.output_dir / "filings" / ticker.upper() / Path(filing_path).parent.name
+
+    def persist(self, filing: Dict) -> Dict:
+        from src.utils.data_storage import DataStorage
+
+        ticker = filing["ticker"]
+        outputs = {"key": filing["key"], "ticker": ticker, "filing_path": filing["filing_path"]}
+        # Eigener Ordner je Accession: mehrere 10-Ks eines Tickers überschreiben sich nicht
+        filing_dir = self.filing_output_dir(ticker, Path(filing["filing_path"]))
+        if filing.get("metrics"):
+            outputs["metrics_csv"] = str(DataStorage(str(filing_dir)).save_metrics(ticker, filing["metrics"]))
+
+        sentiment = filing.get("sentiment")
+        if sentiment:
+            from src.analyzers.risk_reporter import RiskReporter
+            from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+
+            reporter = RiskReporter()
+            result = reporter.build_result(
+                ticker=ticker,
+                sentiment_results=sentiment["results"],
+                keyword_results=filing["keywords"],
+                overall_risk_score=sentiment["score"],
+                section_offsets=filing["extraction"]["section_offsets"],
+                metrics=filing.get("metrics"),
+                metadata=risk_metadata(Path(filing["filing_path"]), filing["filing_hash"],
+                                       SentimentAnalyzer.MODEL_NAME, self._keyword_scanner),
+            )
+            outputs["report"] = str(reporter.save_report(reporter.render_report(result), ticker,
+                                                         str(filing_dir)))
+            outputs["result"] = str(reporter.save_result(result, str(self.output_dir)))
+            outputs["risk_score"] = sentiment["score"]
+
+            if self.peer_store_path:
+                from src.analyzers.peer_scoring import PeerRiskStore
+
+                if self._peer_store is None:
+                    self._peer_store = PeerRiskStore.load(self.peer_store_path)
+                self._peer_store.add_filing(ticker, sentiment["results"], filing["keywords"],
+                                            filing_id=result["metadata"]["accession"])
+        print(f"✅ {ticker} gespeichert")
+        return outputs
+
+    def _save_peer_store(self):
+        # Einmal am Ende statt nach jedem Filing
+        if self._peer_store is not None:
+            self._peer_store.save(self.peer_store_path)
+
+    # ── Aufbau ──────────────────────────────────────────────────────────────
+    def build(self, observer=None) -> StreamingPipeline:
+        return StreamingPipeline([
+            Stage("download", self.download, workers=self.download_workers),
+            Stage("split", self.split, fan_out=True),
+            Stage("extract", extract_job, workers=self.parse_workers, executor="process"),
+            Stage("segment", self.segment),
+            Stage("score", self.score, executor="batch", batch_size=self.score_batch),
+            Stage("aggregate", self.aggregate),
+            Stage("persist", self.persist, on_close=self._save_peer_store),
+        ], queue_size=self.queue_size, observer=observer)
+
+    def run(self, items: Iterable[Dict], observer=None) -> List[Dict]:
+        """
+        Run the pipeline over items ({"ticker"} or {"ticker", "filing_path"},
+        optionally with a unique "key"; default key is the ticker).
+        Errors and per-stage stats are kept in self.pipeline.
+
+        Returns:
+            One output dict per persisted filing (paths of the written files)
+        """
+        self._pending = {}  # Reste eines abgebrochenen Laufs verwerfen
+        self.pipeline = self.build(observer)
+        return self.pipeline.run(items)
+
+    def error_messages(self) -> Dict[str, str]:
+        """First error of each item in the last run, as "stage: error" by item key."""
+        errors = {}
+        for error in (self.pipeline.errors if self.pipeline is not None else []):
+            item = error["item"] or {}
+            errors.setdefault(item.get("key", item.get("ticker")), f"{error['stage']}: {error['error']}")
+        return errors
+
+    def run_journaled(self, journal, run_id: str, max_attempts: int = 3) -> Dict[str, int]:
+        """
+        Run all open items of a journaled run; failed items are retried until
+        they succeed or used up max_attempts (also across --resume).
+
+        Returns:
+            Item count per status after the run
+        """
+        def observe(stage, item, seconds, error):
+            name = f"{stage}:{item['job']}" if "job" in item else stage
+            journal.record_stage(run_id, item.get("key", item.get("ticker")), name, seconds, error)
+
+        while True:
+            items = journal.claim(run_id, max_attempts)
+            if not items:
+                break
+            print(f"\nRun {run_id}: {len(items)} offene Items")
+            outputs = self.run(items, observer=observe)
+            finished = set()
+            for output in outputs:
+                journal.item_done(run_id, output["key"], output)
+                finished.add(output["key"])
+
+            errors = self.error_messages()
+            for item in items:
+                if item["key"] not in finished:
+                    journal.item_failed(run_id, item["key"], errors.get(item["key"], "unvollständig"))
+
+        journal.finish_run(run_id)
+        return journal.summary(run_id)
@@ -0,0 +1,274 @@
+"""
+Inference Scheduler - FinBERT replicas sized and pinned to the CPU topology
+
+Several SentimentAnalyzer instances in one process (or several processes
+with default settings) each start one torch thread per core, so N replicas
+run N×cores threads and throughput drops. The scheduler instead starts
+`replicas` worker processes with `threads` intra-op threads each, pins every
+replica to its own set of physical cores and feeds all of them from one
+shared batch queue:
+
+    scheduler = InferenceScheduler(replicas=2, threads=4)
+    results = scheduler.score(paragraphs)     # analyze_risks format
+    scheduler.close()
+
+`python main.py calibrate` measures paragraphs/second for every sensible
+(replicas × threads) configuration on the current machine and stores the
+best one; InferenceScheduler.from_calibration() picks it up.
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+CALIBRATION_PATH = Path("data/processed/inference_calibration.json")
+
+
+# ── CPU-Topologie ───────────────────────────────────────────────────────────
+def cpu_topology() -> List[List[int]]:
+    """
+    Usable logical CPUs grouped by physical core (hyperthread siblings together).
+
+    Reads Linux sysfs; elsewhere every usable CPU counts as its own core.
+    """
+    try:
+        usable = sorted(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        usable = list(range(os.cpu_count() or 1))
+
+    cores: Dict[Tuple[str, str], List[int]] = {}
+    for cpu in usable:
+        topology = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology")
+        try:
+            key = ((topology / "physical_package_id").read_text().strip(),
+                   (topology / "core_id").read_text().strip())
+        except OSError:
+            key = ("cpu", str(cpu))
+        cores.setdefault(key, []).append(cpu)
+    return list(cores.values())
+
+
+def plan_affinity(replicas: int, threads: int, topology: Optional[List[List[int]]] = None) -> List[List[int]]:
+    """
+    CPU sets for each replica: `threads` physical cores per replica (one logical
+    CPU each), no core shared between replicas. Hyperthread siblings are only
+    used when there are more threads than physical cores.
+
+    Returns:
+        One list of logical CPU ids per replica
+    """
+    topology = topology or cpu_topology()
+    primary = [core[0] for core in topology]
+    if replicas * threads <= len(primary):
+        return [primary[i * threads:(i + 1) * threads] for i in range(replicas)]
+    # Mehr Threads als physische Kerne: erst alle ersten, dann die Geschwister-Threads, zyklisch
+    logical = [core[level] for level in range(max(len(core) for core in topology))
+               for core in topology if len(core) > level]
+    return [[logical[(i * threads + j) % len(logical)] for j in range(threads)] for i in range(replicas)]
+
+
+def candidate_configs(cores: Optional[int] = None) -> List[Tuple[int, int]]:
+    """(replicas, threads) pairs that use the physical cores without oversubscription."""
+    cores = cores or len(cpu_topology())
+    configs = []
+    threads = 1
+    while threads <= cores:
+        configs.append((cores // threads, threads))
+        threads *= 2
+    if (1, cores) not in configs:
+        configs.append((1, cores))
+    return configs
+
+
+def default_config(cores: Optional[int] = None) -> Tuple[int, int]:
+    """Without calibration: replicas of up to 4 threads (FinBERT scales poorly beyond that)."""
+    cores = cores or len(cpu_topology())
+    threads = min(4, cores)
+    return max(1, cores // threads), threads
+
+
+# ── Worker-Prozesse ─────────────────────────────────────────────────────────
+def finbert_factory():
+    """Default model factory: one SentimentAnalyzer per replica."""
+    from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+    return SentimentAnalyzer()
+
+
+def _replica_main(factory: Callable, cpus: List[int], threads: int, tasks, results):
+    # Vor dem Import von torch setzen, sonst startet der OpenMP-Pool mit allen Kernen
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        pass
+
+    model = factory()
+    results.put(("ready", os.getpid(), None))
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        batch_id, texts = task
+        try:
+            results.put((batch_id, model.analyze_risks(texts), None))
+        except Exception as e:
+            results.put((batch_id, None, f"{type(e).__name__}: {e}"))
+
+
+class InferenceScheduler:
+    """
+    Pool of model replicas fed from one shared batch queue.
+
+    Args:
+        replicas (int): Number of worker processes (default: default_config()).
+        threads (int): Intra-op threads per replica.
+        batch_size (int): Paragraphs per queued batch.
+        factory (callable): Module-level function returning an object with
+            analyze_risks(texts) (default: finbert_factory).
+        pin (bool): Pin each replica to its own physical cores.
+    """
+
+    def __init__(self, replicas: Optional[int] = None, threads: Optional[int] = None, batch_size: int = 8,
+                 factory: Callable = finbert_factory, pin: bool = True):
+        default_replicas, default_threads = default_config()
+        self.replicas = replicas or default_replicas
+        self.threads = threads or default_threads
+        self.batch_size = batch_size
+        self.affinity = plan_affinity(self.replicas, self.threads) if pin else [[] for _ in range(self.replicas)]
+
+        # spawn: torch/OpenMP-Zustand darf nicht per fork geerbt werden
+        context = multiprocessing.get_context("spawn")
+        self._tasks = context.Queue(maxsize=self.replicas * 2)
+        self._results = context.Queue()
+        self._processes = [
+            context.Process(target=_replica_main, daemon=True,
+                            args=(factory, cpus, self.threads, self._tasks, self._results))
+            for cpus in self.affinity
+        ]
+        for process in self._processes:
+            process.start()
+        for _ in self._processes:
+            self._receive()  # warten, bis jedes Modell geladen ist
+        self._next_batch = 0
+        print(f"Inference-Scheduler: {self.replicas} Replikate × {self.threads} Threads "
+              f"(Kerne: {[cpus for cpus in self.affinity if cpus] or 'nicht gepinnt'})")
+
+    @classmethod
+    def from_calibration(cls, path: Path = CALIBRATION_PATH, **kwargs) -> "InferenceScheduler":
+        """Scheduler with the best configuration measured by calibrate() (default_config() without one)."""
+        path = Path(path)
+        if path.exists():
+            best = json.loads(path.read_text(encoding='utf-8'))["best"]
+            for key in ("replicas", "threads", "batch_size"):
+                if kwargs.get(key) is None:  # explizite Angaben haben Vorrang
+                    kwargs[key] = best[key]
+        return cls(**kwargs)
+
+    def _receive(self, timeout: float = 600):
+        while True:
+            try:
+                return self._results.get(timeout=1)
+            except queue.Empty:
+                if not all(p.is_alive() for p in self._processes):
+                    raise RuntimeError("Inference-Replikat unerwartet beendet")
+                timeout -= 1
+                if timeout <= 0:
+                    raise TimeoutError("Keine Antwort der Inference-Replikate")
+
+    def score(self, paragraphs: List[str]) -> List[Dict]:
+        """
+        Score paragraphs on all replicas (same format as SentimentAnalyzer.analyze_risks).
+        """
+        batches = {}
+        for start in range(0, len(paragraphs), self.batch_size):
+            batches[self._next_batch] = start
+            self._next_batch += 1
+
+        pending = list(batches.items())
+        collected, errors = {}, []
+        in_flight = 0
+        while pending or in_flight:
+            # Queue gefüllt halten, ohne mehr als nötig vorzuhalten
+            while pending and not self._tasks.full():
+                batch_id, start = pending.pop(0)
+                self._tasks.put((batch_id, paragraphs[start:start + self.batch_size]))
+                in_flight += 1
+            batch_id, results, error = self._receive()
+            in_flight -= 1
+            if error:
+                errors.append(error)
+            else:
+                collected[batch_id] = results
+        if errors:
+            raise RuntimeError(f"Inference fehlgeschlagen: {errors[0]}")
+
+        ordered = []
+        for batch_id, start in sorted(batches.items()):
+            for offset, result in enumerate(collected[batch_id]):
+                ordered.append(dict(result, paragraph_number=start + offset + 1))
+        return ordered
+
+    # Gleiche Schnittstelle wie SentimentAnalyzer (z.B. für ParagraphDeduplicator)
+    def analyze_risks(self, risk_paragraphs: List[str]) -> List[Dict]:
+        return self.score(risk_paragraphs)
+
+    def close(self):
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def calibrate(paragraphs: List[str], configs: Optional[List[Tuple[int, int]]] = None, batch_size: int = 8,
+              factory: Callable = finbert_factory, rounds: int = 2,
+              output: Optional[Path] = CALIBRATION_PATH) -> Dict:
+    """
+    Measure throughput of each (replicas, threads) configuration.
+
+    Every configuration is warmed up with one batch per replica, then scores
+    all paragraphs `rounds` times.
+
+    Returns:
+        {"cores", "results": [{"replicas", "threads", "batch_size", "paragraphs_per_second"}], "best"}
+    """
+    configs = configs or candidate_configs()
+    measurements = []
+    for replicas, threads in configs:
+        with InferenceScheduler(replicas, threads, batch_size=batch_size, factory=factory) as scheduler:
+            scheduler.score(paragraphs[:batch_size * replicas])  # Warmup
+            start = time.perf_counter()
+            for _ in range(rounds):
+                scheduler.score(paragraphs)
+            seconds = time.perf_counter() - start
+        rate = len(paragraphs) * rounds / seconds if seconds else float("inf")
+        measurements.append({"replicas": replicas, "threads": threads, "batch_size": batch_size,
+                             "paragraphs_per_second": round(rate, 2)})
+        print(f"  {replicas} × {threads} Threads: {rate:.1f} Absätze/s")
+
+    report = {
+        "cores": len(cpu_topology()),
+        "results": measurements,
+        "best": max(measurements, key=lambda m: m["paragraphs_per_second"]),
+    }
+    if output:
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    return report
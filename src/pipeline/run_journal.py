@@ -0,0 +1,162 @@
+"""
+Run Journal - Checkpoints of batch runs for resuming after a crash
+
+Every batch run gets a run id. The journal (one SQLite file for all runs)
+records per item (ticker/filing) its status, attempts and output locations,
+and per item and stage the status, duration and error. Writes are committed
+immediately, so an interrupted run loses at most the items in flight.
+
+    python main.py batch AAPL MSFT ... --full-analysis   # prints the run id
+    python main.py batch --resume 20250101-120000-ab12    # only pending/failed items
+    python main.py runs [RUN_ID]                           # status overview
+"""
+
+import json
+import secrets
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class RunJournal:
+    """
+    SQLite journal of batch runs (thread-safe; pipeline stages write concurrently).
+
+    Args:
+        path (str): Journal database.
+    """
+
+    def __init__(self, path: str = "data/runs/journal.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id  TEXT PRIMARY KEY,
+                created TEXT NOT NULL,
+                command TEXT NOT NULL,
+                status  TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                run_id     TEXT NOT NULL,
+                item_key   TEXT NOT NULL,
+                payload    TEXT NOT NULL,
+                status     TEXT NOT NULL,
+                attempts   INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                outputs    TEXT,
+                updated    TEXT,
+                PRIMARY KEY (run_id, item_key)
+            );
+            CREATE TABLE IF NOT EXISTS stages (
+                run_id   TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                stage    TEXT NOT NULL,
+                status   TEXT NOT NULL,
+                seconds  REAL,
+                error    TEXT,
+                finished TEXT,
+                PRIMARY KEY (run_id, item_key, stage)
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec='seconds')
+
+    # ── Runs ────────────────────────────────────────────────────────────────
+    def start_run(self, items: List[Dict], command: Dict, run_id: Optional[str] = None) -> str:
+        """
+        Register a new run and its items (all pending).
+
+        Args:
+            items: Work items; each needs a unique "key"
+            command: Run configuration, stored for --resume
+        """
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+        with self._lock, self.conn:
+            self.conn.execute("INSERT INTO runs VALUES (?, ?, ?, ?)",
+                              (run_id, self._now(), json.dumps(command), RUNNING))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO items (run_id, item_key, payload, status, updated) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, item["key"], json.dumps(item), PENDING, self._now()) for item in items])
+        return run_id
+
+    def run_info(self, run_id: str) -> Optional[Dict]:
+        row = self._execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        return {**dict(row), "command": json.loads(row["command"])}
+
+    def runs(self) -> List[Dict]:
+        return [dict(r) for r in self._execute("SELECT * FROM runs ORDER BY created DESC")]
+
+    def finish_run(self, run_id: str):
+        """Mark the run done if every item is done, failed otherwise."""
+        open_items = self._execute("SELECT COUNT(*) FROM items WHERE run_id = ? AND status != ?",
+                                   (run_id, DONE)).fetchone()[0]
+        self._execute("UPDATE runs SET status = ? WHERE run_id = ?",
+                      (DONE if open_items == 0 else FAILED, run_id))
+
+    # ── Items ───────────────────────────────────────────────────────────────
+    def claim(self, run_id: str, max_attempts: int) -> List[Dict]:
+        """
+        Items still to do: pending, failed or interrupted (running) with attempts left.
+        Their attempt counter is incremented and they are marked running.
+        """
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT item_key, payload FROM items WHERE run_id = ? AND status != ? AND attempts < ?",
+                (run_id, DONE, max_attempts)).fetchall()
+            self.conn.executemany(
+                "UPDATE items SET status = ?, attempts = attempts + 1, updated = ? WHERE run_id = ? AND item_key = ?",
+                [(RUNNING, self._now(), run_id, r["item_key"]) for r in rows])
+        return [json.loads(r["payload"]) for r in rows]
+
+    def item_done(self, run_id: str, key: str, outputs: Dict):
+        self._execute("UPDATE items SET status = ?, outputs = ?, last_error = NULL, updated = ? "
+                      "WHERE run_id = ? AND item_key = ?",
+                      (DONE, json.dumps(outputs), self._now(), run_id, key))
+
+    def item_failed(self, run_id: str, key: str, error: str):
+        self._execute("UPDATE items SET status = ?, last_error = ?, updated = ? WHERE run_id = ? AND item_key = ?",
+                      (FAILED, error, self._now(), run_id, key))
+
+    def items(self, run_id: str, status: Optional[str] = None) -> List[Dict]:
+        query, params = "SELECT * FROM items WHERE run_id = ?", [run_id]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        rows = self._execute(query + " ORDER BY item_key", params).fetchall()
+        return [{**dict(r), "outputs": json.loads(r["outputs"]) if r["outputs"] else None} for r in rows]
+
+    # ── Stufen ──────────────────────────────────────────────────────────────
+    def record_stage(self, run_id: str, key: str, stage: str, seconds: float, error: Optional[str] = None):
+        self._execute("INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      (run_id, key, stage, FAILED if error else DONE, round(seconds, 3), error, self._now()))
+
+    def stages(self, run_id: str, key: Optional[str] = None) -> List[Dict]:
+        query, params = "SELECT * FROM stages WHERE run_id = ?", [run_id]
+        if key:
+            query += " AND item_key = ?"
+            params.append(key)
+        return [dict(r) for r in self._execute(query + " ORDER BY item_key, finished", params).fetchall()]
+
+    def summary(self, run_id: str) -> Dict[str, int]:
+        """Number of items per status."""
+        rows = self._execute("SELECT status, COUNT(*) AS n FROM items WHERE run_id = ? GROUP BY status",
+                             (run_id,)).fetchall()
+        return {r["status"]: r["n"] for r in rows}
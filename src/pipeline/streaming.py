@@ -0,0 +1,258 @@
+"""
+Streaming Pipeline - Stages connected by bounded queues
+
+Each stage pulls items from its inbox, processes them and pushes the
+results into the inbox of the next stage. Inboxes are bounded, so a slow
+stage blocks its producers (backpressure) and the number of items in
+flight – and with it memory – stays bounded no matter how large the batch.
+
+Executor types per stage:
+    "thread"  – N worker threads (network / disk I/O)
+    "process" – N worker threads feeding a process pool (CPU-bound parsing)
+    "batch"   – one thread that collects up to batch_size items per call
+                (model inference: one model instance, batched forward passes)
+
+Stages overlap: while the model scores filing 1, filing 2 is being parsed
+and filing 3 downloaded.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+EXECUTORS = ("thread", "process", "batch")
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline stage.
+
+    Args:
+        name (str): Stage name (for stats and errors).
+        fn (callable): item → output. For "batch" stages: list of items → list of outputs.
+            For "process" stages fn must be a picklable module-level function.
+        workers (int): Parallel workers ("batch" stages always use one).
+        executor (str): "thread", "process" or "batch".
+        queue_size (int): Capacity of the stage's inbox (default: pipeline queue_size).
+        fan_out (bool): fn returns a list of outputs per item (None/[] drops the item).
+        batch_size (int): Maximum items per call of a "batch" stage.
+        batch_wait (float): Seconds a "batch" stage waits for more items before calling fn.
+        on_close (callable): Called once after the stage has processed its last item.
+    """
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1, executor: str = "thread",
+                 queue_size: Optional[int] = None, fan_out: bool = False,
+                 batch_size: int = 8, batch_wait: float = 0.05,
+                 on_close: Optional[Callable[[], Any]] = None):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}' (available: {', '.join(EXECUTORS)})")
+        self.name = name
+        self.fn = fn
+        self.executor = executor
+        self.workers = 1 if executor == "batch" else max(1, workers)
+        self.queue_size = queue_size
+        self.fan_out = fan_out
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.on_close = on_close
+
+
+class StreamingPipeline:
+    """
+    Runs items through a chain of stages with overlapping execution.
+
+    Args:
+        stages (list): Stages in processing order.
+        queue_size (int): Default inbox capacity per stage.
+        observer (callable): Called as observer(stage_name, item, seconds, error) after
+            every item a stage processed (error is None on success), e.g. for a run journal.
+
+    Attributes (after run):
+        errors (list): {"stage", "item", "error"} for every item a stage failed on
+            (the item is dropped, the pipeline keeps going).
+        stats (dict): Per stage: processed, errors, busy_seconds, max_queue.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8,
+                 observer: Optional[Callable[[str, Any, float, Optional[str]], None]] = None):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.observer = observer
+        self.errors: List[Dict] = []
+        self.stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def run(self, items: Iterable) -> List:
+        """Process all items; returns the outputs of the last stage (None outputs are dropped)."""
+        self.errors = []
+        self.stats = {s.name: {"processed": 0, "errors": 0, "busy_seconds": 0.0, "max_queue": 0}
+                      for s in self.stages}
+
+        if any(s.executor == "process" for s in self.stages):
+            from concurrent.futures import ProcessPoolExecutor  # multiprocessing nur bei Bedarf laden
+
+        inboxes = [queue.Queue(maxsize=s.queue_size or self.queue_size) for s in self.stages]
+        outbox = queue.Queue()
+        pools = {i: ProcessPoolExecutor(max_workers=s.workers)
+                 for i, s in enumerate(self.stages) if s.executor == "process"}
+        remaining = [s.workers for s in self.stages]
+
+        def downstream(index):
+            return inboxes[index + 1] if index + 1 < len(self.stages) else outbox
+
+        def finish(index):
+            # Letzter Worker einer Stufe beendet die Workers der nächsten Stufe
+            with self._lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if not last:
+                return
+            stage = self.stages[index]
+            if stage.on_close is not None:
+                try:
+                    stage.on_close()
+                except Exception as e:
+                    self._record_error(stage, None, e)
+            next_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            for _ in range(next_workers):
+                downstream(index).put(_DONE)
+
+        threads = [threading.Thread(target=self._feed, args=(items, inboxes[0]), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            target = self._batch_worker if stage.executor == "batch" else self._item_worker
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=target, args=(index, inboxes[index], downstream(index), pools.get(index), finish),
+                    name=f"{stage.name}-worker", daemon=True))
+
+        for thread in threads:
+            thread.start()
+
+        outputs = []
+        try:
+            while True:
+                output = outbox.get()
+                if output is _DONE:
+                    break
+                outputs.append(output)
+            for thread in threads:
+                thread.join()
+        finally:
+            for pool in pools.values():
+                pool.shutdown()
+        return outputs
+
+    def _feed(self, items: Iterable, inbox: queue.Queue):
+        try:
+            for item in items:
+                inbox.put(item)  # blockiert, wenn die erste Stufe voll ist
+        except Exception as e:
+            self._record_error(None, None, e)
+        finally:
+            for _ in range(self.stages[0].workers):
+                inbox.put(_DONE)
+
+    def _emit(self, stage: Stage, output, target: queue.Queue):
+        outputs = (output or []) if stage.fan_out else [output]
+        for out in outputs:
+            if out is not None:
+                target.put(out)
+                stats = self.stats[stage.name]
+                stats["max_queue"] = max(stats["max_queue"], target.qsize())
+
+    def _item_worker(self, index: int, inbox: queue.Queue, target: queue.Queue, pool, finish):
+        stage = self.stages[index]
+        try:
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                try:
+                    if pool is not None:
+                        output = pool.submit(stage.fn, item).result()
+                    else:
+                        output = stage.fn(item)
+                except Exception as e:
+                    self._record_error(stage, item, e)
+                    self._observe(stage, item, start, e)
+                    continue
+                finally:
+                    self._account(stage, start)
+                self._observe(stage, item, start)
+                try:
+                    self._emit(stage, output, target)
+                except Exception as e:  # z.B. Fan-out-Stufe liefert kein Iterable
+                    self._record_error(stage, item, e)
+        finally:
+            # Auch bei unerwarteten Fehlern: sonst wartet run() ewig auf _DONE
+            finish(index)
+
+    def _batch_worker(self, index: int, inbox: queue.Queue, target: queue.Queue, pool, finish):
+        stage = self.stages[index]
+        done = False
+        try:
+            while not done:
+                first = inbox.get()
+                if first is _DONE:
+                    break
+                batch = [first]
+                deadline = time.monotonic() + stage.batch_wait
+                while len(batch) < stage.batch_size:
+                    try:
+                        item = inbox.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+
+                start = time.perf_counter()
+                try:
+                    outputs = stage.fn(batch)
+                except Exception as e:
+                    for item in batch:
+                        self._record_error(stage, item, e)
+                        self._observe(stage, item, start, e)
+                    continue
+                finally:
+                    self._account(stage, start, len(batch))
+                for item in batch:
+                    self._observe(stage, item, start)
+                try:
+                    for output in outputs:
+                        self._emit(stage, output, target)
+                except Exception as e:  # z.B. None statt einer Liste von Ergebnissen
+                    for item in batch:
+                        self._record_error(stage, item, e)
+        finally:
+            finish(index)
+
+    def _account(self, stage: Stage, start: float, count: int = 1):
+        with self._lock:
+            stats = self.stats[stage.name]
+            stats["processed"] += count
+            stats["busy_seconds"] += time.perf_counter() - start
+
+    def _observe(self, stage: Stage, item, start: float, error: Optional[Exception] = None):
+        if self.observer is None:
+            return
+        try:
+            self.observer(stage.name, item, time.perf_counter() - start,
+                          f"{type(error).__name__}: {error}" if error else None)
+        except Exception as e:
+            print(f"⚠️  Observer fehlgeschlagen: {e}")
+
+    def _record_error(self, stage: Optional[Stage], item, error: Exception):
+        name = stage.name if stage else "source"
+        with self._lock:
+            self.errors.append({"stage": name, "item": item, "error": f"{type(error).__name__}: {error}"})
+            if stage is not None:
+                self.stats[name]["errors"] += 1
+        print(f"⚠️  Stufe '{name}' fehlgeschlagen: {error}")
@@ -0,0 +1,503 @@
+"""
+Work Queue - Distributes batch work across processes and machines
+
+Tasks (e.g. one ticker with its stages) are leased by workers for a limited
+time. A worker extends its lease with heartbeats while it works; if it dies,
+the lease expires and another worker picks the task up again – until
+max_attempts is used up: a task whose lease keeps expiring (e.g. a filing
+that crashes or OOM-kills its worker) ends up failed instead of looping.
+After a lost lease the task may run twice; the stage outputs are
+content-addressed in the StageCache, so the re-run mostly repeats cheap
+cache hits, but side effects of the handler (e.g. appended result lines)
+happen again.
+
+Implementations (selected by URL, see open_queue):
+    sqlite:data/queue.sqlite   – one node (SQLite locking, any number of worker processes)
+    dir:/mnt/shared/queue      – several nodes on a shared directory (atomic renames)
+    redis://host:6379/0        – several nodes via Redis or a compatible server
+
+    python main.py queue put AAPL MSFT NVDA --queue dir:/mnt/shared/queue --full-analysis
+    python main.py worker --queue dir:/mnt/shared/queue        # on every node
+    python main.py queue status --queue dir:/mnt/shared/queue
+"""
+
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+LEASE_EXPIRED = "Lease abgelaufen (Worker abgestürzt oder hängt)"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+
+
+class WorkQueue:
+    """
+    Interface of all queue implementations.
+
+    A task is a dict {"id", "payload", "attempts", "max_attempts", ...}.
+    Task ids are chosen by the producer (e.g. the ticker), so putting the
+    same task twice is a no-op.
+    """
+
+    def put(self, tasks: Iterable[Dict], max_attempts: int = 3) -> int:
+        """Enqueue tasks ({"id", "payload"}); returns the number of new tasks."""
+        raise NotImplementedError
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Lease the next pending task, or None. Expired leases are handled first:
+        re-queued, or failed once the task has used up max_attempts.
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease; False if the worker no longer holds it."""
+        raise NotImplementedError
+
+    def complete(self, task_id: str, worker_id: str, result: Optional[Dict] = None):
+        """Mark a task done (idempotent – the first result wins)."""
+        raise NotImplementedError
+
+    def fail(self, task_id: str, worker_id: str, error: str):
+        """Release a task after an error; re-queued until max_attempts is reached."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """Number of tasks per status."""
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Queue in a SQLite database – for worker processes on one machine
+    (SQLite locking is not reliable on network file systems).
+    """
+
+    def __init__(self, path: str = "data/queue/queue.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; Transaktionen explizit mit BEGIN IMMEDIATE (Schreibsperre über Prozesse)
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id           TEXT PRIMARY KEY,
+                payload      TEXT NOT NULL,
+                status       TEXT NOT NULL,
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker       TEXT,
+                lease_until  REAL,
+                result       TEXT,
+                error        TEXT,
+                seq          INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, seq)")
+
+    def _transaction(self, fn):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = fn(self.conn)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return value
+
+    def put(self, tasks: Iterable[Dict], max_attempts: int = 3) -> int:
+        def insert(conn):
+            added = 0
+            for task in tasks:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO tasks (id, payload, status, max_attempts, seq) "
+                    "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM tasks))",
+                    (task["id"], json.dumps(task["payload"]), PENDING, max_attempts))
+                added += cursor.rowcount
+            return added
+        return self._transaction(insert)
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        def take(conn):
+            now = time.time()
+            conn.execute("UPDATE tasks SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                         "worker = NULL, error = ? WHERE status = ? AND lease_until < ?",
+                         (PENDING, FAILED, LEASE_EXPIRED, LEASED, now))
+            row = conn.execute("SELECT * FROM tasks WHERE status = ? ORDER BY seq LIMIT 1",
+                               (PENDING,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+                         "WHERE id = ?", (LEASED, worker_id, now + lease_seconds, row["id"]))
+            return {"id": row["id"], "payload": json.loads(row["payload"]),
+                    "attempts": row["attempts"] + 1, "max_attempts": row["max_attempts"]}
+        return self._transaction(take)
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        def extend(conn):
+            cursor = conn.execute("UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+                                  (time.time() + lease_seconds, task_id, worker_id, LEASED))
+            return cursor.rowcount > 0
+        return self._transaction(extend)
+
+    def complete(self, task_id: str, worker_id: str, result: Optional[Dict] = None):
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE tasks SET status = ?, worker = ?, result = ?, error = NULL WHERE id = ? AND status != ?",
+            (DONE, worker_id, json.dumps(result), task_id, DONE)))
+
+    def fail(self, task_id: str, worker_id: str, error: str):
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+            "worker = NULL, error = ? WHERE id = ? AND worker = ? AND status = ?",
+            (PENDING, FAILED, error, task_id, worker_id, LEASED)))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def results(self) -> Dict[str, Dict]:
+        """Results of all completed tasks by id."""
+        with self._lock:
+            rows = self.conn.execute("SELECT id, worker, result FROM tasks WHERE status = ?", (DONE,)).fetchall()
+        return {r["id"]: {"worker": r["worker"], "result": json.loads(r["result"])} for r in rows}
+
+
+class DirectoryWorkQueue(WorkQueue):
+    """
+    Queue as JSON files in a (shared) directory:
+
+        pending/<id>.json  →  leased/<id>.json  →  done/<id>.json | failed/<id>.json
+
+    Taking a task is an atomic rename, so only one worker on any node wins.
+    The lease expiry is stored as the modification time of the leased file;
+    heartbeats just touch it.
+
+    Args:
+        root (str): Queue directory.
+        claim_timeout (float): Seconds after which a *.claim file (a worker died
+            between taking a task and writing its lease) is re-queued.
+    """
+
+    def __init__(self, root: str = "data/queue", claim_timeout: float = 60):
+        self.root = Path(root)
+        self.claim_timeout = claim_timeout
+        for status in (PENDING, LEASED, DONE, FAILED, "tmp"):
+            (self.root / status).mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _filename(task_id: str) -> str:
+        return re.sub(r'[^A-Za-z0-9._-]', '_', task_id) + ".json"
+
+    def _path(self, status: str, task_id: str) -> Path:
+        return self.root / status / self._filename(task_id)
+
+    def _write(self, path: Path, task: Dict, mtime: Optional[float] = None):
+        """Atomic write: temp file on the same file system, then rename."""
+        tmp = self.root / "tmp" / f"{uuid.uuid4().hex}.json"
+        tmp.write_text(json.dumps(task), encoding='utf-8')
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict]:
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, tasks: Iterable[Dict], max_attempts: int = 3) -> int:
+        added = 0
+        for task in tasks:
+            if any(self._path(s, task["id"]).exists() for s in (PENDING, LEASED, DONE, FAILED)):
+                continue
+            record = {"id": task["id"], "payload": task["payload"], "attempts": 0,
+                      "max_attempts": max_attempts, "created": time.time()}
+            self._write(self._path(PENDING, task["id"]), record)
+            added += 1
+        return added
+
+    def _requeue_expired(self):
+        now = time.time()
+        for path in (self.root / LEASED).glob("*.json"):
+            try:
+                if path.stat().st_mtime >= now:
+                    continue
+                task = self._read(path)
+                exhausted = task is not None and task["attempts"] >= task["max_attempts"]
+                # Umbenennen ist atomar: nur ein Worker verschiebt den abgelaufenen Lease
+                os.rename(path, self.root / (FAILED if exhausted else PENDING) / path.name)
+            except FileNotFoundError:
+                continue  # anderer Worker war schneller
+            if exhausted:
+                task.update(error=LEASE_EXPIRED, worker=None)
+                self._write(self.root / FAILED / path.name, task)
+
+        # Verwaiste Claims: Worker starb zwischen Umbenennen und Schreiben des Leases.
+        # rename() setzt ctime, die mtime stammt noch aus pending/
+        for claim in (self.root / LEASED).glob("*.claim"):
+            try:
+                if claim.stat().st_ctime >= now - self.claim_timeout:
+                    continue
+                os.rename(claim, self.root / PENDING / f"{claim.name.rsplit('.', 2)[0]}.json")
+            except FileNotFoundError:
+                continue
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        self._requeue_expired()
+        for path in sorted((self.root / PENDING).glob("*.json")):
+            # Erst unter einem Namen beanspruchen, den _requeue_expired nicht sieht,
+            # dann die Lease-Zeit setzen (die mtime aus pending ist bereits "abgelaufen")
+            claim = self.root / LEASED / f"{path.stem}.{uuid.uuid4().hex}.claim"
+            try:
+                os.rename(path, claim)  # atomar: genau ein Worker gewinnt
+            except FileNotFoundError:
+                continue
+            task = self._read(claim)
+            if task is None:
+                continue
+            task["attempts"] += 1
+            task["worker"] = worker_id
+            self._write(self.root / LEASED / path.name, task, mtime=time.time() + lease_seconds)
+            try:
+                claim.unlink()
+            except FileNotFoundError:
+                pass
+            return task
+        return None
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        path = self._path(LEASED, task_id)
+        task = self._read(path)
+        if task is None or task.get("worker") != worker_id:
+            return False
+        expiry = time.time() + lease_seconds
+        try:
+            os.utime(path, (expiry, expiry))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, task_id: str, worker_id: str, result: Optional[Dict] = None):
+        done = self._path(DONE, task_id)
+        task = self._read(self._path(LEASED, task_id)) or {"id": task_id}
+        if not done.exists():
+            self._write(done, {**task, "worker": worker_id, "result": result, "finished": time.time()})
+        # Evtl. nach abgelaufenem Lease erneut eingereihte oder aufgegebene Kopien entfernen
+        for status in (LEASED, PENDING, FAILED):
+            try:
+                self._path(status, task_id).unlink()
+            except FileNotFoundError:
+                pass
+
+    def fail(self, task_id: str, worker_id: str, error: str):
+        leased = self._path(LEASED, task_id)
+        task = self._read(leased)
+        if task is None or task.get("worker") != worker_id:
+            return
+        task.update(error=error, worker=None)
+        target = PENDING if task["attempts"] < task["max_attempts"] else FAILED
+        self._write(self._path(target, task_id), task)
+        try:
+            leased.unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        counts = {s: len(list((self.root / s).glob("*.json"))) for s in (PENDING, LEASED, DONE, FAILED)}
+        return {s: n for s, n in counts.items() if n}
+
+    def results(self) -> Dict[str, Dict]:
+        results = {}
+        for path in (self.root / DONE).glob("*.json"):
+            task = self._read(path)
+            if task:
+                results[task["id"]] = {"worker": task.get("worker"), "result": task.get("result")}
+        return results
+
+
+# Atomar: Task aus pending holen und Lease eintragen
+_REDIS_LEASE = """
+local id = redis.call('RPOP', KEYS[1])
+if not id then return nil end
+redis.call('ZADD', KEYS[2], ARGV[1], id)
+redis.call('HSET', KEYS[3], id, ARGV[2])
+return id
+"""
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Queue in Redis (or a compatible server such as Valkey/KeyDB) – requires the
+    optional `redis` package.
+
+    Keys: <prefix>:tasks (hash id → task), <prefix>:pending (list),
+    <prefix>:leases (sorted set id → expiry), <prefix>:owners (hash id → worker),
+    <prefix>:done / <prefix>:failed (sets).
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "fra-queue"):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("RedisWorkQueue benötigt das Paket 'redis' (pip install redis)")
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.keys = {name: f"{prefix}:{name}" for name in ("tasks", "pending", "leases", "owners", "done", "failed")}
+        self._lease_script = self.redis.register_script(_REDIS_LEASE)
+
+    def _task(self, task_id: str) -> Optional[Dict]:
+        raw = self.redis.hget(self.keys["tasks"], task_id)
+        return json.loads(raw) if raw else None
+
+    def put(self, tasks: Iterable[Dict], max_attempts: int = 3) -> int:
+        added = 0
+        for task in tasks:
+            record = {"id": task["id"], "payload": task["payload"], "attempts": 0, "max_attempts": max_attempts}
+            if self.redis.hsetnx(self.keys["tasks"], task["id"], json.dumps(record)):
+                self.redis.lpush(self.keys["pending"], task["id"])
+                added += 1
+        return added
+
+    def _requeue_expired(self):
+        for task_id in self.redis.zrangebyscore(self.keys["leases"], "-inf", time.time()):
+            if not self.redis.zrem(self.keys["leases"], task_id):  # nur ein Worker reiht wieder ein
+                continue
+            self.redis.hdel(self.keys["owners"], task_id)
+            task = self._task(task_id)
+            if task is not None and task["attempts"] >= task["max_attempts"]:
+                task["error"] = LEASE_EXPIRED
+                self.redis.hset(self.keys["tasks"], task_id, json.dumps(task))
+                self.redis.sadd(self.keys["failed"], task_id)
+            else:
+                self.redis.lpush(self.keys["pending"], task_id)
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        self._requeue_expired()
+        task_id = self._lease_script(
+            keys=[self.keys["pending"], self.keys["leases"], self.keys["owners"]],
+            args=[time.time() + lease_seconds, worker_id])
+        if task_id is None:
+            return None
+        task = self._task(task_id)
+        task["attempts"] += 1
+        self.redis.hset(self.keys["tasks"], task_id, json.dumps(task))
+        return task
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        if self.redis.hget(self.keys["owners"], task_id) != worker_id:
+            return False
+        if self.redis.zscore(self.keys["leases"], task_id) is None:
+            return False
+        self.redis.zadd(self.keys["leases"], {task_id: time.time() + lease_seconds}, xx=True)
+        return True
+
+    def complete(self, task_id: str, worker_id: str, result: Optional[Dict] = None):
+        if self.redis.sadd(self.keys["done"], task_id):
+            task = self._task(task_id) or {"id": task_id}
+            task.update(worker=worker_id, result=result)
+            self.redis.hset(self.keys["tasks"], task_id, json.dumps(task))
+        self.redis.zrem(self.keys["leases"], task_id)
+        self.redis.hdel(self.keys["owners"], task_id)
+        self.redis.lrem(self.keys["pending"], 0, task_id)
+        self.redis.srem(self.keys["failed"], task_id)
+
+    def fail(self, task_id: str, worker_id: str, error: str):
+        if self.redis.hget(self.keys["owners"], task_id) != worker_id:
+            return
+        self.redis.zrem(self.keys["leases"], task_id)
+        self.redis.hdel(self.keys["owners"], task_id)
+        task = self._task(task_id)
+        task["error"] = error
+        self.redis.hset(self.keys["tasks"], task_id, json.dumps(task))
+        if task["attempts"] < task["max_attempts"]:
+            self.redis.lpush(self.keys["pending"], task_id)
+        else:
+            self.redis.sadd(self.keys["failed"], task_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {
+            PENDING: self.redis.llen(self.keys["pending"]),
+            LEASED: self.redis.zcard(self.keys["leases"]),
+            DONE: self.redis.scard(self.keys["done"]),
+            FAILED: self.redis.scard(self.keys["failed"]),
+        }
+        return {s: n for s, n in counts.items() if n}
+
+
+def open_queue(url: str) -> WorkQueue:
+    """
+    Open a queue by URL: "sqlite:<path>", "dir:<path>" or "redis://host:port/db".
+    A plain path ending in .sqlite/.db is a SQLite queue, any other plain path a directory queue.
+    """
+    if url.startswith(("redis://", "rediss://")):
+        return RedisWorkQueue(url)
+    if url.startswith("sqlite:"):
+        return SQLiteWorkQueue(url[len("sqlite:"):])
+    if url.startswith("dir:"):
+        return DirectoryWorkQueue(url[len("dir:"):])
+    if url.endswith((".sqlite", ".db")):
+        return SQLiteWorkQueue(url)
+    return DirectoryWorkQueue(url)
+
+
+def run_worker(queue: WorkQueue, handler: Callable[[Dict], Dict], worker_id: Optional[str] = None,
+               lease_seconds: float = 300, poll_interval: float = 2.0,
+               max_tasks: Optional[int] = None, idle_exit: bool = False) -> int:
+    """
+    Lease tasks and run handler(payload) until the queue is empty (idle_exit) or max_tasks is reached.
+
+    A background thread renews the lease every lease_seconds / 3 while the
+    handler runs. Exceptions fail the task (re-queued until max_attempts).
+
+    Returns:
+        Number of tasks processed by this worker
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    while max_tasks is None or processed < max_tasks:
+        task = queue.lease(worker_id, lease_seconds)
+        if task is None:
+            if idle_exit:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        stop = threading.Event()
+
+        def beat(task_id=task["id"]):
+            while not stop.wait(lease_seconds / 3):
+                if not queue.heartbeat(task_id, worker_id, lease_seconds):
+                    print(f"⚠️  Lease für {task_id} verloren")
+                    return
+
+        heartbeat = threading.Thread(target=beat, daemon=True)
+        heartbeat.start()
+        try:
+            result = handler(task["payload"])
+        except Exception as e:
+            stop.set()
+            heartbeat.join()
+            queue.fail(task["id"], worker_id, f"{type(e).__name__}: {e}")
+            print(f"✗ {task['id']} (Versuch {task['attempts']}/{task['max_attempts']}): {e}")
+        else:
+            stop.set()
+            heartbeat.join()
+            queue.complete(task["id"], worker_id, result)
+            print(f"✅ {task['id']} erledigt ({worker_id})")
+        processed += 1
+    return processed
@@ -0,0 +1,358 @@
+"""
+EDGAR Index - Local catalogue of all 10-K filings from the EDGAR full-index
+
+EDGAR publishes one index per quarter listing every filing:
+    https://www.sec.gov/Archives/edgar/full-index/<year>/QTR<q>/form.idx    (fixed width)
+    https://www.sec.gov/Archives/edgar/full-index/<year>/QTR<q>/master.idx  (pipe-delimited)
+
+EdgarCatalog loads these (downloaded once or provided locally) into an
+indexed SQLite table of all 10-K/10-K/A filings and cuts a date range into
+work batches. Batches are fetched in parallel into the same folder layout
+sec-edgar-downloader uses, so every other stage can run on them offline.
+
+Usage:
+    python main.py catalog --year 2024                     # Indizes laden (4 Quartale)
+    python main.py catalog --index form.idx --year 2024 --quarter 1
+    python main.py catalog --plan --start 2024-01-01 --end 2024-12-31 --batch-size 200
+    python main.py catalog --fetch data/processed/batches/batch_0000.json
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+ANNUAL_FORMS = ("10-K", "10-K/A")
+FULL_INDEX_URL = "https://www.sec.gov/Archives/edgar/full-index/{year}/QTR{quarter}/{name}"
+ARCHIVES_URL = "https://www.sec.gov/Archives/"
+
+# SEC Fair-Access-Limit: max. 10 Requests pro Sekunde
+MAX_REQUESTS_PER_SECOND = 10
+
+
+def parse_index(text: str) -> Iterator[Dict]:
+    """
+    Parse a form.idx or master.idx file.
+
+    Yields:
+        dict: form, company, cik, date_filed (YYYY-MM-DD), path, accession
+    """
+    lines = text.splitlines()
+    # Datenteil beginnt nach der Trennlinie aus '-'
+    start = next((i + 1 for i, line in enumerate(lines) if line.startswith("---")), None)
+    if start is None:
+        return
+
+    header = lines[start - 2] if start >= 2 else ""
+    if "|" in header:  # master.idx: CIK|Company Name|Form Type|Date Filed|Filename
+        for line in lines[start:]:
+            parts = line.split("|")
+            if len(parts) != 5:
+                continue
+            cik, company, form, date_filed, path = (p.strip() for p in parts)
+            yield _entry(form, company, cik, date_filed, path)
+        return
+
+    # form.idx (feste Breite): Formtyp bis zur Spalte "Company Name", CIK/Datum/Pfad von rechts
+    # (lange Firmennamen ragen teils in die CIK-Spalte hinein)
+    company_col = header.find("Company Name")
+    if company_col < 0:
+        return
+    for line in lines[start:]:
+        rest = line[company_col:].split()
+        if len(rest) < 4 or not rest[-3].isdigit():
+            continue
+        yield _entry(line[:company_col].strip(), " ".join(rest[:-3]), *rest[-3:])
+
+
+def _entry(form: str, company: str, cik: str, date_filed: str, path: str) -> Dict:
+    accession = Path(path).stem
+    if not re.match(r'\d{10}-\d{2}-\d{6}$', accession):
+        accession = path
+    return {
+        "form": form,
+        "company": company,
+        "cik": int(cik),
+        "date_filed": date_filed if "-" in date_filed else f"{date_filed[:4]}-{date_filed[4:6]}-{date_filed[6:8]}",
+        "path": path,
+        "accession": accession,
+    }
+
+
+class EdgarCatalog:
+    """
+    SQLite catalogue of 10-K filings, indexed by CIK and filing date.
+
+    Args:
+        db_path (str): Location of the SQLite database.
+        forms (tuple): Form types to keep (default: 10-K and 10-K/A).
+    """
+
+    def __init__(self, db_path: str = "data/processed/edgar_catalog.sqlite",
+                 forms: tuple = ANNUAL_FORMS):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.forms = set(forms)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS filings (
+                accession  TEXT PRIMARY KEY,
+                cik        INTEGER NOT NULL,
+                company    TEXT,
+                form       TEXT NOT NULL,
+                date_filed TEXT NOT NULL,
+                path       TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_filings_cik_date ON filings (cik, date_filed);
+            CREATE INDEX IF NOT EXISTS idx_filings_date ON filings (date_filed);
+            CREATE TABLE IF NOT EXISTS loaded_indexes (
+                year INTEGER, quarter INTEGER, source TEXT, filings INTEGER,
+                PRIMARY KEY (year, quarter)
+            );
+            CREATE TABLE IF NOT EXISTS watched (
+                accession  TEXT PRIMARY KEY,
+                seen       TEXT NOT NULL,
+                status     TEXT NOT NULL,
+                error      TEXT,
+                attempts   INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        # Kataloge aus der Zeit vor den Wiederholungsversuchen
+        if "attempts" not in {row["name"] for row in self.conn.execute("PRAGMA table_info(watched)")}:
+            with self.conn:
+                self.conn.execute("ALTER TABLE watched ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.conn.close()
+
+    def load_index(self, text: str, year: Optional[int] = None, quarter: Optional[int] = None,
+                   source: str = "") -> int:
+        """
+        Add all matching filings of one index file (idempotent per accession).
+
+        Returns:
+            Number of catalogued filings from this index
+        """
+        rows = [(e["accession"], e["cik"], e["company"], e["form"], e["date_filed"], e["path"])
+                for e in parse_index(text) if e["form"] in self.forms]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if year and quarter:
+                self.conn.execute("INSERT OR REPLACE INTO loaded_indexes VALUES (?, ?, ?, ?)",
+                                  (year, quarter, source, len(rows)))
+        return len(rows)
+
+    def load_index_file(self, path: Path, year: Optional[int] = None, quarter: Optional[int] = None) -> int:
+        """Load a local form.idx/master.idx (EDGAR serves them as latin-1)."""
+        text = Path(path).read_text(encoding='latin-1')
+        return self.load_index(text, year, quarter, source=str(path))
+
+    def download_index(self, year: int, quarter: int, company_name: str, email: str,
+                       index_dir: str = "data/raw/full-index", name: str = "master.idx") -> int:
+        """
+        Download one quarterly index (kept under index_dir, so it is fetched only once) and load it.
+        """
+        local = Path(index_dir) / str(year) / f"QTR{quarter}" / name
+        if not local.exists():
+            import requests
+
+            url = FULL_INDEX_URL.format(year=year, quarter=quarter, name=name)
+            print(f"Lade {url} ...")
+            response = requests.get(url, headers={"User-Agent": f"{company_name} {email}"}, timeout=60)
+            response.raise_for_status()
+            local.parent.mkdir(parents=True, exist_ok=True)
+            local.write_bytes(response.content)
+        return self.load_index_file(local, year, quarter)
+
+    # ── Manifest des Watch-Modus (main.py watch) ─────────────────────────────
+    def record_new(self, entries: List[Dict]) -> List[Dict]:
+        """
+        Add feed entries to the catalogue and return those not seen before.
+
+        Recorded accessions start as 'new'; whether they are processed again
+        after a failure is decided by retry_watched().
+        """
+        new = []
+        with self.conn:
+            for e in entries:
+                self.conn.execute("INSERT OR IGNORE INTO filings VALUES (?, ?, ?, ?, ?, ?)",
+                                  (e["accession"], e["cik"], e["company"], e["form"], e["date_filed"], e["path"]))
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO watched (accession, seen, status) VALUES (?, datetime('now'), 'new')",
+                    (e["accession"],))
+                if cursor.rowcount:
+                    new.append(e)
+        return new
+
+    def retry_watched(self, max_attempts: int) -> List[Dict]:
+        """
+        Watched filings to process again: 'failed', or still 'new' after an
+        attempt (handler raised, process died), with fewer than max_attempts.
+        Filings left 'new' with no attempts left are marked failed.
+        """
+        with self.conn:
+            self.conn.execute("UPDATE watched SET status = 'failed', error = COALESCE(error, 'abgebrochen') "
+                              "WHERE status = 'new' AND attempts >= ?", (max_attempts,))
+        return [w for w in self.watched() if w["status"] in ("new", "failed")
+                and 0 < w["attempts"] < max_attempts]
+
+    def count_attempt(self, accessions: List[str]):
+        """Count one processing attempt for each accession."""
+        with self.conn:
+            self.conn.executemany("UPDATE watched SET attempts = attempts + 1 WHERE accession = ?",
+                                  [(a,) for a in accessions])
+
+    def mark_watched(self, accession: str, status: str, error: Optional[str] = None):
+        with self.conn:
+            self.conn.execute("UPDATE watched SET status = ?, error = ? WHERE accession = ?",
+                              (status, error, accession))
+
+    def watched(self, status: Optional[str] = None) -> List[Dict]:
+        query = "SELECT w.*, f.cik, f.form, f.company, f.date_filed, f.path FROM watched w " \
+                "JOIN filings f USING (accession)"
+        params = []
+        if status:
+            query += " WHERE w.status = ?"
+            params.append(status)
+        return [dict(row) for row in self.conn.execute(query + " ORDER BY w.seen, accession", params)]
+
+    def loaded_quarters(self) -> List[tuple]:
+        return [(r["year"], r["quarter"]) for r in
+                self.conn.execute("SELECT year, quarter FROM loaded_indexes ORDER BY year, quarter")]
+
+    def filings(self, ciks: Optional[List[int]] = None, start: Optional[str] = None,
+                end: Optional[str] = None, forms: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Catalogued filings, ordered by filing date then CIK.
+
+        Args:
+            ciks: Restrict to these CIKs
+            start / end: Inclusive filing-date range (YYYY-MM-DD)
+            forms: Restrict to these form types
+        """
+        query, params = "SELECT * FROM filings WHERE 1=1", []
+        if ciks:
+            query += f" AND cik IN ({','.join('?' * len(ciks))})"
+            params.extend(int(c) for c in ciks)
+        if start:
+            query += " AND date_filed >= ?"
+            params.append(start)
+        if end:
+            query += " AND date_filed <= ?"
+            params.append(end)
+        if forms:
+            query += f" AND form IN ({','.join('?' * len(forms))})"
+            params.extend(forms)
+        query += " ORDER BY date_filed, cik, accession"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def latest(self, cik: int, num_filings: int = 1) -> List[Dict]:
+        """Latest filings of one company (catalogue lookup instead of an EDGAR request)."""
+        rows = self.conn.execute(
+            "SELECT * FROM filings WHERE cik = ? ORDER BY date_filed DESC, accession DESC LIMIT ?",
+            (int(cik), num_filings))
+        return [dict(row) for row in rows]
+
+    def plan_batches(self, batch_size: int = 100, universe: Optional[Dict[int, str]] = None,
+                     **filters) -> List[Dict]:
+        """
+        Split the matching filings into work batches.
+
+        Args:
+            batch_size: Filings per batch
+            universe: CIK → ticker; restricts the plan to these companies and names
+                the output folders by ticker (otherwise by CIK)
+            **filters: start, end, forms (see filings())
+
+        Returns:
+            list of {"batch_id", "filings": [...]} in filing-date order
+        """
+        ciks = list(universe) if universe else None
+        rows = self.filings(ciks=ciks, **filters)
+        for row in rows:
+            row["ticker"] = (universe or {}).get(row["cik"]) or f"CIK{row['cik']:010d}"
+        return [
+            {"batch_id": f"batch_{i // batch_size:04d}", "filings": rows[i:i + batch_size]}
+            for i in range(0, len(rows), batch_size)
+        ]
+
+    @staticmethod
+    def write_batches(batches: List[Dict], out_dir: str = "data/processed/batches") -> List[Path]:
+        """One JSON file per batch, to be picked up by scheduled/parallel jobs."""
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for batch in batches:
+            path = out / f"{batch['batch_id']}.json"
+            path.write_text(json.dumps(batch, indent=2), encoding='utf-8')
+            paths.append(path)
+        return paths
+
+
+class _RateLimiter:
+    """Spaces out requests across threads to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+
+def fetch_batch(batch: Dict, company_name: str, email: str, download_folder: str = "data/raw",
+                workers: int = 4, rate: float = MAX_REQUESTS_PER_SECOND, compress: bool = False) -> List[Path]:
+    """
+    Download the full submission of every filing in a batch, in parallel and rate-limited.
+
+    Files land in <download_folder>/sec-edgar-filings/<TICKER>/<form>/<accession>/full-submission.txt,
+    the layout of sec-edgar-downloader, so SECDownloader.find_local_10k and
+    `main.py TICKER --offline` find them. Existing files are skipped.
+    With compress the submission is written as full-submission.txt.zst.
+
+    Returns:
+        Paths of the filings available locally after the run
+    """
+    import requests
+
+    session = requests.Session()
+    session.headers["User-Agent"] = f"{company_name} {email}"
+    limiter = _RateLimiter(rate)
+    root = Path(download_folder) / "sec-edgar-filings"
+    dictionary = None
+    if compress:
+        from src.utils.filing_store import default_dictionary, write_compressed
+        dictionary = default_dictionary()
+
+    def fetch(filing: Dict) -> Optional[Path]:
+        form_dir = filing["form"].replace("/", "-")  # 10-K/A → 10-K-A
+        target = root / filing["ticker"] / form_dir / filing["accession"] / "full-submission.txt"
+        for existing in (target, target.with_name(target.name + ".zst")):
+            if existing.exists():
+                return existing
+        limiter.wait()
+        try:
+            response = session.get(ARCHIVES_URL + filing["path"], timeout=60)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"⚠️  {filing['accession']} fehlgeschlagen: {e}")
+            return None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if compress:
+            return write_compressed(target, response.content, dictionary=dictionary)
+        target.write_bytes(response.content)
+        return target
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fetch, batch["filings"]))
+    return [path for path in results if path is not None]
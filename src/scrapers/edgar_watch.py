@@ -0,0 +1,205 @@
+"""
+EDGAR Watch - Tail the latest-filings Atom feed and analyse new 10-Ks
+
+EDGAR lists every new submission within minutes in its "latest filings" feed:
+    https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type=10-K&output=atom
+
+The watcher polls that feed, keeps 10-K/10-K/A entries of the watchlist (or of
+all filers), drops accessions it has already seen (the `watched` table of the
+EdgarCatalog is the manifest) and hands the new ones to the FilingPipeline.
+Filings whose download or analysis failed – or whose handler never finished –
+are handed over again on the next polls, up to max_attempts times:
+
+    python main.py watch --ticker-map company_tickers.json --tickers AAPL MSFT --full-analysis
+    python main.py watch --all --once          # ein Durchlauf, z.B. per cron
+
+Downloads use fetch_batch, i.e. the sec-edgar-downloader folder layout, so
+every other command finds the filings offline afterwards.
+"""
+
+import re
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.scrapers.edgar_index import ANNUAL_FORMS, EdgarCatalog, fetch_batch
+
+FEED_URL = ("https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type={form}&company=&dateb="
+            "&owner=include&start={start}&count={count}&output=atom")
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+TITLE_PATTERN = re.compile(r"^(?P<form>.+?) - (?P<company>.+) \((?P<cik>\d{1,10})\) \((?P<role>[^)]*)\)\s*$")
+ACCESSION_PATTERN = re.compile(r"\d{10}-\d{2}-\d{6}")
+FILED_PATTERN = re.compile(r"Filed:\s*(?:</b>)?\s*(\d{4}-\d{2}-\d{2})")
+
+
+def parse_feed(text: str) -> List[Dict]:
+    """
+    Parse the getcurrent Atom feed.
+
+    Returns:
+        One dict per entry (same keys as parse_index): form, company, cik,
+        date_filed, path, accession – in feed order (newest first)
+    """
+    root = ET.fromstring(text)
+    entries = []
+    for entry in root.iter(f"{ATOM}entry"):
+        title = TITLE_PATTERN.match(entry.findtext(f"{ATOM}title", "").strip())
+        accession = ACCESSION_PATTERN.search(entry.findtext(f"{ATOM}id", ""))
+        if not title or not accession:
+            continue
+        category = entry.find(f"{ATOM}category")
+        form = category.get("term") if category is not None and category.get("term") else title["form"]
+        filed = FILED_PATTERN.search(entry.findtext(f"{ATOM}summary", ""))
+        cik = int(title["cik"])
+        entries.append({
+            "form": form.strip(),
+            "company": title["company"].strip(),
+            "cik": cik,
+            "date_filed": filed.group(1) if filed else entry.findtext(f"{ATOM}updated", "")[:10],
+            "path": f"edgar/data/{cik}/{accession.group(0)}.txt",
+            "accession": accession.group(0),
+        })
+    return entries
+
+
+class FilingWatcher:
+    """
+    Polls the EDGAR latest-filings feed for new annual reports.
+
+    Args:
+        catalog (EdgarCatalog): Filing catalogue; its `watched` table is the manifest of seen accessions.
+        universe (dict): CIK → ticker watchlist (None = all filers, named CIK0000320193 etc.).
+        forms (tuple): Form types to keep.
+        feed_url (str): Feed URL template with {form}, {start}, {count} (a local stub in tests).
+        pages (int): Feed pages of `count` entries read per poll (a busy day has >100 10-Ks).
+        max_attempts (int): Processing attempts per filing before it stays failed.
+    """
+
+    def __init__(self, catalog: EdgarCatalog, universe: Optional[Dict[int, str]] = None,
+                 forms: tuple = ANNUAL_FORMS, company_name: str = "Investor",
+                 email: str = "investor@example.com", feed_url: str = FEED_URL,
+                 pages: int = 1, count: int = 100, max_attempts: int = 3):
+        self.catalog = catalog
+        self.universe = universe
+        self.forms = set(forms)
+        self.company_name = company_name
+        self.email = email
+        self.feed_url = feed_url
+        self.pages = pages
+        self.count = count
+        self.max_attempts = max_attempts
+        self._session = None
+
+    def fetch_feed(self) -> List[Dict]:
+        """All entries of the first `pages` feed pages (10-K query also returns 10-K/A, 10-KT, ...)."""
+        import requests
+
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = f"{self.company_name} {self.email}"
+        entries = []
+        for page in range(self.pages):
+            url = self.feed_url.format(form="10-K", start=page * self.count, count=self.count)
+            response = self._session.get(url, timeout=30)
+            response.raise_for_status()
+            page_entries = parse_feed(response.text)
+            entries.extend(page_entries)
+            if len(page_entries) < self.count:
+                break
+        return entries
+
+    def _ticker(self, cik: int) -> Optional[str]:
+        if self.universe is None:
+            return f"CIK{cik:010d}"
+        return self.universe.get(cik)
+
+    def poll(self) -> List[Dict]:
+        """
+        Filings to process: earlier ones to retry, then new ones since the last
+        poll in filing order (oldest first). Each counts one attempt.
+
+        Returns:
+            Feed entries plus "ticker"
+        """
+        # Wiederholungen zuerst: auch wenn der Feed gerade nicht erreichbar ist
+        retries = []
+        for watched in self.catalog.retry_watched(self.max_attempts):
+            ticker = self._ticker(watched["cik"])
+            if ticker is not None:
+                retries.append({key: watched[key] for key in
+                                ("form", "company", "cik", "date_filed", "path", "accession")})
+                retries[-1]["ticker"] = ticker
+
+        try:
+            wanted = []
+            for entry in reversed(self.fetch_feed()):
+                ticker = self._ticker(entry["cik"])
+                if entry["form"] in self.forms and ticker is not None:
+                    wanted.append({**entry, "ticker": ticker})
+            new = self.catalog.record_new(wanted)
+        except Exception as e:  # Feed kurz nicht erreichbar: beim nächsten Mal erneut versuchen
+            print(f"⚠️  Feed-Abruf fehlgeschlagen: {e}")
+            new = []
+
+        filings = retries + new
+        self.catalog.count_attempt([f["accession"] for f in filings])
+        return filings
+
+    def process(self, filings: List[Dict], pipeline, compress: bool = False) -> Dict[str, int]:
+        """
+        Download new filings and run them through the FilingPipeline.
+
+        Returns:
+            {"done": n, "failed": n}; the manifest status is updated per accession
+        """
+        fetched = {Path(p).parent.name: p for p in fetch_batch(
+            {"filings": filings}, self.company_name, self.email, workers=2, compress=compress)}
+        items = []
+        for filing in filings:
+            path = fetched.get(filing["accession"])
+            if path is None:
+                self.catalog.mark_watched(filing["accession"], "failed", "Download fehlgeschlagen")
+                continue
+            items.append({"key": f"{filing['ticker']}/{filing['accession']}", "ticker": filing["ticker"],
+                          "filing_path": str(path)})
+
+        done = {output["key"] for output in pipeline.run(items)} if items else set()
+        errors = pipeline.error_messages() if items else {}
+        for item in items:
+            accession = item["key"].split("/")[-1]
+            if item["key"] in done:
+                self.catalog.mark_watched(accession, "done")
+            else:
+                self.catalog.mark_watched(accession, "failed", errors.get(item["key"], "unvollständig"))
+        return {"done": len(done), "failed": len(filings) - len(done)}
+
+    def run(self, handle: Callable[[List[Dict]], None], interval: float = 120,
+            max_polls: Optional[int] = None) -> int:
+        """
+        Poll every `interval` seconds and call handle(filings) when there are any.
+
+        If handle raises, its filings stay 'new' and are retried on a later poll.
+
+        Returns:
+            Number of filings handed to handle (retries included)
+        """
+        seen, polls = 0, 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            try:
+                filings = self.poll()
+            except Exception as e:  # z.B. Katalog gesperrt: beim nächsten Mal erneut versuchen
+                print(f"⚠️  Abruf fehlgeschlagen: {e}")
+                filings = []
+            if filings:
+                seen += len(filings)
+                print(f"🆕 {len(filings)} Filings: {', '.join(f['ticker'] + ' ' + f['form'] for f in filings)}")
+                try:
+                    handle(filings)
+                except Exception as e:
+                    print(f"⚠️  Verarbeitung fehlgeschlagen, wird wiederholt: {e}")
+            if max_polls is None or polls < max_polls:
+                time.sleep(interval)
+        return seen
@@ -0,0 +1,235 @@
+"""
+SEC Bulk Ingest - Loads metrics from SEC bulk archives instead of parsing 10-Ks
+
+Supported local archives (downloaded once from sec.gov, never extracted to disk):
+    companyfacts.zip               – one JSON document per company (XBRL frames API data)
+    <year>q<quarter>.zip (FSDS)    – Financial Statement Data Sets, sub.txt + num.txt (TSV)
+
+Facts are mapped to our metric names via XBRLExtractor.XBRL_TAGS, so the
+metrics store contains the same metrics as the per-filing extraction.
+"""
+
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.analyzers.xbrl_extractor import XBRLExtractor
+
+ANNUAL_FORMS = {"10-K", "10-K/A"}
+
+
+class SECBulkIngestor:
+    """
+    Streams SEC bulk archives and yields metric records for a universe of companies.
+
+    Args:
+        universe (dict): CIK (int) → ticker. None = every company in the archive.
+        metric_tags (dict): Metric name → XBRL tags in priority order
+            (default: XBRLExtractor.XBRL_TAGS).
+    """
+
+    def __init__(self, universe: Optional[Dict[int, str]] = None,
+                 metric_tags: Optional[Dict[str, List[str]]] = None):
+        self.universe = universe
+        metric_tags = metric_tags or XBRLExtractor.XBRL_TAGS
+
+        # "Revenues" → ("net_sales", Priorität 0)
+        self.tag_map = {}
+        for metric_name, tags in metric_tags.items():
+            for priority, tag in enumerate(tags):
+                self.tag_map.setdefault(tag.split(":")[-1], (metric_name, priority))
+
+    @staticmethod
+    def load_ticker_map(path: Path, tickers: Optional[List[str]] = None) -> Dict[int, str]:
+        """
+        Build the universe from SEC's company_tickers.json (CIK → ticker).
+
+        Args:
+            path: Local copy of https://www.sec.gov/files/company_tickers.json
+            tickers: Restrict to these tickers (default: all)
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        wanted = {t.upper() for t in tickers} if tickers else None
+
+        universe = {}
+        for entry in data.values():
+            ticker = entry["ticker"].upper()
+            if wanted is None or ticker in wanted:
+                universe.setdefault(int(entry["cik_str"]), ticker)
+        return universe
+
+    def _ticker(self, cik: int) -> Optional[str]:
+        if self.universe is None:
+            return f"CIK{cik:010d}"
+        return self.universe.get(cik)
+
+    @staticmethod
+    def _is_annual_period(start: Optional[str], end: str) -> bool:
+        """Duration facts must span a fiscal year; instant facts (no start) always qualify."""
+        if not start:
+            return True
+        try:
+            days = (datetime.strptime(end, '%Y-%m-%d') - datetime.strptime(start, '%Y-%m-%d')).days
+        except ValueError:
+            return False
+        return 330 <= days <= 400
+
+    @staticmethod
+    def _fiscal_year(fy: Optional[str], report_end: Optional[str], period_end: str) -> int:
+        """
+        Fiscal year of a fact as the company labels it.
+
+        `fy` belongs to the filing, not to the fact: a 10-K for fiscal 2023 also
+        carries the 2022 comparatives. The fact's year is therefore fy minus the
+        whole years between the filing's period end and the fact's period end.
+        Without fy (or report period) the calendar year of the period end is used.
+        """
+        if not fy or not report_end:
+            return int(period_end[:4])
+        try:
+            days = (datetime.strptime(report_end, '%Y-%m-%d') - datetime.strptime(period_end, '%Y-%m-%d')).days
+        except ValueError:
+            return int(period_end[:4])
+        return int(fy) - round(days / 365.25)
+
+    @staticmethod
+    def _select(candidates: Dict) -> Iterator[Dict]:
+        """Yield the selected records without their ranking key."""
+        for record in candidates.values():
+            record = dict(record)
+            record.pop("_rank", None)
+            yield record
+
+    @staticmethod
+    def _offer(candidates: Dict, record: Dict, priority: int):
+        """
+        Keep one fact per (ticker, metric, period end): highest-priority tag,
+        then the most recently filed value.
+        """
+        key = (record["ticker"], record["metric_name"], record["period_end"])
+        rank = (-priority, record["filed"] or "")
+        current = candidates.get(key)
+        if current is None or rank > current["_rank"]:
+            candidates[key] = {**record, "_rank": rank}
+
+    # ── companyfacts.zip ────────────────────────────────────────────────────
+    def ingest_companyfacts(self, zip_path: Path) -> Iterator[Dict]:
+        """
+        Stream companyfacts.zip member by member. Members outside the universe
+        are skipped by file name, before any JSON is read.
+        """
+        with zipfile.ZipFile(zip_path) as archive:
+            for member in archive.namelist():
+                match = re.match(r'CIK(\d{10})\.json$', Path(member).name)
+                if not match:
+                    continue
+                cik = int(match.group(1))
+                ticker = self._ticker(cik)
+                if ticker is None:
+                    continue
+
+                with archive.open(member) as f:
+                    company = json.load(f)
+                yield from self._company_records(company, cik, ticker)
+
+    def _company_records(self, company: Dict, cik: int, ticker: str) -> Iterator[Dict]:
+        entries = []
+        for tag, fact in company.get("facts", {}).get("us-gaap", {}).items():
+            if tag not in self.tag_map:
+                continue
+            for entry in fact.get("units", {}).get("USD", []):
+                if entry.get("form") not in ANNUAL_FORMS or entry.get("fp") != "FY":
+                    continue
+                if not self._is_annual_period(entry.get("start"), entry["end"]):
+                    continue
+                entries.append((tag, entry))
+
+        # Berichtsstichtag je Filing: spätestes Periodenende seiner Fakten
+        report_end = {}
+        for _, entry in entries:
+            accession = entry.get("accn")
+            report_end[accession] = max(report_end.get(accession, ""), entry["end"])
+
+        candidates = {}
+        for tag, entry in entries:
+            metric_name, priority = self.tag_map[tag]
+            self._offer(candidates, {
+                "ticker": ticker,
+                "cik": f"{cik:010d}",
+                "metric_name": metric_name,
+                "fiscal_year": self._fiscal_year(entry.get("fy"), report_end[entry.get("accn")],
+                                                 entry["end"]),
+                "period_end": entry["end"],
+                "value": entry["val"] / 1_000_000,  # in Millionen wie DataStorage
+                "tag": f"us-gaap:{tag}",
+                "form": entry.get("form"),
+                "accession": entry.get("accn"),
+                "filed": entry.get("filed"),
+                "source": "companyfacts",
+            }, priority)
+        yield from self._select(candidates)
+
+    # ── Financial Statement Data Sets ───────────────────────────────────────
+    @staticmethod
+    def _read_tsv(archive: zipfile.ZipFile, name: str) -> Iterator[Dict]:
+        """Stream a TSV member as dicts without extracting it."""
+        with archive.open(name) as raw:
+            reader = csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8', errors='replace'),
+                                    delimiter='\t', quoting=csv.QUOTE_NONE)
+            yield from reader
+
+    def ingest_financial_statements(self, zip_path: Path) -> Iterator[Dict]:
+        """
+        Stream one quarterly FSDS archive: sub.txt selects the universe's 10-K
+        submissions, num.txt is then filtered line by line.
+        """
+        with zipfile.ZipFile(zip_path) as archive:
+            submissions = {}
+            for row in self._read_tsv(archive, "sub.txt"):
+                if row.get("form") not in ANNUAL_FORMS:
+                    continue
+                cik = int(row["cik"])
+                ticker = self._ticker(cik)
+                if ticker is not None:
+                    period = row.get("period") or ""
+                    submissions[row["adsh"]] = {"cik": cik, "ticker": ticker,
+                                                "form": row["form"], "filed": row.get("filed"),
+                                                "fy": row.get("fy"),
+                                                "period": f"{period[:4]}-{period[4:6]}-{period[6:8]}"
+                                                if len(period) == 8 else None}
+
+            candidates = {}
+            for row in self._read_tsv(archive, "num.txt"):
+                submission = submissions.get(row.get("adsh"))
+                if submission is None or row.get("tag") not in self.tag_map:
+                    continue
+                # Nur konsolidierte USD-Werte: kein Co-Registrant, kein Segment, Jahr oder Stichtag
+                if row.get("coreg") or row.get("segments") or row.get("uom") != "USD":
+                    continue
+                if row.get("qtrs") not in ("0", "4") or not row.get("value"):
+                    continue
+
+                metric_name, priority = self.tag_map[row["tag"]]
+                ddate = row["ddate"]
+                period_end = f"{ddate[:4]}-{ddate[4:6]}-{ddate[6:8]}"
+                filed = submission["filed"]
+                self._offer(candidates, {
+                    "ticker": submission["ticker"],
+                    "cik": f"{submission['cik']:010d}",
+                    "metric_name": metric_name,
+                    "fiscal_year": self._fiscal_year(submission["fy"], submission["period"], period_end),
+                    "period_end": period_end,
+                    "value": float(row["value"]) / 1_000_000,
+                    "tag": f"us-gaap:{row['tag']}",
+                    "form": submission["form"],
+                    "accession": row["adsh"],
+                    "filed": f"{filed[:4]}-{filed[4:6]}-{filed[6:8]}" if filed else None,
+                    "source": Path(zip_path).stem,
+                }, priority)
+            yield from self._select(candidates)
@@ -1,4 +1,3 @@
-from sec_edgar_downloader import Downloader
 from pathlib import Path
 
 class SECDownloader:
@@ -10,23 +9,35 @@ class SECDownloader:
     Args:
         company_name (str): Your name or company name (used as user-agent).
         email (str): Your real email address (required by SEC EDGAR rules).
+        compress (bool): Store downloaded submissions zstd-compressed
+            (full-submission.txt.zst, requires zstandard; see src/utils/filing_store).
 
     Example:
         >>> dl = SECDownloader("Alex Bernhardt", "alex.bernhardt@example.com")
         >>> dl.download_10k("AAPL", num_filings=3)
     """
     
-    def __init__(self, company_name: str, email: str):
+    def __init__(self, company_name: str, email: str, compress: bool = False):
         self.company_name = company_name
+        self.email = email
+        self.compress = compress
         self.download_folder = Path("data/raw")
         self.download_folder.mkdir(parents=True, exist_ok=True)
-        
-        # Downloader speichert automatisch in: data/raw/sec-edgar-filings/...
-        self.downloader = Downloader(
-            company_name, 
-            email, 
-            download_folder=str(self.download_folder)
-        )
+        self._downloader = None
+
+    @property
+    def downloader(self):
+        """sec-edgar-downloader instance, created (and imported) on the first download."""
+        if self._downloader is None:
+            from sec_edgar_downloader import Downloader
+
+            # Downloader speichert automatisch in: data/raw/sec-edgar-filings/...
+            self._downloader = Downloader(
+                self.company_name, 
+                self.email, 
+                download_folder=str(self.download_folder)
+            )
+        return self._downloader
         
     def download_10k(self, ticker: str, num_filings: int = 1):
         """Download the latest 10-K annual report(s) for a given ticker symbol.
@@ -67,5 +78,34 @@ class SECDownloader:
             reverse=True
         )[:num_filings]
 
+        if self.compress:
+            from src.utils.filing_store import compress_file, default_dictionary
+
+            dictionary = default_dictionary()
+            for folder in filing_dirs:
+                plain = folder / "full-submission.txt"
+                if plain.exists():
+                    compress_file(plain, dictionary=dictionary)
+
         print(f"✅ Successfully downloaded {len(filing_dirs)} filing(s) to {filing_path}")
-        return filing_dirs
\ No newline at end of file
+        return filing_dirs
+
+    def find_local_10k(self, ticker: str, num_filings: int = 1):
+        """Return already downloaded 10-K filing folders without contacting EDGAR.
+
+        Args:
+            ticker (str): Stock ticker symbol in uppercase.
+            num_filings (int, optional): Maximum number of (latest) filings to return.
+
+        Returns:
+            list[Path]: Local filing folders, newest accession first (empty if none).
+        """
+        filing_path = self.download_folder / "sec-edgar-filings" / ticker / "10-K"
+        if not filing_path.exists():
+            return []
+
+        return sorted(
+            (p for p in filing_path.glob("*") if p.is_dir()),
+            key=lambda p: p.name,
+            reverse=True
+        )[:num_filings]
\ No newline at end of file
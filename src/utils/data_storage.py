@@ -1,23 +1,33 @@
-import pandas as pd
+import csv
 from pathlib import Path
 from datetime import datetime
 
 class DataStorage:
     """
-    Saves extracted financial metrics to CSV files for further analysis.
+    Saves extracted financial metrics to CSV (or Parquet) files for further analysis.
+
+    Written with the csv module / pyarrow directly, so the metrics-only path
+    never imports pandas.
     """
+
+    COLUMNS = ['ticker', 'timestamp', 'metric_name', 'value_1', 'value_2', 'value_3']
     
     def __init__(self, output_folder: str = "data/processed/metrics"):
         self.output_folder = Path(output_folder)
         self.output_folder.mkdir(parents=True, exist_ok=True)
     
-    def save_metrics(self, ticker: str, metrics: dict) -> Path:
+    def metrics_path(self, ticker: str, fmt: str = "csv") -> Path:
+        """Path of the metrics file of a ticker ("csv" or "parquet")."""
+        return self.output_folder / f"{ticker.upper()}_financial_metrics.{fmt}"
+
+    def save_metrics(self, ticker: str, metrics: dict, fmt: str = "csv") -> Path:
         """
         Save financial metrics to a CSV file.
         
         Args:
             ticker (str): Company ticker symbol (e.g., "AAPL")
             metrics (dict): Dictionary with metric names and values
+            fmt (str): "csv" (default) or "parquet" (requires pyarrow)
         
         Returns:
             Path: Path to the saved CSV file
@@ -36,11 +46,13 @@ class DataStorage:
         
         4. Return den Pfad zur gespeicherten Datei
         """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         rows = []
-        data = pd.DataFrame
         for metric_name, values in metrics.items():
             padded_values = values + [None] * (3 - len(values)) 
             row = {
+                'ticker': ticker.upper(),
+                'timestamp': timestamp,
                 'metric_name': metric_name.replace('_', ' ').title(), 
                 'value_1': padded_values[0] if len(padded_values) > 0 else None,
                 'value_2': padded_values[1] if len(padded_values) > 1 else None,
@@ -48,17 +60,25 @@ class DataStorage:
             }
             rows.append(row)
 
-        df = pd.DataFrame(rows)
-        df['ticker'] = ticker.upper()
-        df['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        column_order = ['ticker', 'timestamp', 'metric_name', 
-                            'value_1', 'value_2', 'value_3']
-        
-        df = df[column_order]
-
-        filename = f"{ticker.upper()}_financial_metrics.csv"
-        filepath = self.output_folder / filename
-        df.to_csv(filepath, index=False)
+        filepath = self.metrics_path(ticker, fmt)
+        if fmt == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet-Ausgabe benötigt das Paket 'pyarrow' (pip install pyarrow)")
+            table = pa.Table.from_pylist(rows, schema=pa.schema([
+                ('ticker', pa.string()), ('timestamp', pa.string()), ('metric_name', pa.string()),
+                ('value_1', pa.float64()), ('value_2', pa.float64()), ('value_3', pa.float64()),
+            ]))
+            pq.write_table(table, filepath)
+        elif fmt == "csv":
+            # None → leeres Feld, wie bisher bei DataFrame.to_csv
+            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.COLUMNS)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            raise ValueError(f"Unknown format '{fmt}' (csv or parquet)")
 
-        return filepath
\ No newline at end of file
+        return filepath
@@ -0,0 +1,231 @@
+"""
+Filing Store - zstd-compressed raw filings with streaming decompression
+
+full-submission.txt files are mostly repetitive SGML/HTML/XBRL and compress
+about 5-10x with zstd. The store keeps them as full-submission.txt.zst next to
+where sec-edgar-downloader puts the plain file; every reader goes through
+open_filing(), which decompresses on the fly (no temporary file, constant memory):
+
+    with open_filing(path) as f:        # plain or .zst, text mode
+        content = f.read()
+
+Dictionaries trained on a sample of filings (train_dictionary) help most for
+the many small filings (SGML headers, boilerplate exhibits). A dictionary is
+stored under its zstd dictionary id; compressed frames record that id, so the
+reader finds the right dictionary without further metadata.
+
+zstd is optional: install `zstandard` to write or read .zst filings. Plain
+filings keep working without it.
+
+    python main.py store compress --train-dictionary   # data/raw komprimieren
+    python main.py store bench                         # Dekompression vs. gesparte I/O
+"""
+
+import io
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, TextIO
+
+SUFFIX = ".zst"
+DICTIONARY_DIR = Path("data/raw/zstd-dictionaries")
+DEFAULT_LEVEL = 10
+# Trainingsproben: Anfang jeder Datei (SGML-Header, Deckblatt, Boilerplate)
+SAMPLE_BYTES = 256 * 1024
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Komprimierte Filings benötigen das Paket 'zstandard' (pip install zstandard)")
+    return zstandard
+
+
+def is_compressed(path: Path) -> bool:
+    return Path(path).suffix == SUFFIX
+
+
+def _dictionary(dict_id: int, dictionary_dir: Path = DICTIONARY_DIR):
+    if not dict_id:
+        return None
+    path = Path(dictionary_dir) / f"{dict_id}.dict"
+    if not path.exists():
+        raise FileNotFoundError(f"zstd-Wörterbuch {dict_id} fehlt ({path})")
+    zstandard = _zstd()
+    return zstandard.ZstdCompressionDict(path.read_bytes())
+
+
+def open_binary(path: Path, dictionary_dir: Path = DICTIONARY_DIR) -> BinaryIO:
+    """Binary stream of a filing; .zst files are decompressed while reading."""
+    path = Path(path)
+    if not is_compressed(path):
+        return open(path, 'rb')
+    zstandard = _zstd()
+    raw = open(path, 'rb')
+    try:
+        dict_id = zstandard.get_frame_parameters(raw.read(18)).dict_id
+        raw.seek(0)
+        decompressor = zstandard.ZstdDecompressor(dict_data=_dictionary(dict_id, dictionary_dir))
+        return decompressor.stream_reader(raw, closefd=True)
+    except Exception:
+        raw.close()
+        raise
+
+
+def open_filing(path: Path, encoding: str = 'utf-8', errors: str = 'strict',
+                dictionary_dir: Path = DICTIONARY_DIR) -> TextIO:
+    """Text stream of a filing (plain or .zst)."""
+    path = Path(path)
+    if not is_compressed(path):
+        return open(path, 'r', encoding=encoding, errors=errors)
+    return io.TextIOWrapper(io.BufferedReader(open_binary(path, dictionary_dir)), encoding=encoding,
+                            errors=errors)
+
+
+def read_filing(path: Path, encoding: str = 'utf-8', errors: str = 'strict') -> str:
+    with open_filing(path, encoding, errors) as f:
+        return f.read()
+
+
+def train_dictionary(paths: Iterable[Path], size: int = 112 * 1024, sample_bytes: int = SAMPLE_BYTES,
+                     dictionary_dir: Path = DICTIONARY_DIR) -> Path:
+    """
+    Train a zstd dictionary on the beginning of each filing and store it under its id.
+
+    Returns:
+        Path of the dictionary file (<dictionary_dir>/<dict_id>.dict)
+    """
+    zstandard = _zstd()
+    samples = []
+    for path in paths:
+        with open_binary(path, dictionary_dir) as f:
+            samples.append(f.read(sample_bytes))
+    if len(samples) < 8:
+        raise ValueError(f"Zu wenige Filings für ein Wörterbuch ({len(samples)}, mindestens 8)")
+    dictionary = zstandard.train_dictionary(size, samples)
+    target = Path(dictionary_dir) / f"{dictionary.dict_id()}.dict"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(dictionary.as_bytes())
+    return target
+
+
+def load_dictionary(path: Optional[Path]):
+    """Dictionary written by train_dictionary (None → no dictionary)."""
+    if path is None:
+        return None
+    return _zstd().ZstdCompressionDict(Path(path).read_bytes())
+
+
+def default_dictionary(dictionary_dir: Path = DICTIONARY_DIR):
+    """Most recently trained dictionary (used for new downloads), or None."""
+    paths = sorted(Path(dictionary_dir).glob("*.dict"), key=lambda p: p.stat().st_mtime)
+    return load_dictionary(paths[-1]) if paths else None
+
+
+def write_compressed(target: Path, data: bytes, level: int = DEFAULT_LEVEL, dictionary=None) -> Path:
+    """Write downloaded bytes directly as <target>.zst (no plain copy on disk)."""
+    zstandard = _zstd()
+    target = Path(target)
+    path = target.with_name(target.name + SUFFIX)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(zstandard.ZstdCompressor(level=level, dict_data=dictionary).compress(data))
+    tmp_path.replace(path)
+    return path
+
+
+def compress_file(path: Path, level: int = DEFAULT_LEVEL, dictionary=None, remove: bool = True) -> Path:
+    """
+    Compress a plain filing to <name>.zst (streaming, atomic rename).
+
+    Args:
+        dictionary: ZstdCompressionDict from load_dictionary() or None
+        remove: Delete the plain file afterwards
+
+    Returns:
+        Path of the compressed file
+    """
+    zstandard = _zstd()
+    path = Path(path)
+    target = path.with_name(path.name + SUFFIX)
+    tmp_path = target.with_name(target.name + ".tmp")
+    compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary, write_content_size=True)
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        compressor.copy_stream(src, dst, size=path.stat().st_size)
+    tmp_path.replace(target)
+    if remove:
+        path.unlink()
+    return target
+
+
+def plain_filings(root: Path = Path("data/raw/sec-edgar-filings")) -> List[Path]:
+    """Uncompressed full submissions below root."""
+    return sorted(Path(root).glob("**/full-submission.txt"))
+
+
+def compress_store(root: Path = Path("data/raw/sec-edgar-filings"), level: int = DEFAULT_LEVEL,
+                   train: bool = False, dictionary: Optional[Path] = None, limit: Optional[int] = None) -> Dict:
+    """
+    Compress every plain full-submission.txt below root.
+
+    Args:
+        train: First train a dictionary on the filings to compress
+        dictionary: Use an existing dictionary file instead
+
+    Returns:
+        {"files", "raw_bytes", "compressed_bytes", "ratio", "dictionary"}
+    """
+    paths = plain_filings(root)[:limit]
+    if train and paths:
+        dictionary = train_dictionary(paths)
+        print(f"Wörterbuch trainiert → {dictionary}")
+    loaded = load_dictionary(dictionary)
+
+    raw_bytes = compressed_bytes = 0
+    for i, path in enumerate(paths, 1):
+        raw_bytes += path.stat().st_size
+        compressed_bytes += compress_file(path, level, loaded).stat().st_size
+        if i % 100 == 0:
+            print(f"  → {i}/{len(paths)} komprimiert")
+    return {"files": len(paths), "raw_bytes": raw_bytes, "compressed_bytes": compressed_bytes,
+            "ratio": round(raw_bytes / compressed_bytes, 2) if compressed_bytes else None,
+            "dictionary": str(dictionary) if dictionary else None}
+
+
+def benchmark(paths: Iterable[Path], bandwidth_mb_s: float = 100.0) -> Dict:
+    """
+    Decompression cost against disk and I/O savings.
+
+    Reads each filing completely (decompressing .zst files) and compares the
+    time with what reading the uncompressed bytes would cost from storage
+    with the given bandwidth (e.g. ~100 MB/s NFS/SMB, ~1000 MB/s local NVMe).
+
+    Returns:
+        Totals plus decompression throughput and the net seconds saved per filing
+    """
+    files = stored = raw = 0
+    decompress_seconds = 0.0
+    for path in paths:
+        path = Path(path)
+        start = time.perf_counter()
+        with open_binary(path) as f:
+            size = sum(len(chunk) for chunk in iter(lambda: f.read(1 << 20), b''))
+        decompress_seconds += time.perf_counter() - start
+        files += 1
+        stored += path.stat().st_size
+        raw += size
+
+    bandwidth = bandwidth_mb_s * 1e6
+    io_saved = (raw - stored) / bandwidth
+    return {
+        "files": files,
+        "raw_bytes": raw,
+        "stored_bytes": stored,
+        "ratio": round(raw / stored, 2) if stored else None,
+        "disk_saved_bytes": raw - stored,
+        "read_seconds": round(decompress_seconds, 3),
+        "throughput_mb_s": round(raw / 1e6 / decompress_seconds, 1) if decompress_seconds else None,
+        "io_seconds_saved": round(io_saved, 3),
+        # positiv: Dekompression ist billiger als die eingesparte Übertragung
+        "net_seconds_saved_per_filing": round((io_saved - decompress_seconds) / files, 4) if files else None,
+        "bandwidth_mb_s": bandwidth_mb_s,
+    }
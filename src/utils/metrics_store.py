@@ -0,0 +1,61 @@
+"""
+Metrics Store - Long-format table of financial facts for the whole universe
+
+One row per (ticker, metric, fiscal year, period end). Values are in
+millions USD, like the per-ticker CSVs written by DataStorage.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+
+class MetricsStore:
+    """
+    Columnar store of financial metrics (CSV, or Parquet if the path ends in .parquet).
+
+    Args:
+        path (str): Location of the store file.
+    """
+
+    COLUMNS = ['ticker', 'cik', 'metric_name', 'fiscal_year', 'period_end', 'value',
+               'tag', 'form', 'accession', 'filed', 'source']
+    KEY = ['ticker', 'metric_name', 'fiscal_year', 'period_end']
+
+    def __init__(self, path: str = "data/processed/metrics/metrics_store.csv"):
+        self.path = Path(path)
+
+    def load(self) -> pd.DataFrame:
+        """Load the store (empty DataFrame with the store columns if it does not exist)."""
+        if not self.path.exists():
+            return pd.DataFrame(columns=self.COLUMNS)
+        if self.path.suffix == ".parquet":
+            return pd.read_parquet(self.path)
+        return pd.read_csv(self.path, dtype={'cik': str, 'accession': str})
+
+    def upsert(self, records: Iterable[Dict]) -> int:
+        """
+        Insert or replace facts (newer rows win on the same key) and write the store once.
+
+        Returns:
+            Number of rows in the store after the update
+        """
+        new = pd.DataFrame(list(records), columns=self.COLUMNS)
+        if new.empty:
+            return len(self.load())
+
+        combined = pd.concat([self.load(), new], ignore_index=True)
+        combined = combined.drop_duplicates(subset=self.KEY, keep='last')
+        combined = combined.sort_values(['ticker', 'metric_name', 'fiscal_year', 'period_end'])
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix == ".parquet":
+            combined.to_parquet(self.path, index=False)
+        else:
+            combined.to_csv(self.path, index=False)
+        return len(combined)
+
+    def tickers(self) -> List[str]:
+        """All tickers present in the store."""
+        return sorted(self.load()['ticker'].dropna().unique().tolist())
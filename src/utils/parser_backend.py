@@ -0,0 +1,328 @@
+"""
+Parser Backend - Pluggable HTML/XML parsing for the extractors
+
+The extractors only need a handful of tree operations: find elements by tag
+(and attributes), text of a subtree, attribute values and the enclosing
+element of a given tag (e.g. the table row of a cell). ParsedDocument
+exposes exactly those, with two implementations:
+
+    "lxml" – raw lxml.etree tree, tag lookups via a one-pass name index (default)
+    "bs4"  – BeautifulSoup (compatibility fallback, heavier Python object per node)
+
+Tag and attribute names are matched case-insensitively, with or without
+namespace prefix, so both backends behave the same for SEC filings.
+
+Benchmark both backends on a filing:
+    python -m src.utils.parser_backend data/raw/.../full-submission.txt [--xml]
+"""
+
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Union
+
+DEFAULT_BACKEND = "lxml"
+
+Names = Union[str, Iterable[str]]
+
+
+def _name_set(names: Names) -> set:
+    if isinstance(names, str):
+        names = [names]
+    return {n.lower() for n in names}
+
+
+class ParsedDocument:
+    """
+    Backend-independent view of a parsed filing.
+
+    Attributes:
+        source (str): The raw document text (for regex fallbacks – no re-serialisation).
+        backend (str): Name of the backend that parsed the document.
+    """
+
+    backend = None
+
+    def __init__(self, source: str):
+        self.source = source
+
+    # ── Implemented by the backends ──────────────────────────────────────────
+    def find_all(self, names: Names, attrs: Optional[Dict[str, str]] = None, root=None) -> List:
+        """All elements with one of the given tag names (optionally filtered by attribute values)."""
+        raise NotImplementedError
+
+    def text(self, node, separator: str = " ") -> str:
+        """Text of a subtree; text pieces are stripped and joined with separator."""
+        raise NotImplementedError
+
+    def attr(self, node, name: str) -> Optional[str]:
+        """Attribute value (case-insensitive name), or None."""
+        raise NotImplementedError
+
+    def tag_name(self, node) -> str:
+        """Lowercase tag name including namespace prefix, e.g. 'ix:nonfraction'."""
+        raise NotImplementedError
+
+    def parent(self, node):
+        """Parent element or None."""
+        raise NotImplementedError
+
+    def children(self, node, names: Optional[Names] = None) -> List:
+        """Direct child elements, optionally restricted to tag names."""
+        raise NotImplementedError
+
+    def next_sibling(self, node):
+        """Next element sibling or None."""
+        raise NotImplementedError
+
+    # ── Shared helpers ───────────────────────────────────────────────────────
+    def find(self, names: Names, attrs: Optional[Dict[str, str]] = None, root=None):
+        """First element matching find_all, or None."""
+        matches = self.find_all(names, attrs, root)
+        return matches[0] if matches else None
+
+    def ancestor(self, node, names: Names):
+        """Closest ancestor with one of the given tag names, or None."""
+        wanted = _name_set(names)
+        node = self.parent(node)
+        while node is not None:
+            if self._matches(self.tag_name(node), wanted):
+                return node
+            node = self.parent(node)
+        return None
+
+    def parent_row(self, node):
+        """Table row (<tr>) containing the node, or None."""
+        return self.ancestor(node, "tr")
+
+    @staticmethod
+    def _matches(tag: str, wanted: set) -> bool:
+        return tag in wanted or tag.split(":")[-1] in wanted
+
+    def _attrs_match(self, node, attrs: Optional[Dict[str, str]]) -> bool:
+        if not attrs:
+            return True
+        return all(self.attr(node, k) == v for k, v in attrs.items())
+
+
+class LxmlDocument(ParsedDocument):
+    """lxml.etree backend. Builds a tag-name index in one pass on the first lookup."""
+
+    backend = "lxml"
+
+    def __init__(self, source: str, xml: bool = False):
+        super().__init__(source)
+        from lxml import etree
+
+        self._etree = etree
+        # Bytes statt str: lxml lehnt str mit Encoding-Deklaration ab
+        if xml:
+            parser = etree.XMLParser(recover=True, huge_tree=True, encoding='utf-8')
+        else:
+            parser = etree.HTMLParser(huge_tree=True, encoding='utf-8')
+        self.root = etree.fromstring(source.encode('utf-8'), parser)
+        if self.root is None:
+            raise ValueError("lxml could not parse the document")
+        self._index = None
+
+    def _build_index(self) -> Dict[str, List]:
+        """tag name (with and without prefix) → [(document position, element), ...]"""
+        index = {}
+        for position, node in enumerate(self.root.iter(self._etree.Element)):
+            tag = self.tag_name(node)
+            index.setdefault(tag, []).append((position, node))
+            local = tag.split(":")[-1]
+            if local != tag:
+                index.setdefault(local, []).append((position, node))
+        return index
+
+    def find_all(self, names: Names, attrs: Optional[Dict[str, str]] = None, root=None) -> List:
+        wanted = _name_set(names)
+        if root is not None:
+            nodes = [n for n in root.iter(self._etree.Element)
+                     if n is not root and self._matches(self.tag_name(n), wanted)]
+        else:
+            if self._index is None:
+                self._index = self._build_index()
+            # Dokumentreihenfolge wie bei BeautifulSoup, Duplikate (Präfix + lokal) entfernen
+            positioned = {}
+            for name in wanted:
+                for position, n in self._index.get(name, []):
+                    positioned[position] = n
+            nodes = [positioned[p] for p in sorted(positioned)]
+        return [n for n in nodes if self._attrs_match(n, attrs)]
+
+    def text(self, node, separator: str = " ") -> str:
+        return separator.join(t.strip() for t in node.itertext() if t.strip())
+
+    def attr(self, node, name: str) -> Optional[str]:
+        value = node.get(name)
+        if value is not None:
+            return value
+        lower = name.lower()
+        for key, value in node.attrib.items():
+            key = key.split("}")[-1] if key.startswith("{") else key
+            if key.lower() == lower:
+                return value
+        return None
+
+    def tag_name(self, node) -> str:
+        tag = node.tag
+        if not isinstance(tag, str):
+            return ""
+        if tag.startswith("{"):
+            local = tag.split("}", 1)[1]
+            tag = f"{node.prefix}:{local}" if node.prefix else local
+        return tag.lower()
+
+    def parent(self, node):
+        return node.getparent()
+
+    def children(self, node, names: Optional[Names] = None) -> List:
+        wanted = _name_set(names) if names else None
+        return [c for c in node.iterchildren(self._etree.Element)
+                if wanted is None or self._matches(self.tag_name(c), wanted)]
+
+    def next_sibling(self, node):
+        node = node.getnext()
+        while node is not None and not isinstance(node.tag, str):  # Kommentare überspringen
+            node = node.getnext()
+        return node
+
+
+class SoupDocument(ParsedDocument):
+    """BeautifulSoup backend (the original parser of this project)."""
+
+    backend = "bs4"
+
+    def __init__(self, source: str, xml: bool = False):
+        super().__init__(source)
+        from bs4 import BeautifulSoup
+
+        self.root = BeautifulSoup(source, 'lxml-xml' if xml else 'lxml')
+
+    def _name_filter(self, names: Names):
+        wanted = _name_set(names)
+        return lambda tag: self._matches(self.tag_name(tag), wanted)
+
+    def find_all(self, names: Names, attrs: Optional[Dict[str, str]] = None, root=None) -> List:
+        nodes = (root or self.root).find_all(self._name_filter(names))
+        return [n for n in nodes if self._attrs_match(n, attrs)]
+
+    def text(self, node, separator: str = " ") -> str:
+        return node.get_text(separator=separator, strip=True)
+
+    def attr(self, node, name: str) -> Optional[str]:
+        value = node.get(name)
+        if value is None:
+            lower = name.lower()
+            for key, v in node.attrs.items():
+                if key.lower() == lower:
+                    value = v
+                    break
+        if isinstance(value, list):  # bs4 liefert z.B. class als Liste
+            value = " ".join(value)
+        return value
+
+    def tag_name(self, node) -> str:
+        prefix = getattr(node, "prefix", None)
+        name = node.name or ""
+        if prefix and not name.startswith(prefix + ":"):
+            name = f"{prefix}:{name}"
+        return name.lower()
+
+    def parent(self, node):
+        return node.parent
+
+    def children(self, node, names: Optional[Names] = None) -> List:
+        wanted = _name_set(names) if names else None
+        return [c for c in node.find_all(True, recursive=False)
+                if wanted is None or self._matches(self.tag_name(c), wanted)]
+
+    def next_sibling(self, node):
+        return node.find_next_sibling()
+
+
+BACKENDS = {
+    "lxml": LxmlDocument,
+    "bs4": SoupDocument,
+}
+
+
+def parse_document(source: str, xml: bool = False, backend: Optional[str] = None) -> ParsedDocument:
+    """
+    Parse a filing with the requested backend, falling back to BeautifulSoup.
+
+    Args:
+        source: Document text
+        xml: Parse as XML (XBRL instance) instead of HTML
+        backend: "lxml" or "bs4" (default: DEFAULT_BACKEND)
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}' (available: {', '.join(BACKENDS)})")
+    try:
+        return BACKENDS[backend](source, xml=xml)
+    except Exception as e:
+        if backend == "bs4":
+            raise
+        print(f"⚠️  Parser-Backend '{backend}' fehlgeschlagen ({e}) – Fallback auf BeautifulSoup")
+        return SoupDocument(source, xml=xml)
+
+
+def _benchmark_child(path: str, backend: str, xml: bool, queue):
+    import resource
+    from src.utils.filing_store import read_filing
+
+    source = read_filing(path)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    document = BACKENDS[backend](source, xml=xml)
+    parse_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rows = len(document.find_all("tr"))
+    document.find_all(["ix:nonfraction"])
+    lookup_seconds = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    queue.put({
+        "backend": backend,
+        "parse_seconds": round(parse_seconds, 3),
+        "lookup_seconds": round(lookup_seconds, 3),
+        "peak_rss_mb": round((rss_after - rss_before) / 1024, 1),  # ru_maxrss ist KB (Linux)
+        "rows": rows,
+    })
+
+
+def benchmark_backends(path: str, xml: bool = False, backends: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Parse time, lookup time and peak memory per backend.
+    Each backend runs in a fresh process so peak RSS is not shared between runs.
+    """
+    import multiprocessing
+
+    results = []
+    for backend in backends or list(BACKENDS):
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_benchmark_child, args=(path, backend, xml, queue))
+        process.start()
+        process.join()
+        if not queue.empty():
+            results.append(queue.get())
+        else:
+            results.append({"backend": backend, "error": f"exit code {process.exitcode}"})
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.utils.parser_backend <filing> [--xml]")
+        sys.exit(1)
+
+    for result in benchmark_backends(sys.argv[1], xml="--xml" in sys.argv):
+        if "error" in result:
+            print(f"{result['backend']:>5}: Fehler ({result['error']})")
+            continue
+        print(f"{result['backend']:>5}: Parse {result['parse_seconds']:.3f}s | "
+              f"Lookups {result['lookup_seconds']:.3f}s | "
+              f"Peak RSS +{result['peak_rss_mb']:.1f} MB | {result['rows']} Tabellenzeilen")
@@ -0,0 +1,235 @@
+"""
+Profiler - Function-level profile and allocation tracking per pipeline stage
+
+Stage timings show *which* stage is slow; this module shows which functions
+and which source lines allocating memory dominate inside it. Every stage run
+through StageCache (and the explicitly wrapped download/report steps) gets its
+own cProfile and a tracemalloc snapshot diff:
+
+    python main.py AAPL --full-analysis --offline --no-cache --profile
+    python main.py profile compare data/processed/AAPL_profile_<alt>.json data/processed/AAPL_profile_<neu>.json
+
+Artifacts are written next to the risk report:
+    <TICKER>_profile_<timestamp>.json   Summary per stage (top functions, top allocators)
+    <TICKER>_profile_<timestamp>.prof   Combined pstats file (snakeviz, pstats, gprof2dot)
+
+tracemalloc slows allocation-heavy code (HTML parsing) down noticeably; the
+absolute times are therefore higher than in a normal run, only the relative
+proportions count. Cache hits are not profiled – use --no-cache.
+"""
+
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class StageProfiler:
+    """
+    Records cProfile data and the top allocating lines for each stage.
+
+    Nested stages pause the enclosing stage's profile, and their time and
+    allocations are subtracted from it, so every function call, second and
+    allocated byte is attributed to exactly one stage. Only the peak memory
+    of a stage includes the stages nested in it.
+
+    Args:
+        top (int): Functions and allocation sites kept per stage in the summary.
+        allocations (bool): Track allocations with tracemalloc.
+        frames (int): Traceback depth stored by tracemalloc (1 = allocating line only).
+    """
+
+    def __init__(self, top: int = 25, allocations: bool = True, frames: int = 1):
+        self.top = top
+        self.allocations = allocations
+        self.frames = frames
+        self.stages: Dict[str, Dict] = {}
+        self._profiles: List[cProfile.Profile] = []
+        self._stack: List[Dict] = []
+        self._started = False
+
+    def start(self):
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+
+    def stop(self):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the enclosed block as stage `name` (repeated stages are summed)."""
+        tracing = tracemalloc.is_tracing()
+        entered = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            parent["profile"].disable()
+            if tracing:
+                parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+        frame = {"profile": cProfile.Profile(), "peak": 0, "nested_seconds": 0.0, "nested_sites": {},
+                 "before": tracemalloc.take_snapshot() if tracing else None}
+        if tracing:
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        start = time.perf_counter()
+        frame["profile"].enable()
+        try:
+            yield
+        finally:
+            frame["profile"].disable()
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            if tracing:
+                frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            sites = self._record(name, frame, seconds)
+            if self._stack:
+                parent = self._stack[-1]
+                # Zeit (samt Snapshot-Aufwand) und Allokationen des inneren Abschnitts
+                # nicht doppelt zählen; seine Spitze gilt dagegen auch für den äußeren
+                parent["nested_seconds"] += time.perf_counter() - entered
+                for site, (size, count) in sites.items():
+                    nested = parent["nested_sites"].setdefault(site, [0, 0])
+                    nested[0] += size
+                    nested[1] += count
+                parent["peak"] = max(parent["peak"], frame["peak"])
+                parent["profile"].enable()
+
+    def _record(self, name: str, frame: Dict, seconds: float) -> Dict[str, List[int]]:
+        """Add one run of a stage; returns its allocation diff by site including nested stages."""
+        entry = self.stages.setdefault(name, {"runs": 0, "seconds": 0.0, "stats": None,
+                                              "peak_bytes": 0, "allocations": {}})
+        entry["runs"] += 1
+        entry["seconds"] += seconds - frame["nested_seconds"]
+        stats = pstats.Stats(frame["profile"])
+        if entry["stats"] is None:
+            entry["stats"] = stats
+        else:
+            entry["stats"].add(stats)
+        self._profiles.append(frame["profile"])
+
+        sites = {}
+        if frame["before"] is not None:
+            entry["peak_bytes"] = max(entry["peak_bytes"], frame["peak"])
+            after = tracemalloc.take_snapshot()
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                       tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+            diff = after.filter_traces(filters).compare_to(frame["before"].filter_traces(filters), "lineno")
+            for stat in diff:
+                sites[f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}"] = [stat.size_diff, stat.count_diff]
+            for site, (size, count) in sites.items():
+                nested_size, nested_count = frame["nested_sites"].get(site, (0, 0))
+                if size - nested_size <= 0:
+                    continue
+                sizes = entry["allocations"].setdefault(site, [0, 0])
+                sizes[0] += size - nested_size
+                sizes[1] += max(count - nested_count, 0)
+        return sites
+
+    def summary(self) -> Dict:
+        """JSON-serialisable summary: per stage time, peak memory, top functions and allocators."""
+        stages = {}
+        for name, entry in self.stages.items():
+            stages[name] = {
+                "runs": entry["runs"],
+                "seconds": round(entry["seconds"], 4),
+                "peak_bytes": entry["peak_bytes"],
+                "functions": top_functions(entry["stats"], self.top),
+                "allocations": [
+                    {"site": site, "bytes": size, "count": count}
+                    for site, (size, count) in sorted(entry["allocations"].items(),
+                                                      key=lambda item: -item[1][0])[:self.top]
+                ],
+            }
+        return {"created": datetime.now().isoformat(timespec="seconds"),
+                "allocations_tracked": self.allocations, "stages": stages}
+
+    def save(self, prefix: Path) -> Dict[str, Path]:
+        """
+        Write <prefix>.json (summary) and <prefix>.prof (all stages, pstats format).
+
+        Returns:
+            {"summary": path, "pstats": path} – no pstats file if no stage was profiled
+        """
+        prefix = Path(prefix)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        paths = {"summary": prefix.with_suffix(".json")}
+        with open(paths["summary"], 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        if self._profiles:
+            paths["pstats"] = prefix.with_suffix(".prof")
+            combined = pstats.Stats(self._profiles[0])
+            for profile in self._profiles[1:]:
+                combined.add(profile)
+            combined.dump_stats(paths["pstats"])
+        return paths
+
+
+def _function_name(func) -> str:
+    filename, lineno, name = func
+    if filename == "~":  # eingebaute Funktion, z.B. <method 'findall' of 're.Pattern' objects>
+        return name
+    return f"{filename}:{lineno}({name})"
+
+
+def top_functions(stats: Optional[pstats.Stats], top: int = 25) -> List[Dict]:
+    """Functions with the highest own time (tottime), with call count and cumulative time."""
+    if stats is None:
+        return []
+    rows = []
+    for func, (primitive_calls, calls, tottime, cumtime, _callers) in stats.stats.items():
+        rows.append({"function": _function_name(func), "calls": calls,
+                     "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)})
+    rows.sort(key=lambda row: -row["tottime"])
+    return rows[:top]
+
+
+def compare_profiles(baseline: Dict, candidate: Dict, top: int = 15) -> Dict:
+    """
+    Differences between two profile summaries (candidate − baseline).
+
+    Functions and allocation sites are matched by name; those only in one run
+    count as 0 in the other.
+
+    Returns:
+        {stage: {"seconds": (a, b, delta), "peak_bytes": (a, b, delta),
+                 "functions": [...], "allocations": [...]}} – largest changes first
+    """
+    result = {}
+    for name in sorted(set(baseline["stages"]) | set(candidate["stages"])):
+        a = baseline["stages"].get(name, {})
+        b = candidate["stages"].get(name, {})
+        result[name] = {
+            "seconds": _delta(a.get("seconds", 0.0), b.get("seconds", 0.0)),
+            "peak_bytes": _delta(a.get("peak_bytes", 0), b.get("peak_bytes", 0)),
+            "functions": _diff_rows(a.get("functions", []), b.get("functions", []),
+                                    "function", "tottime", top),
+            "allocations": _diff_rows(a.get("allocations", []), b.get("allocations", []),
+                                      "site", "bytes", top),
+        }
+    return result
+
+
+def _delta(a, b):
+    return a, b, round(b - a, 6) if isinstance(b - a, float) else b - a
+
+
+def _diff_rows(a: List[Dict], b: List[Dict], key: str, value: str, top: int) -> List[Dict]:
+    before = {row[key]: row[value] for row in a}
+    after = {row[key]: row[value] for row in b}
+    rows = [{key: name, "before": before.get(name, 0), "after": after.get(name, 0),
+             "delta": _delta(before.get(name, 0), after.get(name, 0))[2]}
+            for name in set(before) | set(after)]
+    rows.sort(key=lambda row: -abs(row["delta"]))
+    return rows[:top]
+
+
+def load_profile(path: Path) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,129 @@
+"""
+Stage Cache - Content-hash based caching of pipeline stage outputs
+
+Every stage output is stored under a key built from
+    stage name + stage version + hashes of all stage inputs.
+Downstream stages use the *output hash* of their upstream stages as input,
+which turns the pipeline into a content-addressed dependency graph:
+
+    filing ──► risk_paragraphs ──► sentiment   (+ model name)
+       │                     └───► keywords    (+ keyword dictionary)
+       └────► metrics
+                   sentiment + keywords + metrics ──► report
+
+Changing only the keyword dictionary therefore re-runs the keyword stage
+(and the report), while parsing and FinBERT inference are cache hits.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.filing_store import open_binary
+
+
+class StageCache:
+    """
+    Stores JSON-serialisable stage outputs in data/cache/<stage>/<key>.json.
+
+    Args:
+        cache_dir (str): Root folder of the cache.
+        enabled (bool): If False, every lookup is a miss (outputs are still written).
+        profiler (StageProfiler): Optional; every computed stage is profiled under its name.
+    """
+
+    def __init__(self, cache_dir: str = "data/cache", enabled: bool = True, profiler=None):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.profiler = profiler
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+        """
+        SHA-256 of a file, read in chunks so large submissions don't load into memory.
+        Compressed filings (.zst) hash their decompressed content, so compressing
+        the raw store keeps all cache keys.
+        """
+        digest = hashlib.sha256()
+        with open_binary(path) as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_value(value: Any) -> str:
+        """SHA-256 of a JSON-serialisable value (stable key order)."""
+        payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def stage_key(self, stage: str, version: str, inputs: Dict[str, str]) -> str:
+        """Build the cache key of a stage from its version and input hashes."""
+        return self.hash_value({"stage": stage, "version": version, "inputs": inputs})
+
+    def _entry_path(self, stage: str, key: str) -> Path:
+        return self.cache_dir / stage / f"{key}.json"
+
+    def get(self, stage: str, key: str) -> Optional[Dict]:
+        """Return the cached entry ({'value', 'output_hash'}) or None."""
+        if not self.enabled:
+            return None
+        path = self._entry_path(stage, key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # Kaputter Cache-Eintrag → einfach neu berechnen
+            return None
+
+    def put(self, stage: str, key: str, value: Any) -> str:
+        """Store a stage output and return its output hash."""
+        output_hash = self.hash_value(value)
+        path = self._entry_path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Erst in Temp-Datei schreiben, dann umbenennen (kein halber Eintrag bei Abbruch);
+        # eigener Temp-Name je Prozess/Thread, da Pipeline-Worker parallel schreiben
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"value": value, "output_hash": output_hash}, f, ensure_ascii=False, default=str)
+        tmp_path.replace(path)
+        return output_hash
+
+    def profile(self, stage: str):
+        """Context manager profiling a block as `stage` (no-op without profiler)."""
+        return self.profiler.stage(stage) if self.profiler is not None else nullcontext()
+
+    def run(self, stage: str, version: str, inputs: Dict[str, str],
+            compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """
+        Return the cached output of a stage, or compute and store it.
+
+        Args:
+            stage: Stage name (also the cache sub-folder)
+            version: Code/config version of the stage
+            inputs: Mapping input name → content hash
+            compute: Zero-argument function producing the stage output
+
+        Returns:
+            (value, output_hash) – output_hash is the input hash for downstream stages
+        """
+        key = self.stage_key(stage, version, inputs)
+        entry = self.get(stage, key)
+        if entry is not None:
+            self.hits += 1
+            print(f"  ♻️  Cache-Treffer: {stage}")
+            return entry["value"], entry["output_hash"]
+
+        self.misses += 1
+        with self.profile(stage):
+            value = compute()
+        output_hash = self.put(stage, key, value)
+        return value, output_hash
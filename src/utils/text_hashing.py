@@ -0,0 +1,98 @@
+"""
+Text Hashing - Normalisation, shingling, MinHash and SimHash for paragraphs
+
+Shared by the year-over-year risk differ (MinHash) and the paragraph
+deduplicator (SimHash).
+"""
+
+import hashlib
+import re
+from typing import List, Set
+
+import numpy as np
+
+# Größte 32-bit Primzahl: a * x bleibt für x < 2^32 in uint64
+_MERSENNE_PRIME = np.uint64(4294967291)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, replace typographic quotes, strip punctuation and collapse whitespace."""
+    text = text.lower().replace("’", "'").replace("‘", "'")
+    text = re.sub(r"[^a-z0-9' ]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def stable_hash(token: str, bits: int = 64) -> int:
+    """Process-independent hash of a string (Python's hash() is salted per process)."""
+    digest = hashlib.blake2b(token.encode('utf-8'), digest_size=bits // 8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """Word n-gram shingles of the normalised text."""
+    words = normalize_text(text).split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    64-bit SimHash fingerprint of the normalised text.
+    Near-identical paragraphs differ in only a few bits (small Hamming distance).
+    """
+    features = shingles(text, shingle_size)
+    if not features:
+        return 0
+    hashes = np.fromiter((stable_hash(f) for f in features), dtype=np.uint64, count=len(features))
+    # (n_features, 64) Bit-Matrix, dann Mehrheitsentscheid pro Bit
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(features)
+    packed = np.packbits(votes > 0, bitorder='little')
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures with NumPy (one vectorised pass per paragraph).
+
+    Args:
+        num_perm (int): Signature length (number of hash permutations).
+        seed (int): Seed for the permutation parameters – signatures are only
+            comparable between hashers with the same num_perm and seed.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, 2**32 - 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 2**32 - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: Set[str]) -> np.ndarray:
+        """MinHash signature of a shingle set (uint64 array of length num_perm)."""
+        if not shingle_set:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter((stable_hash(s, 32) for s in shingle_set),
+                             dtype=np.uint64, count=len(shingle_set))
+        # (a * x + b) mod p für alle Permutationen gleichzeitig: (num_perm, n_shingles)
+        permuted = (np.outer(self.a, hashes) % _MERSENNE_PRIME + self.b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def band_keys(self, signature: np.ndarray, bands: int) -> List[int]:
+        """LSH band keys: similar signatures share at least one key with high probability."""
+        rows = self.num_perm // bands
+        return [stable_hash(f"{i}:" + signature[i * rows:(i + 1) * rows].tobytes().hex())
+                for i in range(bands)]
@@ -0,0 +1,18 @@
+"""Fake-Modell für test_inference_scheduler – eigenes Modul, damit spawn-Kindprozesse den Test nicht importieren."""
+
+import os
+import time
+
+
+class FakeModel:
+    """Stand-in for SentimentAnalyzer: negative = Länge des Absatzes / 100."""
+
+    def analyze_risks(self, texts):
+        time.sleep(0.01)
+        return [{"paragraph_number": i + 1, "text_preview": f"{os.getpid()}:{os.environ['OMP_NUM_THREADS']}",
+                 "positive": 0.0, "negative": len(t) / 100, "neutral": 1 - len(t) / 100, "sentiment": "negative"}
+                for i, t in enumerate(texts)]
+
+
+def fake_factory():
+    return FakeModel()
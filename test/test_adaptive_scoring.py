@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.analyzers.adaptive_scoring import AdaptiveScorer, keyword_priority
+from src.analyzers.keyword_scanner import KeywordScanner
+from src.analyzers.sentiment_analyzer import SentimentAnalyzer
+
+calls = []
+
+
+def fake_scores(negatives):
+    def score_fn(paragraphs):
+        calls.append(len(paragraphs))
+        results = []
+        for para in paragraphs:
+            n = negatives[para]
+            results.append({"paragraph_number": 1, "text_preview": para[:100], "positive": 0.05,
+                            "negative": n, "neutral": 0.95 - n, "sentiment": "negative"})
+        return results
+    return score_fn
+
+
+# Priorität nach Keyword-Dichte
+paragraphs = [
+    "Our products are sold worldwide and we like them a lot.",
+    "A data breach, ransomware or litigation could cause a penalty.",
+    "Competition and inflation may reduce demand.",
+]
+assert keyword_priority(paragraphs, KeywordScanner()) == [2, 1, 0]
+
+# Homogenes Filing: konvergiert früh
+easy = [f"Risk paragraph number {i} about operations." for i in range(60)]
+scorer = AdaptiveScorer(tolerance=2.0, min_paragraphs=5, step=4)
+results, stats = scorer.score(easy, fake_scores({p: 0.60 for p in easy}))
+assert stats["stopped"] == "converged" and stats["scored"] == 8, stats
+assert [r["paragraph_number"] for r in results] == list(range(1, 9))
+weights = SentimentAnalyzer.SCORE_WEIGHTS
+expected = 0.60 * weights["negative"] + 0.05 * weights["positive"] + 0.35 * weights["neutral"]
+assert abs(np.mean([scorer.contribution(r) for r in results]) - expected) < 1e-9
+
+# Streuende Scores: mehr Inferenz, im Extremfall alle Absätze
+rng = np.random.default_rng(1)
+hard = {p: float(v) for p, v in zip(easy, rng.uniform(0.0, 0.9, size=60))}
+results, stats = scorer.score(easy, fake_scores(hard))
+assert stats["scored"] > 8
+assert stats["stopped"] in ("converged", "exhausted")
+
+# Token-Budget begrenzt die Inferenz pro Filing
+order = list(reversed(range(60)))
+results, stats = AdaptiveScorer(tolerance=0.0, token_budget=50).score(
+    easy, fake_scores(hard), order=order, count_tokens=lambda text: 10)
+assert stats["stopped"] == "budget" and stats["tokens"] == 50 and stats["scored"] == 5
+assert {r["paragraph_number"] for r in results} == {56, 57, 58, 59, 60}
+
+# Alle Absätze bewertet → Intervall hat Breite 0
+results, stats = AdaptiveScorer(tolerance=0.0).score(easy[:6], fake_scores(hard))
+assert stats["stopped"] == "exhausted" and stats["half_width"] == 0.0 and stats["scored"] == 6
+
+print(f"✅ AdaptiveScorer OK – homogen 8/60, streuend {AdaptiveScorer().score(easy, fake_scores(hard))[1]['scored']}/60")
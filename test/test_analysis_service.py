@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from src.pipeline.analysis_service import AnalysisService, ParsedFilingLRU, RequestCoalescer, create_server
+from src.utils.stage_cache import StageCache
+
+ACCESSION = "0000000000-25-000001"
+TRIGGERS = [
+    "The Company’s operations and performance depend significantly on global economic conditions",
+    "The Company’s business can be impacted by political events, trade and other international disputes",
+    "Global markets for the Company’s products and services are highly competitive",
+    "The Company depends on component and product manufacturing and logistical services",
+    "The Company is exposed to credit risk and fluctuations in the values of its investment portfolio",
+]
+FILLER = "Adverse developments could reduce demand and harm the Company’s results of operations. " * 30
+FILING = ("<html><body><table>"
+          "<tr><th>CONSOLIDATED BALANCE SHEETS - USD ($) $ in Millions</th><th>Sep. 27, 2025</th></tr>"
+          "<tr><td class=\"pl\">Total assets</td><td class=\"nump\">364,980</td></tr></table>"
+          "<p>Item 1A. Risk Factors</p><p>Business Risks.</p>"
+          + "".join(f"<p>{t}. {FILLER}</p>" for t in TRIGGERS * 2)
+          + "<p>Item 1B. Unresolved Staff Comments</p></body></html>")
+
+
+class SlowAnalyzer:
+    calls = 0
+
+    def analyze_risks(self, paragraphs, deduplicate=False):
+        SlowAnalyzer.calls += 1
+        time.sleep(0.3)  # lange Inferenz: parallele Anfragen treffen auf den laufenden Aufruf
+        return [{"positive": 0.1, "negative": 0.7, "neutral": 0.2, "sentiment": "negative",
+                 "text_preview": p[:100], "paragraph_number": i + 1} for i, p in enumerate(paragraphs)]
+
+
+def get(port, path):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}") as response:
+            body = response.read().decode("utf-8")
+            return response.status, json.loads(body) if "json" in response.headers["Content-Type"] else body
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+# 1. LRU: Größenbudget verdrängt den am längsten unbenutzten Eintrag
+lru = ParsedFilingLRU(max_bytes=100)
+lru.put("a", "x" * 40)
+lru.put("b", "y" * 40)
+lru.get("a")
+lru.put("c", "z" * 40)
+assert lru.get("b") is None and lru.get("a") and lru.get("c") and lru.size <= 100
+lru.put("huge", "x" * 500)  # größer als das Budget → nicht gecacht
+assert lru.get("huge") is None and len(lru) == 2
+
+# 2. Coalescer: Fehler erreicht alle Wartenden, der Schlüssel ist danach wieder frei
+coalescer = RequestCoalescer()
+try:
+    coalescer.run("k", lambda: 1 / 0)
+except ZeroDivisionError:
+    pass
+assert coalescer.run("k", lambda: 42) == 42
+
+# 3. HTTP-Dienst auf einem lokalen Filing
+old_cwd = os.getcwd()
+with tempfile.TemporaryDirectory() as tmp:
+    os.chdir(tmp)
+    try:
+        folder = Path("data/raw/sec-edgar-filings/TEST/10-K") / ACCESSION
+        folder.mkdir(parents=True)
+        (folder / "full-submission.txt").write_text(FILING, encoding="utf-8")
+
+        service = AnalysisService(cache=StageCache(cache_dir="cache"), analyzer_factory=SlowAnalyzer)
+        server = create_server(service, port=0, quiet=True)
+        port = server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        assert get(port, "/health") == (200, {"status": "ok"})
+        status, body = get(port, "/metrics/test")
+        assert status == 200 and body["accession"] == ACCESSION
+        assert body["metrics"]["total_assets"] == [364980.0], body
+
+        # 8 gleichzeitige Anfragen für dasselbe Filing → eine Inferenz
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(get(port, "/risks/TEST")))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert SlowAnalyzer.calls == 1, SlowAnalyzer.calls
+        assert all(status == 200 for status, _ in responses), responses[0]
+        assert len({json.dumps(body, sort_keys=True) for _, body in responses}) == 1
+        result = responses[0][1]
+        assert result["ticker"] == "TEST" and len(result["paragraphs"]) == 10
+
+        status, report = get(port, f"/report/TEST?accession={ACCESSION}")
+        assert status == 200 and "TEST" in report
+        assert get(port, "/risks/NOPE")[0] == 404
+        # Aktiengattungen sind gültige Ticker (nur nicht vorhanden), Pfadbestandteile nicht
+        assert get(port, "/risks/BRK.B")[0] == get(port, "/risks/brk-b")[0] == 404
+        assert get(port, "/risks/..")[0] == get(port, "/risks/..%2F..%2Fetc")[0] == 400
+        assert get(port, "/metrics/TEST?accession=0000000000-99-000000")[0] == 404
+        assert get(port, "/unknown")[0] == 404
+
+        stats = get(port, "/stats")[1]
+        assert stats["model_loaded"] and stats["requests"]["coalesced"] + stats["lru"]["hits"] >= 7, stats
+        assert SlowAnalyzer.calls == 1  # Bericht aus dem LRU, keine neue Inferenz
+        server.shutdown()
+        server.server_close()
+    finally:
+        os.chdir(old_cwd)
+
+print(f"✅ Analyse-Dienst OK ({stats['requests']['coalesced']} Anfragen zusammengelegt)")
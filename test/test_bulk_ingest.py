@@ -0,0 +1,115 @@
+import json
+import tempfile
+import zipfile
+from pathlib import Path
+from src.scrapers.sec_bulk_ingest import SECBulkIngestor
+from src.utils.metrics_store import MetricsStore
+
+AAPL = {
+    "cik": 320193,
+    "facts": {"us-gaap": {
+        "Revenues": {"units": {"USD": [
+            # Jahreswert aus 10-K, später im 10-K/A korrigiert → neuester filed gewinnt
+            {"start": "2023-10-01", "end": "2024-09-28", "val": 391035000000, "form": "10-K",
+             "fp": "FY", "accn": "0000320193-24-000123", "filed": "2024-11-01"},
+            {"start": "2023-10-01", "end": "2024-09-28", "val": 391036000000, "form": "10-K/A",
+             "fp": "FY", "accn": "0000320193-25-000001", "filed": "2025-01-15"},
+            # Quartalswert und 10-Q werden ignoriert
+            {"start": "2024-06-30", "end": "2024-09-28", "val": 94930000000, "form": "10-K",
+             "fp": "FY", "accn": "0000320193-24-000123", "filed": "2024-11-01"},
+            {"start": "2023-10-01", "end": "2024-06-29", "val": 296105000000, "form": "10-Q",
+             "fp": "Q3", "accn": "0000320193-24-000081", "filed": "2024-08-02"},
+        ]}},
+        # Niedrigere Priorität als Revenues für net_sales
+        "SalesRevenueNet": {"units": {"USD": [
+            {"start": "2023-10-01", "end": "2024-09-28", "val": 1, "form": "10-K",
+             "fp": "FY", "accn": "0000320193-24-000123", "filed": "2024-11-01"},
+        ]}},
+        "Assets": {"units": {"USD": [
+            {"end": "2024-09-28", "val": 364980000000, "form": "10-K",
+             "fp": "FY", "accn": "0000320193-24-000123", "filed": "2024-11-01"},
+        ]}},
+        "UnrelatedTag": {"units": {"USD": [
+            {"end": "2024-09-28", "val": 5, "form": "10-K", "fp": "FY", "accn": "x", "filed": "2024-11-01"},
+        ]}},
+    }},
+}
+
+SUB = "adsh\tcik\tname\tform\tfiled\n" \
+      "0000789019-24-000050\t789019\tMICROSOFT CORP\t10-K\t20240730\n" \
+      "0000789019-24-000010\t789019\tMICROSOFT CORP\t10-Q\t20240425\n" \
+      "0000000001-24-000001\t1\tOTHER CO\t10-K\t20240301\n"
+NUM = "adsh\ttag\tversion\tcoreg\tddate\tqtrs\tuom\tsegments\tvalue\n" \
+      "0000789019-24-000050\tRevenues\tus-gaap/2024\t\t20240630\t4\tUSD\t\t245122000000\n" \
+      "0000789019-24-000050\tRevenues\tus-gaap/2024\t\t20240630\t1\tUSD\t\t64727000000\n" \
+      "0000789019-24-000050\tRevenues\tus-gaap/2024\t\t20240630\t4\tUSD\tProductOrService=Cloud;\t1\n" \
+      "0000789019-24-000050\tAssets\tus-gaap/2024\t\t20240630\t0\tUSD\t\t512163000000\n" \
+      "0000789019-24-000010\tRevenues\tus-gaap/2024\t\t20240331\t4\tUSD\t\t1\n" \
+      "0000000001-24-000001\tRevenues\tus-gaap/2024\t\t20231231\t4\tUSD\t\t1\n"
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    companyfacts = tmp / "companyfacts.zip"
+    with zipfile.ZipFile(companyfacts, "w") as z:
+        z.writestr("CIK0000320193.json", json.dumps(AAPL))
+        z.writestr("CIK0000000001.json", "not json – must never be read")
+    fsds = tmp / "2024q3.zip"
+    with zipfile.ZipFile(fsds, "w") as z:
+        z.writestr("sub.txt", SUB)
+        z.writestr("num.txt", NUM)
+    ticker_map = tmp / "company_tickers.json"
+    ticker_map.write_text(json.dumps({
+        "0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."},
+        "1": {"cik_str": 789019, "ticker": "MSFT", "title": "Microsoft Corp"},
+        "2": {"cik_str": 1, "ticker": "OTHR", "title": "Other"},
+    }))
+
+    universe = SECBulkIngestor.load_ticker_map(ticker_map, ["aapl", "msft"])
+    assert universe == {320193: "AAPL", 789019: "MSFT"}
+    ingestor = SECBulkIngestor(universe=universe)
+
+    facts = {(r["metric_name"], r["period_end"]): r for r in ingestor.ingest_companyfacts(companyfacts)}
+    assert set(facts) == {("net_sales", "2024-09-28"), ("total_assets", "2024-09-28")}
+    assert facts[("net_sales", "2024-09-28")]["value"] == 391036.0
+    assert facts[("net_sales", "2024-09-28")]["form"] == "10-K/A"
+    assert facts[("total_assets", "2024-09-28")]["fiscal_year"] == 2024
+
+    fsds_records = list(ingestor.ingest_financial_statements(fsds))
+    by_metric = {r["metric_name"]: r for r in fsds_records}
+    assert len(fsds_records) == 2
+    assert by_metric["net_sales"]["value"] == 245122.0
+    assert by_metric["net_sales"]["period_end"] == "2024-06-30"
+    assert by_metric["total_assets"]["filed"] == "2024-07-30"
+    assert all(r["ticker"] == "MSFT" for r in fsds_records)
+
+    store = MetricsStore(str(tmp / "metrics_store.csv"))
+    assert store.upsert(list(facts.values()) + fsds_records) == 4
+    # Erneuter Import ersetzt statt zu duplizieren
+    assert store.upsert(fsds_records) == 4
+    assert store.tickers() == ["AAPL", "MSFT"]
+
+    # Geschäftsjahr Februar–Januar: "fiscal 2023" endet am 2024-01-28, das Vorjahr am 2023-01-29
+    hd = {"cik": 354950, "facts": {"us-gaap": {"Revenues": {"units": {"USD": [
+        {"start": "2023-01-30", "end": "2024-01-28", "val": 152669000000, "form": "10-K", "fp": "FY",
+         "fy": 2023, "accn": "0000354950-24-000018", "filed": "2024-03-13"},
+        {"start": "2022-01-31", "end": "2023-01-29", "val": 157403000000, "form": "10-K", "fp": "FY",
+         "fy": 2023, "accn": "0000354950-24-000018", "filed": "2024-03-13"},
+    ]}}}}}
+    hd_zip = tmp / "companyfacts_hd.zip"
+    with zipfile.ZipFile(hd_zip, "w") as z:
+        z.writestr("CIK0000354950.json", json.dumps(hd))
+    hd_ingestor = SECBulkIngestor(universe={354950: "HD"})
+    years = {r["period_end"]: r["fiscal_year"] for r in hd_ingestor.ingest_companyfacts(hd_zip)}
+    assert years == {"2024-01-28": 2023, "2023-01-29": 2022}
+
+    hd_fsds = tmp / "2024q1.zip"
+    with zipfile.ZipFile(hd_fsds, "w") as z:
+        z.writestr("sub.txt", "adsh\tcik\tname\tform\tfiled\tfy\tperiod\n"
+                              "0000354950-24-000018\t354950\tHOME DEPOT\t10-K\t20240313\t2023\t20240131\n")
+        z.writestr("num.txt", "adsh\ttag\tversion\tcoreg\tddate\tqtrs\tuom\tsegments\tvalue\n"
+                              "0000354950-24-000018\tRevenues\tus-gaap/2023\t\t20240131\t4\tUSD\t\t152669000000\n"
+                              "0000354950-24-000018\tRevenues\tus-gaap/2023\t\t20230131\t4\tUSD\t\t157403000000\n")
+    years = {r["period_end"]: r["fiscal_year"] for r in hd_ingestor.ingest_financial_statements(hd_fsds)}
+    assert years == {"2024-01-31": 2023, "2023-01-31": 2022}
+
+print("✅ Bulk-Ingest OK")
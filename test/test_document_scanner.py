@@ -0,0 +1,58 @@
+import tempfile
+from pathlib import Path
+
+from src.analyzers.document_scanner import DocumentKeywordScanner, find_sections, main_document
+from src.analyzers.keyword_scanner import KeywordScanner
+from src.analyzers.risk_reporter import RiskReporter
+
+FILLER = "<p>" + "Our operations span many regions and products. " * 20 + "</p>\n"
+MAIN = (
+    "<html><body><ix:header><ix:hidden>litigation litigation</ix:hidden></ix:header>"
+    "<p>Table of contents: Item 1A. Risk Factors ... Item 7. MD&amp;A</p>"
+    "<p>ITEM 1. BUSINESS</p>" + FILLER * 50 +
+    "<p>We face intense <b>competition</b> and pricing pressure.</p>"
+    "<p>Item 1A. Risk Factors</p>" + FILLER * 50 +
+    "<p>A data\n<span>breach</span> or ransomware attack, litigation and further litigation.</p>"
+    "<p>No fines were defined here; the reputation of our brand matters.</p>" +
+    FILLER * 50 +
+    "<p>Item&#160;7. Management&#8217;s Discussion</p><p>Liquidity and cash flow remained strong; debt fell.</p>"
+    "</body></html>"
+)
+SUBMISSION = (
+    "<SEC-DOCUMENT>\n<DOCUMENT>\n<TYPE>10-K\n<TEXT>\n" + MAIN + "\n</TEXT>\n</DOCUMENT>\n"
+    "<DOCUMENT>\n<TYPE>EX-99\n<TEXT>\n<p>bankruptcy bankruptcy</p>\n</TEXT>\n</DOCUMENT>\n"
+    "<DOCUMENT>\n<TYPE>GRAPHIC\n<TEXT>\nbegin 644 logo.jpg\nM_]C_X\n</TEXT>\n</DOCUMENT>\n</SEC-DOCUMENT>"
+)
+
+assert "bankruptcy" not in main_document(SUBMISSION) and "competition" in main_document(SUBMISSION)
+sections = [name for _, name in find_sections("cover item 1. business xitem 2. item 1a. risks item 7a: market")]
+assert sections == ["Cover", "Item 1. Business", "Item 1A. Risk Factors",
+                    "Item 7A. Quantitative and Qualitative Disclosures About Market Risk"]
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = Path(tmp) / "full-submission.txt"
+    path.write_text(SUBMISSION, encoding="utf-8")
+    serial = DocumentKeywordScanner(workers=1).scan_file(path)
+    # Kleine Chunks: Treffer an Chunk-Grenzen dürfen weder fehlen noch doppelt zählen
+    for chunk_size in (37, 500, 10_000):
+        chunked = DocumentKeywordScanner(workers=2, chunk_size=chunk_size).scan_file(path)
+        assert chunked == serial, (chunk_size, chunked, serial)
+
+risk = serial["by_section"]["Item 1A. Risk Factors"]
+assert risk == {"cybersecurity": 2, "legal": 2, "reputation": 2}, risk      # data breach über <span> hinweg
+assert serial["by_section"]["Item 1. Business"] == {"market": 2}
+assert serial["by_section"]["Item 7. Management's Discussion and Analysis"] == {"financial": 3}
+assert dict(serial["top_keywords"])["litigation"] == 2                      # ix:header ignoriert
+assert "fine" not in dict(serial["top_keywords"])                           # "fines"/"defined" kein Treffer
+assert serial["total_keywords"] == 11 and serial["scope"] == "document"
+
+# Gleiche Kategorien wie der Absatz-Scanner
+paragraph_scan = KeywordScanner().scan_risks(["A data breach or ransomware attack, litigation."])
+assert set(paragraph_scan["by_category"]) <= set(serial["by_category"])
+
+reporter = RiskReporter()
+result = reporter.build_result("TEST", [], serial, 40.0)
+assert result["keywords"]["by_section"] == serial["by_section"]
+assert "Treffer nach Abschnitt" in reporter.render_report(result)
+
+print(f"✅ DocumentKeywordScanner OK – {serial['total_keywords']} Treffer in {len(serial['by_section'])} Abschnitten")
@@ -0,0 +1,80 @@
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from src.scrapers import edgar_index
+from src.scrapers.edgar_index import EdgarCatalog, fetch_batch, parse_index
+
+FORM_IDX = """Description:           Master Index of EDGAR Dissemination Feed by Form Type
+Last Data Received:    March 31, 2024
+
+Form Type   Company Name                                                  CIK         Date Filed  File Name
+---------------------------------------------------------------------------------------------------------------------------------------------
+10-K        APPLE INC                                                     320193      2024-02-02  edgar/data/320193/0000320193-24-000006.txt
+10-K/A      SOME VERY LONG COMPANY NAME THAT RUNS INTO THE CIK COLUMN HOLDINGS 1234567    2024-03-15  edgar/data/1234567/0001234567-24-000002.txt
+10-Q        APPLE INC                                                     320193      2024-02-01  edgar/data/320193/0000320193-24-000005.txt
+SC 13G/A    MICROSOFT CORP                                                789019      2024-02-10  edgar/data/789019/0000789019-24-000001.txt
+"""
+
+MASTER_IDX = """Description:           Master Index of EDGAR Dissemination Feed
+Last Data Received:    June 30, 2024
+
+CIK|Company Name|Form Type|Date Filed|Filename
+--------------------------------------------------------------------------------
+789019|MICROSOFT CORP|10-K|2024-07-30|edgar/data/789019/0000789019-24-000050.txt
+320193|APPLE INC|8-K|2024-05-02|edgar/data/320193/0000320193-24-000060.txt
+320193|APPLE INC|10-K|2024-02-02|edgar/data/320193/0000320193-24-000006.txt
+"""
+
+entries = list(parse_index(FORM_IDX))
+assert [e["form"] for e in entries] == ["10-K", "10-K/A", "10-Q", "SC 13G/A"]
+assert entries[1]["cik"] == 1234567
+assert entries[0]["accession"] == "0000320193-24-000006"
+assert entries[0]["company"] == "APPLE INC"
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    catalog = EdgarCatalog(str(tmp / "catalog.sqlite"))
+    assert catalog.load_index(FORM_IDX, 2024, 1) == 2
+    assert catalog.load_index(MASTER_IDX, 2024, 2) == 2
+    # Apple-10-K steht in beiden Indizes → nur einmal im Katalog
+    assert len(catalog.filings()) == 3
+    assert catalog.loaded_quarters() == [(2024, 1), (2024, 2)]
+    assert [f["accession"] for f in catalog.latest(320193)] == ["0000320193-24-000006"]
+    assert len(catalog.filings(start="2024-03-01")) == 2
+    assert len(catalog.filings(forms=["10-K/A"])) == 1
+
+    batches = catalog.plan_batches(batch_size=2)
+    assert [len(b["filings"]) for b in batches] == [2, 1]
+    assert batches[0]["filings"][0]["ticker"] == "CIK0000320193"
+    planned = catalog.plan_batches(batch_size=10, universe={789019: "MSFT", 320193: "AAPL"})
+    assert [f["ticker"] for f in planned[0]["filings"]] == ["AAPL", "MSFT"]
+    paths = EdgarCatalog.write_batches(planned, str(tmp / "batches"))
+    assert json.loads(paths[0].read_text())["batch_id"] == "batch_0000"
+    catalog.close()
+
+    # Download gegen lokalen Stub-Server (statt sec.gov)
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = f"<SEC-DOCUMENT>{self.path}</SEC-DOCUMENT>".encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    edgar_index.ARCHIVES_URL = f"http://127.0.0.1:{server.server_port}/Archives/"
+
+    fetched = fetch_batch(planned[0], "Test", "test@example.com", download_folder=str(tmp / "raw"),
+                          workers=2, rate=100)
+    server.shutdown()
+    assert len(fetched) == 2
+    aapl = tmp / "raw/sec-edgar-filings/AAPL/10-K/0000320193-24-000006/full-submission.txt"
+    assert aapl.read_text() == "<SEC-DOCUMENT>/Archives/edgar/data/320193/0000320193-24-000006.txt</SEC-DOCUMENT>"
+
+print("✅ EDGAR-Index OK")
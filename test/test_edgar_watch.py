@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+from src.pipeline.filing_pipeline import FilingPipeline
+from src.scrapers import edgar_index
+from src.scrapers.edgar_index import EdgarCatalog
+from src.scrapers.edgar_watch import FilingWatcher, parse_feed
+from src.utils.stage_cache import StageCache
+
+
+def entry(form, company, cik, accession, role="Filer"):
+    return f"""<entry>
+<title>{form} - {company} ({cik:010d}) ({role})</title>
+<link rel="alternate" type="text/html" href="https://www.sec.gov/Archives/edgar/data/{cik}/{accession.replace('-', '')}/{accession}-index.htm"/>
+<summary type="html"> &lt;b&gt;Filed:&lt;/b&gt; 2025-10-31 &lt;b&gt;AccNo:&lt;/b&gt; {accession} &lt;b&gt;Size:&lt;/b&gt; 10 MB</summary>
+<updated>2025-10-31T06:01:23-04:00</updated>
+<category scheme="https://www.sec.gov/" label="form type" term="{form}"/>
+<id>urn:tag:sec.gov,2008:accession-number={accession}</id>
+</entry>"""
+
+
+def feed(*entries):
+    return ('<?xml version="1.0" encoding="ISO-8859-1" ?>\n<feed xmlns="http://www.w3.org/2005/Atom">'
+            "<title>Latest Filings</title>" + "".join(entries) + "</feed>")
+
+
+R_FILE = """<html><body><table>
+  <tr><th>CONSOLIDATED BALANCE SHEETS - USD ($) $ in Millions</th><th>Sep. 27, 2025</th></tr>
+  <tr><td class="pl">Total assets</td><td class="nump">364,980</td></tr>
+</table></body></html>"""
+
+# Neueste zuerst, wie bei EDGAR; Apple zweimal (Filer + Subject), ein 10-Q, ein Filer außerhalb der Watchlist
+FEED = [feed(
+    entry("10-K/A", "MICROSOFT CORP", 789019, "0000789019-25-000090"),
+    entry("10-Q", "APPLE INC", 320193, "0000320193-25-000070"),
+    entry("10-K", "OTHER CORP", 1234567, "0001234567-25-000001"),
+    entry("10-K", "APPLE INC", 320193, "0000320193-25-000079"),
+    entry("10-K", "APPLE INC", 320193, "0000320193-25-000079", role="Subject"),
+)]
+
+parsed = parse_feed(FEED[0])
+assert parsed[0] == {"form": "10-K/A", "company": "MICROSOFT CORP", "cik": 789019, "date_filed": "2025-10-31",
+                     "path": "edgar/data/789019/0000789019-25-000090.txt", "accession": "0000789019-25-000090"}
+assert len(parsed) == 5
+
+
+# Accessions, deren Download gerade fehlschlägt
+MISSING = set()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/cgi-bin/browse-edgar"):
+            body = FEED[0].encode("latin-1")
+        elif self.path.endswith(".txt") and not any(a in self.path for a in MISSING):
+            body = R_FILE.encode()
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = HTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base = f"http://127.0.0.1:{server.server_port}"
+edgar_index.ARCHIVES_URL = f"{base}/Archives/"
+feed_url = base + "/cgi-bin/browse-edgar?action=getcurrent&type={form}&start={start}&count={count}&output=atom"
+
+old_cwd = os.getcwd()
+with tempfile.TemporaryDirectory() as tmp:
+    os.chdir(tmp)
+    try:
+        catalog = EdgarCatalog("catalog.sqlite")
+        watcher = FilingWatcher(catalog, {320193: "AAPL", 789019: "MSFT"}, feed_url=feed_url)
+        pipeline = FilingPipeline(cache=StageCache(cache_dir="cache"), output_dir="out", offline=True,
+                                  peer_store_path=None, download_workers=1)
+
+        # 1. Erster Abruf: nur 10-K/10-K/A der Watchlist, ältestes zuerst, Duplikate entfernt
+        new = watcher.poll()
+        assert [(f["ticker"], f["form"]) for f in new] == [("AAPL", "10-K"), ("MSFT", "10-K/A")], new
+        summary = watcher.process(new, pipeline)
+        assert summary == {"done": 2, "failed": 0}, summary
+        assert Path("data/raw/sec-edgar-filings/AAPL/10-K/0000320193-25-000079/full-submission.txt").exists()
+        assert Path("out/filings/MSFT/0000789019-25-000090/MSFT_financial_metrics.csv").exists()
+        assert {w["accession"]: w["status"] for w in catalog.watched()} == {
+            "0000320193-25-000079": "done", "0000789019-25-000090": "done"}
+
+        # 2. Unveränderter Feed → nichts Neues; neues 10-K → nur dieses,
+        #    nach einem Absturz des Handlers beim nächsten Abruf erneut
+        assert watcher.poll() == []
+        FEED[0] = feed(entry("10-K", "MICROSOFT CORP", 789019, "0000789019-25-000100"))
+        handled = []
+
+        def flaky(filings):
+            handled.extend(filings)
+            if len(handled) == 1:
+                raise RuntimeError("Worker abgestürzt")
+            for f in filings:
+                catalog.mark_watched(f["accession"], "done")
+
+        assert watcher.run(flaky, interval=0, max_polls=3) == 2
+        assert [f["accession"] for f in handled] == ["0000789019-25-000100"] * 2
+        assert [f["ticker"] for f in handled] == ["MSFT", "MSFT"]
+        assert catalog.watched(status="done")[-1]["attempts"] == 2
+
+        # 3. Fehlgeschlagener Download wird wiederholt, bis er klappt
+        MISSING.add("0000789019-25-000110")
+        FEED[0] = feed(entry("10-K", "MICROSOFT CORP", 789019, "0000789019-25-000110"))
+        assert watcher.process(watcher.poll(), pipeline) == {"done": 0, "failed": 1}
+        assert catalog.watched(status="failed")[0]["error"]
+        MISSING.clear()
+        retried = watcher.poll()
+        assert [f["accession"] for f in retried] == ["0000789019-25-000110"]
+        assert watcher.process(retried, pipeline) == {"done": 1, "failed": 0}
+        assert watcher.poll() == []
+
+        # 4. Nie abgeschlossen (Prozess gestorben) → höchstens max_attempts Versuche, dann failed
+        FEED[0] = feed(entry("10-K", "MICROSOFT CORP", 789019, "0000789019-25-000120"))
+        handled = []
+        assert watcher.run(handled.extend, interval=0, max_polls=5) == 3
+        stuck = [w for w in catalog.watched() if w["accession"] == "0000789019-25-000120"][0]
+        assert (stuck["status"], stuck["attempts"]) == ("failed", 3), stuck
+
+        # 5. Alle Filer (ohne Watchlist) – bereits gesehene bleiben ausgeschlossen
+        FEED[0] = feed(entry("10-K", "OTHER CORP", 1234567, "0001234567-25-000001"),
+                       entry("10-K", "APPLE INC", 320193, "0000320193-25-000079"))
+        everyone = FilingWatcher(catalog, None, feed_url=feed_url).poll()
+        assert [f["ticker"] for f in everyone] == ["CIK0001234567"]
+        catalog.close()
+    finally:
+        os.chdir(old_cwd)
+        server.shutdown()
+
+print("✅ EDGAR-Watch OK")
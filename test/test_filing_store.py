@@ -0,0 +1,91 @@
+import os
+import tempfile
+from pathlib import Path
+
+from src.pipeline.filing_pipeline import find_filing_file
+from src.utils import filing_store
+from src.utils.stage_cache import StageCache
+from src.analyzers.xbrl_extractor import XBRLExtractor
+
+# Synthetische Submission: SGML-Header + iXBRL, wie full-submission.txt
+HEADER = """<SEC-DOCUMENT>0000320193-25-{n:06d}.txt : 20251031
+<SEC-HEADER>ACCESSION NUMBER: 0000320193-25-{n:06d}
+CONFORMED SUBMISSION TYPE: 10-K
+PUBLIC DOCUMENT COUNT: 98
+FILER: COMPANY DATA: COMPANY CONFORMED NAME: TEST CORP {n}
+STANDARD INDUSTRIAL CLASSIFICATION: ELECTRONIC COMPUTERS [3571]
+</SEC-HEADER>
+"""
+BODY = """<DOCUMENT>
+<TYPE>10-K
+<TEXT>
+<html xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"><body>
+<div style="display:none"><ix:header><ix:resources>
+  <xbrli:context id="c-1"><xbrli:period><xbrli:startDate>2024-09-29</xbrli:startDate><xbrli:endDate>2025-09-27</xbrli:endDate></xbrli:period></xbrli:context>
+</ix:resources></ix:header></div>
+<p>Total assets <ix:nonFraction name="us-gaap:Assets" contextRef="c-1" unitRef="usd" scale="6">{assets}</ix:nonFraction></p>
+""" + "<p>The Company’s business is subject to risks described in this report.</p>\n" * 2000 + """
+</body></html>
+</TEXT>
+</DOCUMENT>
+</SEC-DOCUMENT>"""
+
+
+def submission(n):
+    return HEADER.format(n=n) + BODY.format(assets=f"{300_000 + n:,}")
+
+
+old_cwd = os.getcwd()
+with tempfile.TemporaryDirectory() as tmp:
+    os.chdir(tmp)
+    try:
+        root = Path("data/raw/sec-edgar-filings/TEST/10-K")
+        plain = []
+        for n in range(10):
+            path = root / f"0000320193-25-{n:06d}" / "full-submission.txt"
+            path.parent.mkdir(parents=True)
+            path.write_text(submission(n), encoding="utf-8")
+            plain.append(path)
+        hashes = [StageCache.hash_file(p) for p in plain]
+        raw_size = sum(p.stat().st_size for p in plain)
+
+        # 1. Speicher komprimieren, mit Wörterbuch aus den Filings selbst
+        stats = filing_store.compress_store(root, train=True)
+        assert stats["files"] == 10 and stats["ratio"] > 20, stats
+        assert not filing_store.plain_filings(root)
+        dictionaries = list(filing_store.DICTIONARY_DIR.glob("*.dict"))
+        assert len(dictionaries) == 1
+
+        # 2. Leser sehen denselben Inhalt, Cache-Schlüssel bleiben gleich
+        compressed = find_filing_file(plain[3].parent)
+        assert compressed.name == "full-submission.txt.zst"
+        assert filing_store.read_filing(compressed) == submission(3)
+        with filing_store.open_filing(compressed) as f:  # Streaming, zeilenweise
+            assert f.readline().startswith("<SEC-DOCUMENT>0000320193-25-000003")
+        assert StageCache.hash_file(compressed) == hashes[3]
+        assert XBRLExtractor(compressed).get_clean_metrics()["total_assets"] == [300003.0]
+
+        # 3. Ohne passendes Wörterbuch schlägt das Lesen klar fehl
+        dictionaries[0].rename(dictionaries[0].with_suffix(".bak"))
+        try:
+            filing_store.read_filing(compressed)
+            raise AssertionError("fehlendes Wörterbuch nicht erkannt")
+        except FileNotFoundError:
+            pass
+        dictionaries[0].with_suffix(".bak").rename(dictionaries[0])
+
+        # 4. Direkt komprimiert schreiben (Download-Pfad) und Benchmark
+        target = root / "0000320193-25-000099" / "full-submission.txt"
+        target.parent.mkdir(parents=True)
+        written = filing_store.write_compressed(target, submission(99).encode("utf-8"),
+                                                dictionary=filing_store.default_dictionary())
+        assert not target.exists() and filing_store.read_filing(written) == submission(99)
+
+        report = filing_store.benchmark(sorted(root.glob("*/full-submission.txt.zst")), bandwidth_mb_s=100)
+        assert report["files"] == 11 and report["raw_bytes"] > report["stored_bytes"] * 20
+        assert report["disk_saved_bytes"] == report["raw_bytes"] - report["stored_bytes"]
+    finally:
+        os.chdir(old_cwd)
+
+print(f"✅ Filing-Store OK ({raw_size / 1e6:.1f} MB → Faktor {stats['ratio']}, "
+      f"Dekompression {report['throughput_mb_s']} MB/s)")
@@ -0,0 +1,57 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Budget für `import main` (kumulativ, laut python -X importtime)
+IMPORT_BUDGET_MS = 250
+HEAVY = ["numpy", "pandas", "bs4", "lxml", "torch", "transformers", "requests", "sec_edgar_downloader"]
+REPO = Path(__file__).resolve().parent.parent
+
+R_FILE = """<html><body><table>
+  <tr><th>CONSOLIDATED BALANCE SHEETS - USD ($) $ in Millions</th><th>Sep. 27, 2025</th><th>Sep. 28, 2024</th></tr>
+  <tr><td class="pl">Total assets</td><td class="nump">364,980</td><td class="nump">359,241</td></tr>
+  <tr><td class="pl">Net sales</td><td class="nump">416,161</td><td class="nump">391,035</td></tr>
+</table></body></html>"""
+
+
+def run(code, cwd=REPO, *flags):
+    env = dict(os.environ, PYTHONPATH=str(REPO))
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=str(cwd), env=env,
+                          capture_output=True, text=True, check=True)
+
+
+# 1. `import main` lädt keine schweren Abhängigkeiten
+loaded = run(f"import sys, main; print([m for m in {HEAVY!r} if m in sys.modules])").stdout.strip()
+assert loaded == "[]", f"main.py importiert beim Start: {loaded}"
+
+# 2. Import-Zeit-Budget (Median aus 3 Läufen gegen Ausreißer)
+timings = []
+for _ in range(3):
+    stderr = run("import main", REPO, "-X", "importtime").stderr
+    cumulative = [int(m.group(1)) for m in re.finditer(r'\|\s*(\d+)\s*\|\s*main$', stderr, re.M)]
+    timings.append(cumulative[-1] / 1000)
+median = sorted(timings)[1]
+assert median < IMPORT_BUDGET_MS, f"import main: {median:.0f} ms > Budget {IMPORT_BUDGET_MS} ms"
+
+# 3. Reiner Kennzahlen-Lauf (offline) schreibt die CSV ohne pandas/numpy
+with tempfile.TemporaryDirectory() as tmp:
+    filing = Path(tmp) / "data/raw/sec-edgar-filings/TEST/10-K/0000000000-25-000001/full-submission.txt"
+    filing.parent.mkdir(parents=True)
+    filing.write_text(R_FILE, encoding="utf-8")
+
+    code = (
+        "import sys, runpy\n"
+        f"sys.argv = ['main.py', 'TEST', '--offline']\n"
+        f"runpy.run_path({str(REPO / 'main.py')!r}, run_name='__main__')\n"
+        f"print('HEAVY', [m for m in {HEAVY!r} if m in sys.modules])\n"
+    )
+    output = run(code, tmp).stdout
+    assert "HEAVY ['lxml']" in output, output  # nur der Parser selbst
+    csv_text = (Path(tmp) / "data/processed/metrics/TEST_financial_metrics.csv").read_text()
+    assert csv_text.splitlines()[0] == "ticker,timestamp,metric_name,value_1,value_2,value_3"
+    assert "Total Assets,364980.0,359241.0," in csv_text
+
+print(f"✅ Import-Zeit OK (import main: {median:.0f} ms)")
@@ -0,0 +1,43 @@
+import json
+import tempfile
+from pathlib import Path
+
+from src.pipeline.inference_scheduler import (
+    InferenceScheduler, calibrate, candidate_configs, plan_affinity
+)
+from test.fake_inference import fake_factory
+
+# Bei "python -m" führen spawn-Kindprozesse das Hauptmodul erneut als __mp_main__ aus;
+# unter pytest wird es nur importiert und der Test läuft ebenfalls
+if __name__ != "__mp_main__":
+    # Topologie: 4 physische Kerne mit je 2 Hyperthreads
+    topology = [[0, 4], [1, 5], [2, 6], [3, 7]]
+    assert plan_affinity(2, 2, topology) == [[0, 1], [2, 3]]
+    assert plan_affinity(1, 4, topology) == [[0, 1, 2, 3]]
+    # Überbuchung nutzt erst die Geschwister-Threads
+    assert plan_affinity(2, 4, topology) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert candidate_configs(8) == [(8, 1), (4, 2), (2, 4), (1, 8)]
+
+    paragraphs = ["x" * (i % 50 + 1) for i in range(40)]
+    with InferenceScheduler(replicas=2, threads=1, batch_size=4, factory=fake_factory) as scheduler:
+        results = scheduler.score(paragraphs)
+        assert [r["paragraph_number"] for r in results] == list(range(1, 41))
+        assert [r["negative"] for r in results] == [len(p) / 100 for p in paragraphs]
+        assert {r["text_preview"].split(":")[1] for r in results} == {"1"}
+        assert len({r["text_preview"].split(":")[0] for r in results}) == 2, "beide Replikate genutzt"
+        # Zweiter Aufruf: Batch-IDs laufen weiter, Reihenfolge bleibt korrekt
+        again = scheduler.score(paragraphs[:5])
+        assert [(r["paragraph_number"], r["negative"]) for r in again] == \
+               [(r["paragraph_number"], r["negative"]) for r in results[:5]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "calibration.json"
+        report = calibrate(paragraphs, [(1, 1), (2, 1)], batch_size=4, factory=fake_factory,
+                           rounds=1, output=output)
+        assert json.loads(output.read_text())["best"] == report["best"]
+        assert len(report["results"]) == 2
+        scheduler = InferenceScheduler.from_calibration(output, factory=fake_factory)
+        assert (scheduler.replicas, scheduler.threads) == (report["best"]["replicas"], 1)
+        scheduler.close()
+
+    print(f"✅ InferenceScheduler OK – beste Konfiguration: {report['best']}")
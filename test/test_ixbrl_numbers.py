@@ -0,0 +1,37 @@
+import time
+
+import numpy as np
+
+from src.analyzers.ixbrl_numbers import decode_facts, decode_number, parse_numbers, to_millions
+
+# Formate, Skala, Vorzeichen
+assert decode_number("416,161", "ixt:num-dot-decimal", "6") == 416_161_000_000
+assert decode_number("1.234.567,89", "ixt:num-comma-decimal") == 1_234_567.89
+assert decode_number("1,234", "ixt:numcommadecimal") == 1.234             # Legacy-Name
+assert decode_number("12.5", None, "-3") == 0.0125
+assert decode_number("2,000", "ixt:num-dot-decimal", "3", "-") == -2_000_000
+assert decode_number("(45)") == -45 and decode_number("-3.5") == -3.5      # klassisches XBRL
+assert decode_number("—", "ixt:fixed-zero") == 0.0
+assert decode_number("-", "ixt-sec:numzerodash") == 0.0
+assert decode_number("five", "ixt-sec:numwordsen") == 5.0
+assert decode_number("None", "ixt-sec:numwordsen") == 0.0
+assert decode_number("September 27", "ixt:date-monthname-day-en") is None  # unbekanntes Format
+assert decode_number("n/a") is None
+
+values = parse_numbers(["$ 0.89", "1,000", ""], np.array([False, True, False]))
+assert values[0] == 0.89 and values[1] == 1.0 and np.isnan(values[2])
+
+# Monetäre Werte in Millionen, Stückzahlen/Verhältnisse unverändert
+assert list(to_millions(np.array([5e9, 5e9]), np.array([True, False]))) == [5000.0, 5e9]
+
+# Vektorisiert: 50.000 Fakten in einem Durchlauf
+n = 50_000
+texts = [f"{i * 37:,}.{i % 100:02d}" for i in range(n)]
+start = time.perf_counter()
+decoded = decode_facts(texts, ["ixt:num-dot-decimal"] * n, ["6"] * n, [None] * n)
+elapsed = time.perf_counter() - start
+expected = np.array([float(t.replace(",", "")) * 1e6 for t in texts])
+assert np.array_equal(decoded, expected)
+assert elapsed < 1.0, elapsed
+
+print(f"✅ iXBRL-Zahlen OK ({n} Fakten in {elapsed * 1000:.0f} ms)")
@@ -0,0 +1,52 @@
+from src.analyzers.paragraph_dedup import ParagraphDeduplicator
+
+boilerplate = ("Any of these events could materially adversely affect the Company's business, "
+               "results of operations and financial condition, and the trading price of its stock "
+               "could decline as investors react to the reduced outlook for future periods. The Company may "
+               "not be able to mitigate these effects through pricing, cost reductions or changes to its "
+               "supply arrangements, and the timing and extent of any recovery cannot be predicted with "
+               "certainty given the competitive, regulatory and macroeconomic environment in which the "
+               "Company operates across its global markets and product categories.")
+
+aapl = [
+    "Supply chain disruptions in Asia could delay product launches and increase component costs for the Company.",
+    boilerplate,
+    boilerplate.replace("Company's", "Company’s"),  # nur typografischer Unterschied
+]
+msft = [
+    boilerplate.replace("its stock", "its equity"),
+    "Cloud outages and cyber attacks on datacenter infrastructure could harm customer trust and revenue.",
+]
+
+sent_to_model = []
+
+def fake_finbert(paragraphs):
+    sent_to_model.extend(paragraphs)
+    return [{"positive": 0.1, "negative": 0.6 + 0.1 * i, "neutral": 0.3 - 0.1 * i, "sentiment": "negative"}
+            for i, _ in enumerate(paragraphs)]
+
+dedup = ParagraphDeduplicator()
+unique, mapping = ParagraphDeduplicator().collapse(aapl)
+assert len(unique) == 2 and mapping == [0, 1, 1]
+
+results_aapl = dedup.analyze(aapl, fake_finbert)
+assert len(results_aapl) == 3
+assert results_aapl[1]["negative"] == results_aapl[2]["negative"]
+assert [r["paragraph_number"] for r in results_aapl] == [1, 2, 3]
+
+# Zweiter Ticker: Boilerplate ist schon bewertet → nur der neue Absatz geht an das Modell
+results_msft = dedup.analyze(msft, fake_finbert)
+assert len(sent_to_model) == 3
+assert results_msft[0]["negative"] == results_aapl[1]["negative"]
+assert dedup.calls_saved == 2
+
+# Begrenzter Speicher: älteste Gruppe fällt heraus und wird beim nächsten Mal neu bewertet
+small = ParagraphDeduplicator(max_groups=2)
+small.analyze(aapl, fake_finbert)
+small.analyze(msft[1:], fake_finbert)
+assert len(small._scores) == 2 and sum(len(b) for b in small._buckets.values()) == 2 * small.num_blocks
+sent_to_model.clear()
+small.analyze(aapl[:1], fake_finbert)
+assert sent_to_model == aapl[:1]
+
+print(f"✅ ParagraphDeduplicator OK – {dedup.calls_saved} FinBERT-Aufrufe gespart")
@@ -0,0 +1,49 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.analyzers.peer_scoring import PeerRiskStore
+
+WEIGHTS = {"positive": -50, "negative": 100, "neutral": 10}  # wie SentimentAnalyzer.SCORE_WEIGHTS
+
+
+def results(negatives):
+    return [{"positive": 0.05, "negative": n, "neutral": 0.95 - n} for n in negatives]
+
+
+store = PeerRiskStore()
+store.add_filing("AAPL", results([0.8, 0.6]), {"by_category": {"legal": 3, "market": 1}}, sector="Tech")
+store.add_filing("MSFT", results([0.4]), {"by_category": {"cybersecurity": 2}}, sector="Tech")
+store.add_filing("GOOGL", results([0.5, 0.5, 0.2]), sector="Tech")
+store.add_filing("JPM", results([0.7]), {"by_category": {"financial": 4}}, sector="Banks")
+store.add_filing("MSFT", results([0.3]), {"by_category": {"cybersecurity": 2}}, sector="Tech")  # ersetzt
+assert len(store) == 4
+idx = {t: i for i, t in enumerate(store.tickers)}
+
+scores = store.score(weights=WEIGHTS)
+
+# Absolutscore entspricht SentimentAnalyzer.get_overall_risk_score
+expected_aapl = np.clip(np.mean([0.8, 0.6]) * 100 + 0.05 * -50 + np.mean([0.15, 0.35]) * 10, 0, 100)
+assert abs(scores["absolute_score"][0] - expected_aapl) < 1e-4
+assert np.allclose(scores["weighted_score"], scores["absolute_score"])
+
+# Peer-Statistik nur innerhalb des Sektors
+assert scores["peer_zscore"][idx["JPM"]] == 0.0 and scores["peer_percentile"][idx["JPM"]] == 50.0
+tech = scores["peer_zscore"][[idx["AAPL"], idx["GOOGL"], idx["MSFT"]]]
+assert abs(tech.mean()) < 1e-9 and tech.argmax() == 0
+assert scores["peer_percentile"][idx["MSFT"]] < scores["peer_percentile"][idx["AAPL"]]
+
+# Neue Kategorie-Gewichtung ohne erneute Inferenz
+reweighted = store.score(weights=WEIGHTS, category_weights={"cybersecurity": 2.0})
+assert reweighted["weighted_score"][idx["MSFT"]] > scores["weighted_score"][idx["MSFT"]]
+assert reweighted["weighted_score"][idx["AAPL"]] == scores["weighted_score"][idx["AAPL"]]
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = store.save(Path(tmp) / "peer_store.npz")
+    loaded = PeerRiskStore.load(path)
+    assert loaded.tickers == store.tickers
+    assert np.allclose(loaded.score(weights=WEIGHTS)["weighted_score"], scores["weighted_score"])
+
+ranking = store.ranking(weights=WEIGHTS)
+print(f"✅ PeerRiskStore OK – riskantester Filer: {ranking[0]['ticker']} ({ranking[0]['weighted_score']})")
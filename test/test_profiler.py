@@ -0,0 +1,106 @@
+import pstats
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from src.analyzers.keyword_scanner import KeywordScanner
+from src.utils.profiler import StageProfiler, compare_profiles, load_profile
+from src.utils.stage_cache import StageCache
+
+TEXT = ("Our supply chain depends on a limited number of suppliers. A cybersecurity breach, litigation "
+        "or inflation could adversely affect our results. ") * 20
+
+
+def allocate(n):
+    return [str(i) * 10 for i in range(n)]
+
+
+def scan(paragraphs):
+    scanner = KeywordScanner()
+    return sum(len(scanner.scan_text(p)) for p in paragraphs)
+
+
+class FakeClock:
+    """Ersetzt time im Profiler: Zeit vergeht nur per advance(), unabhängig von der Rechnerlast."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+
+    def profiled_run(paragraphs, name):
+        profiler = StageProfiler(top=50)
+        profiler.start()
+        cache = StageCache(cache_dir=str(tmp / "cache"), enabled=False, profiler=profiler)
+        clock = FakeClock()
+        with mock.patch("src.utils.profiler.time", clock):
+            cache.run("keywords", "1", {}, lambda: clock.advance(0.001 * paragraphs) or scan([TEXT] * paragraphs))
+            with cache.profile("report"):
+                data = allocate(50_000)
+                clock.advance(0.1)
+                # Verschachtelte Stufe: eigene Zeit, pausiert "report"
+                with cache.profile("render"):
+                    "\n".join(data)
+                    data.extend(allocate(50_000))
+                    clock.advance(0.2)
+        profiler.stop()
+        return profiler, profiler.save(tmp / f"AAA_profile_{name}")
+
+    profiler, paths = profiled_run(20, "a")
+    summary = load_profile(paths["summary"])
+    assert set(summary["stages"]) == {"keywords", "report", "render"}
+
+    # Funktionsprofil: scan_text wird der Keyword-Stufe zugeordnet, nicht dem Bericht
+    keywords = summary["stages"]["keywords"]
+    scan_rows = [r for r in keywords["functions"] if r["function"].endswith("(scan_text)")]
+    assert scan_rows and scan_rows[0]["calls"] == 20
+    assert not any(r["function"].endswith("(scan_text)") for r in summary["stages"]["report"]["functions"])
+    # allocate() läuft je einmal in "report" und in der inneren Stufe "render"
+    for stage in ("report", "render"):
+        assert [r["calls"] for r in summary["stages"][stage]["functions"] if r["function"].endswith("(allocate)")] == [1]
+
+    # Allokationen: die Listen-Zeile in allocate() ist der größte Posten der Berichtsstufe
+    report = summary["stages"]["report"]
+    top_site = report["allocations"][0]["site"]
+    assert top_site.endswith("test_profiler.py:17"), top_site
+    assert report["peak_bytes"] >= report["allocations"][0]["bytes"] > 2_000_000
+    # Zeit und Allokationen der inneren Stufe zählen nur dort, ihre Spitze auch für die äußere
+    render = summary["stages"]["render"]
+    assert (render["seconds"], report["seconds"]) == (0.2, 0.1), (render["seconds"], report["seconds"])
+    assert render["allocations"][0]["site"] == top_site
+    assert report["allocations"][0]["bytes"] < 1.5 * render["allocations"][0]["bytes"]
+    assert report["peak_bytes"] >= summary["stages"]["render"]["peak_bytes"]
+
+    # pstats-Artefakt enthält alle Stufen
+    stats = pstats.Stats(str(paths["pstats"]))
+    names = {func[2] for func in stats.stats}
+    assert {"scan_text", "allocate"} <= names
+
+    # Zwei Läufe vergleichen: mehr Absätze → Keyword-Stufe wird langsamer
+    _, paths_b = profiled_run(80, "b")
+    diff = compare_profiles(summary, load_profile(paths_b["summary"]), top=50)
+    assert diff["keywords"]["seconds"] == (0.02, 0.08, 0.06)
+    assert any(r["function"].endswith("(scan_text)") for r in diff["keywords"]["functions"])
+    functions_b = load_profile(paths_b["summary"])["stages"]["keywords"]["functions"]
+    assert [r["calls"] for r in functions_b if r["function"].endswith("(scan_text)")] == [80]
+
+    # Ohne Profiler bleibt StageCache unverändert
+    assert StageCache(cache_dir=str(tmp / "cache2")).run("x", "1", {}, lambda: 1)[0] == 1
+
+    # CLI: show und compare
+    for args in (["show", str(paths["summary"])], ["compare", str(paths["summary"]), str(paths_b["summary"])]):
+        out = subprocess.run([sys.executable, "main.py", "profile", *args, "--top", "50"],
+                             capture_output=True, text=True, check=True).stdout
+        assert "keywords" in out and "scan_text" in out
+
+print("✅ Stufen-Profiler OK")
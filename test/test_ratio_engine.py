@@ -0,0 +1,106 @@
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.analyzers.ratio_engine import RATIOS, RatioEngine
+from src.utils.metrics_store import MetricsStore
+
+
+def fact(ticker, metric, year, value, period_end=None):
+    return {"ticker": ticker, "cik": "1", "metric_name": metric, "fiscal_year": year,
+            "period_end": period_end or f"{year}-12-31", "value": value, "tag": "t", "form": "10-K",
+            "accession": "a", "filed": f"{year + 1}-02-01", "source": "test"}
+
+
+def company(ticker, year, sales, gross, operating, income, assets, liabilities, equity):
+    return [fact(ticker, "net_sales", year, sales), fact(ticker, "gross_profit", year, gross),
+            fact(ticker, "operating_income", year, operating), fact(ticker, "net_income", year, income),
+            fact(ticker, "total_assets", year, assets), fact(ticker, "total_liabilities", year, liabilities),
+            fact(ticker, "shareholders_equity", year, equity)]
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    store = MetricsStore(tmp / "metrics.csv")
+    engine = RatioEngine(tmp / "ratios.csv")
+
+    records = (company("AAA", 2022, 100, 40, 20, 10, 200, 120, 80)
+               + company("AAA", 2023, 120, 54, 30, 12, 240, 140, 100)
+               # BBB: Eigenkapital 0 → kein Debt/Equity; kein Bruttogewinn
+               + [r for r in company("BBB", 2023, 50, 0, 5, -2, 100, 100, 0) if r["metric_name"] != "gross_profit"])
+    store.upsert(records)
+    assert engine.rebuild(store.load()) > 0
+
+    table = engine.table()
+    aaa = table.loc[("AAA", 2023)]
+    assert np.isclose(aaa["gross_margin"], 0.45)
+    assert np.isclose(aaa["operating_margin"], 0.25)
+    assert np.isclose(aaa["debt_to_equity"], 1.4)
+    assert np.isclose(aaa["return_on_assets"], 0.05)
+    assert np.isclose(aaa["revenue_growth"], 0.2)
+    assert np.isclose(aaa["net_income_growth"], 0.2)
+    # Erstes Jahr: kein Wachstum
+    assert np.isnan(table.loc[("AAA", 2022)]["revenue_growth"])
+    bbb = table.loc[("BBB", 2023)]
+    assert np.isnan(bbb["debt_to_equity"]) and np.isnan(bbb["gross_margin"])
+    assert np.isclose(bbb["net_margin"], -0.04)
+
+    # Inkrementell: neues AAA-Geschäftsjahr 2024 → nur AAA 2024 (und 2025) neu, BBB unverändert
+    before = engine.load()
+    new = company("AAA", 2024, 150, 60, 30, 15, 300, 150, 150)
+    store.upsert(new)
+    stats = engine.update(store.load(), new)
+    after = engine.load()
+    assert stats["recomputed"] == len(after[(after["ticker"] == "AAA") & (after["fiscal_year"] == 2024)])
+    assert np.isclose(engine.table(["aaa"]).loc[("AAA", 2024)]["revenue_growth"], 0.25)
+    untouched = after[~((after["ticker"] == "AAA") & (after["fiscal_year"] == 2024))]
+    assert untouched.sort_values(RatioEngine.KEY).reset_index(drop=True)[["ticker", "fiscal_year", "ratio_name", "value"]] \
+        .equals(before.sort_values(RatioEngine.KEY).reset_index(drop=True)[["ticker", "fiscal_year", "ratio_name", "value"]])
+
+    # Korrektur eines Vorjahres (10-K/A) ändert auch das Wachstum des Folgejahres
+    restated = [fact("AAA", "net_sales", 2023, 100)]
+    store.upsert(restated)
+    engine.update(store.load(), restated)
+    table = engine.table(["AAA"])
+    assert np.isclose(table.loc[("AAA", 2023)]["revenue_growth"], 0.0)
+    assert np.isclose(table.loc[("AAA", 2024)]["revenue_growth"], 0.5)
+
+    # Geänderte Definition → kompletter Neuaufbau statt veralteter Werte
+    changed = RatioEngine(tmp / "ratios.csv", ratios={"asset_turnover": {"numerator": "net_sales",
+                                                                          "denominator": "total_assets"}})
+    changed.update(store.load(), [])
+    assert set(changed.load()["ratio_name"]) == {"asset_turnover"}
+
+    # Neue Kennzahl → auch Zellen ohne neue Fakten bekommen sie
+    added = RatioEngine(tmp / "ratios.csv", ratios={**changed.ratios, "net_margin": RATIOS["net_margin"]})
+    added.update(store.load(), [])
+    assert len(added.table().dropna(subset=["net_margin"])) == 4
+
+    # Fehlender Ratio-Store bei gefülltem Metrik-Store → alle Zellen, nicht nur die neuen
+    fresh = RatioEngine(tmp / "fresh.csv")
+    new = company("AAA", 2025, 160, 64, 32, 16, 320, 160, 160)
+    store.upsert(new)
+    stats = fresh.update(store.load(), new)
+    assert stats["recomputed"] == stats["total"] == len(fresh.compute(store.load()))
+    assert ("BBB", 2023) in fresh.table().index
+
+    try:
+        RatioEngine(tmp / "x.csv", ratios={"broken": {"numerator": "net_sales"}})
+        raise AssertionError("unvollständige Definition muss abgelehnt werden")
+    except ValueError:
+        pass
+
+    # Vektorisiert: 2.000 Ticker × 10 Jahre in einem Durchlauf
+    big = [r for t in range(2000) for y in range(2015, 2025)
+           for r in company(f"T{t}", y, 100 + y, 40, 20, 10, 200, 120, 80)]
+    import pandas as pd
+    frame = pd.DataFrame(big, columns=MetricsStore.COLUMNS)
+    start = time.perf_counter()
+    result = RatioEngine(tmp / "big.csv").compute(frame)
+    elapsed = time.perf_counter() - start
+    assert len(result) == 2000 * 10 * 8 - 2000 * 2
+    print(f"  {len(result)} Ratios aus {len(frame)} Fakten in {elapsed * 1000:.0f} ms")
+
+print("✅ Ratio-Engine OK")
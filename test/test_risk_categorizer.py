@@ -0,0 +1,86 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.analyzers.keyword_scanner import KeywordScanner
+from src.analyzers.risk_categorizer import EmbeddingCategorizer, apply_categories, refine_from_paragraphs
+from src.analyzers.risk_reporter import RiskReporter
+
+# Synthetische "Embeddings": jede Kategorie hat eine eigene Richtung im Raum
+CATEGORIES = KeywordScanner().keyword_categories
+rng = np.random.default_rng(0)
+DIRECTIONS = {cat: rng.normal(size=32) for cat in CATEGORIES}
+
+
+def fake_embed(texts):
+    rows = []
+    for text in texts:
+        cat = next((c for c, kws in CATEGORIES.items() if text in kws), "market")
+        rows.append(DIRECTIONS[cat] + rng.normal(scale=0.3, size=32))
+    return np.array(rows)
+
+
+categorizer = EmbeddingCategorizer()
+assert not categorizer.fitted
+categorizer.fit_seeds(fake_embed, model="fake-bert")
+assert categorizer.fitted and categorizer.centroids().shape == (len(CATEGORIES), 32)
+
+# Absatz ohne Keyword, aber "semantisch" Cybersecurity
+paragraphs = [
+    "Threat actors could encrypt our systems and ask for payment.",
+    "We face litigation in several jurisdictions.",
+    "Our results depend on the weather.",
+]
+results = [
+    {"paragraph_number": i + 1, "text_preview": p[:100], "positive": 0.1, "negative": 0.8,
+     "neutral": 0.1, "sentiment": "negative", "embedding": emb}
+    for i, (p, emb) in enumerate(zip(paragraphs, [
+        DIRECTIONS["cybersecurity"] + rng.normal(scale=0.3, size=32),
+        DIRECTIONS["legal"] + rng.normal(scale=0.3, size=32),
+        np.zeros(32),
+    ]))
+]
+embeddings = [r["embedding"] for r in results]
+version = categorizer.version()
+counts = apply_categories(results, categorizer)
+
+assert results[0]["semantic_category"] == "cybersecurity"
+assert results[1]["semantic_category"] == "legal"
+assert all("embedding" not in r for r in results)
+assert counts["cybersecurity"] == 1 and counts["legal"] == 1
+# Analyse liest die Zentroiden nur: gleiche Version, wiederholter Lauf gleiches Ergebnis
+assert categorizer.version() == version
+again = [{**r, "embedding": e} for r, e in zip(results, embeddings)]
+apply_categories(again, categorizer)
+assert [r["category_similarity"] for r in again] == [r["category_similarity"] for r in results]
+
+# Verfeinern ist ein eigener Schritt: nur eindeutig per Keyword gelabelte Absätze, neue Version
+counts_before = categorizer._counts.copy()
+used = refine_from_paragraphs(categorizer, paragraphs, fake_embed, KeywordScanner())
+assert used == 1 and (categorizer._counts - counts_before).sum() == 1
+assert categorizer._counts[categorizer.categories.index("legal")] == counts_before[categorizer.categories.index("legal")] + 1
+assert categorizer.version() != version
+assert categorizer.fingerprint() == KeywordScanner().fingerprint()
+
+# Schwelle: unähnliche Absätze bleiben unkategorisiert
+strict = EmbeddingCategorizer(min_similarity=0.5)
+strict.fit_seeds(fake_embed)
+assert strict.categorize(np.zeros((1, 32)))[0]["semantic_category"] is None
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = categorizer.save(Path(tmp) / "centroids.npz")
+    loaded = EmbeddingCategorizer.load(path, model="fake-bert")
+    assert np.allclose(loaded.centroids(), categorizer.centroids())
+    assert loaded.version() == categorizer.version()
+    # Anderes Modell oder andere Keywords → Zentroiden werden verworfen
+    assert not EmbeddingCategorizer.load(path, model="other-bert").fitted
+    assert not EmbeddingCategorizer.load(path, categories={"legal": ["lawsuit"]}).fitted
+
+# Bericht enthält die semantischen Kategorien
+reporter = RiskReporter()
+result = reporter.build_result("TEST", results, KeywordScanner().scan_risks(paragraphs), 60.0)
+assert result["semantic_categories"] == counts
+assert "Semantische Kategorien" in reporter.render_report(result)
+
+print(f"✅ EmbeddingCategorizer OK – {counts}")
@@ -0,0 +1,43 @@
+from src.analyzers.risk_differ import RiskDiffer
+
+# Vorjahr vs. aktuelles Jahr – synthetische Risikoabsätze
+old = [
+    "The Company depends on component and product manufacturing and logistical services provided by outsourcing partners, many of which are located outside of the U.S.",
+    "The Company is exposed to credit risk and fluctuations in the values of its investment portfolio, which could adversely affect its financial condition.",
+    "The price of the Company's stock is subject to volatility and may decline significantly in response to market conditions and analyst expectations.",
+]
+new = [
+    "The Company depends on component and product manufacturing and logistical services provided by outsourcing partners, many of which are located outside of the U.S.",
+    "The Company is exposed to credit risk and fluctuations in the values of its investment portfolio and counterparty exposures, which could materially and adversely affect its financial condition and operating results.",
+    "New regulations on artificial intelligence could require the Company to change its products, increase compliance costs and expose it to litigation.",
+]
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.seen = []
+
+    def analyze_risks(self, paragraphs):
+        self.seen.extend(paragraphs)
+        return [{"positive": 0.1, "negative": 0.7, "neutral": 0.2, "sentiment": "negative"} for _ in paragraphs]
+
+
+differ = RiskDiffer()
+diff = differ.diff(old, new)
+
+assert [e["new_index"] for e in diff["unchanged"]] == [0]
+assert [e["new_index"] for e in diff["modified"]] == [1]
+assert diff["modified"][0]["old_index"] == 1
+assert [e["new_index"] for e in diff["added"]] == [2]
+assert [e["old_index"] for e in diff["removed"]] == [2]
+assert differ.changed_indices(diff) == [1, 2]
+
+# Nur geänderte/neue Absätze gehen an FinBERT
+previous_results = [{"positive": 0.3, "negative": 0.2, "neutral": 0.5, "sentiment": "neutral"}] * 3
+analyzer = FakeAnalyzer()
+results = differ.score_changes(diff, new, analyzer, previous_results)
+assert analyzer.seen == [new[1], new[2]]
+assert results[0]["negative"] == 0.2 and results[2]["negative"] == 0.7
+assert [r["paragraph_number"] for r in results] == [1, 2, 3]
+
+print(f"✅ RiskDiffer OK: {differ.summarize(diff, old, new)['counts']}")
@@ -0,0 +1,45 @@
+import tempfile
+from src.analyzers.risk_reporter import RiskReporter
+
+# Synthetische Ergebnisse – kein Filing und kein FinBERT nötig
+sentiment_results = [
+    {"paragraph_number": 1, "text_preview": "Supply chain disruptions...", "positive": 0.05, "negative": 0.80, "neutral": 0.15, "sentiment": "negative"},
+    {"paragraph_number": 2, "text_preview": "Competition is intense...", "positive": 0.10, "negative": 0.40, "neutral": 0.50, "sentiment": "neutral"},
+]
+keyword_results = {
+    "total_keywords": 3,
+    "by_category": {"operational": 2, "market": 1},
+    "top_keywords": [("supply chain", 1), ("disruption", 1), ("competition", 1)],
+    "keyword_details": {"operational": ["supply chain", "disruption"], "market": ["competition"]},
+}
+
+reporter = RiskReporter()
+result = reporter.build_result(
+    ticker="aapl",
+    sentiment_results=sentiment_results,
+    keyword_results=keyword_results,
+    overall_risk_score=62.5,
+    section_offsets=[{"paragraph_number": 1, "start": 0, "end": 420}],
+    metrics={"net_sales": [416161.0, 391035.0]},
+    metadata={"model": "ProsusAI/finbert"},
+)
+
+assert result["ticker"] == "AAPL"
+assert result["risk_level"] == "HIGH"
+assert result["paragraphs"][0]["end"] == 420
+assert result["paragraphs"][1]["start"] is None
+
+# Text-Report wird aus dem Dokument gerendert
+report = reporter.render_report(result)
+assert "RISK ANALYSIS REPORT: AAPL" in report
+assert "Operational: 2 Erwähnungen" in report
+
+# JSONL: mehrere Läufe werden angehängt
+with tempfile.TemporaryDirectory() as tmp:
+    reporter.save_result(result, output_dir=tmp)
+    path = reporter.save_result(result, output_dir=tmp)
+    loaded = reporter.load_results(path, ticker="AAPL")
+    assert len(loaded) == 2
+    assert reporter.render_report(loaded[0]) == report
+
+print("✅ RiskReporter result document OK")
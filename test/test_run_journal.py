@@ -0,0 +1,55 @@
+import tempfile
+from pathlib import Path
+from src.pipeline.filing_pipeline import FilingPipeline
+from src.pipeline.run_journal import RunJournal
+from src.utils.stage_cache import StageCache
+
+R_FILE = """<html><body><table>
+  <tr><th>CONSOLIDATED BALANCE SHEETS - USD ($) $ in Millions</th><th>Sep. 27, 2025</th><th>Sep. 28, 2024</th></tr>
+  <tr><td class="pl">Total assets</td><td class="nump">364,980</td><td class="nump">359,241</td></tr>
+</table></body></html>"""
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    journal = RunJournal(str(tmp / "journal.sqlite"))
+
+    # Abgebrochener Lauf: "running"-Items werden beim Fortsetzen erneut vergeben
+    run_id = journal.start_run([{"key": "A", "ticker": "A"}, {"key": "B", "ticker": "B"}], {"argv": ["A", "B"]})
+    assert [i["key"] for i in journal.claim(run_id, max_attempts=3)] == ["A", "B"]
+    journal.item_done(run_id, "A", {"csv": "a.csv"})
+    assert [i["key"] for i in journal.claim(run_id, max_attempts=3)] == ["B"]  # Absturz während B
+    journal.item_failed(run_id, "B", "boom")
+    assert journal.claim(run_id, max_attempts=2) == []  # Versuche aufgebraucht
+    journal.finish_run(run_id)
+    assert journal.run_info(run_id)["status"] == "failed"
+    assert journal.summary(run_id) == {"done": 1, "failed": 1}
+
+    # Filing-Pipeline mit Journal: MSFT fehlt beim ersten Lauf
+    items = []
+    for ticker in ["AAPL", "MSFT", "NVDA"]:
+        path = tmp / "raw" / ticker / "full-submission.txt"
+        path.parent.mkdir(parents=True)
+        if ticker != "MSFT":
+            path.write_text(R_FILE, encoding="utf-8")
+        items.append({"key": ticker, "ticker": ticker, "filing_path": str(path)})
+
+    run_id = journal.start_run(items, {"argv": []})
+    pipeline = FilingPipeline(cache=StageCache(cache_dir=str(tmp / "cache")),
+                              output_dir=str(tmp / "out"), peer_store_path=None)
+    summary = pipeline.run_journaled(journal, run_id, max_attempts=1)
+    assert summary == {"done": 2, "failed": 1}
+    msft = journal.items(run_id, status="failed")[0]
+    assert msft["item_key"] == "MSFT" and "split" in msft["last_error"]
+    stages = {s["stage"]: s["status"] for s in journal.stages(run_id, "AAPL")}
+    assert stages["extract:metrics"] == "done" and stages["persist"] == "done"
+    assert journal.items(run_id, status="done")[0]["outputs"]["metrics_csv"].endswith("AAPL_financial_metrics.csv")
+
+    # Fortsetzen: nur MSFT wird verarbeitet
+    (tmp / "raw" / "MSFT" / "full-submission.txt").write_text(R_FILE, encoding="utf-8")
+    summary = pipeline.run_journaled(journal, run_id, max_attempts=2)
+    assert summary == {"done": 3}
+    assert pipeline.pipeline.stats["persist"]["processed"] == 1
+    assert journal.run_info(run_id)["status"] == "done"
+    journal.close()
+
+print("✅ Run-Journal OK")
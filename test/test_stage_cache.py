@@ -0,0 +1,43 @@
+import tempfile
+from pathlib import Path
+from src.utils.stage_cache import StageCache
+
+calls = []
+
+def extract():
+    calls.append("extract")
+    return {"paragraphs": ["Risk one.", "Risk two."]}
+
+def keywords(version):
+    calls.append(f"keywords-{version}")
+    return {"total_keywords": 2}
+
+with tempfile.TemporaryDirectory() as tmp:
+    filing = Path(tmp) / "full-submission.txt"
+    filing.write_text("<html>10-K</html>", encoding="utf-8")
+    cache = StageCache(cache_dir=str(Path(tmp) / "cache"))
+    filing_hash = StageCache.hash_file(filing)
+
+    # 1. Lauf: alles wird berechnet
+    _, par_hash = cache.run("risk_paragraphs", "1", {"filing": filing_hash}, extract)
+    cache.run("keywords", "kw-v1", {"paragraphs": par_hash}, lambda: keywords("v1"))
+    assert calls == ["extract", "keywords-v1"]
+
+    # 2. Lauf mit neuer Keyword-Liste: Extraktion ist ein Cache-Treffer
+    value, par_hash_2 = cache.run("risk_paragraphs", "1", {"filing": filing_hash}, extract)
+    cache.run("keywords", "kw-v2", {"paragraphs": par_hash_2}, lambda: keywords("v2"))
+    assert par_hash_2 == par_hash
+    assert value == {"paragraphs": ["Risk one.", "Risk two."]}
+    assert calls == ["extract", "keywords-v1", "keywords-v2"]
+
+    # Geändertes Filing → neue Extraktion
+    filing.write_text("<html>10-K/A</html>", encoding="utf-8")
+    cache.run("risk_paragraphs", "1", {"filing": StageCache.hash_file(filing)}, extract)
+    assert calls[-1] == "extract"
+
+    # Deaktivierter Cache berechnet immer neu
+    StageCache(cache_dir=str(Path(tmp) / "cache"), enabled=False).run(
+        "risk_paragraphs", "1", {"filing": filing_hash}, extract)
+    assert calls.count("extract") == 3
+
+print("✅ StageCache OK")
@@ -0,0 +1,103 @@
+import math
+import tempfile
+import threading
+import time
+from pathlib import Path
+from src.pipeline.streaming import Stage, StreamingPipeline
+from src.pipeline.filing_pipeline import FilingPipeline
+from src.utils.stage_cache import StageCache
+
+R_FILE = """<html><body><table>
+  <tr><th>CONSOLIDATED BALANCE SHEETS - USD ($) $ in Millions</th><th>Sep. 27, 2025</th><th>Sep. 28, 2024</th></tr>
+  <tr><td class="pl">Total assets</td><td class="nump">416,161</td><td class="nump">359,241</td></tr>
+</table></body></html>"""
+
+# 1. Backpressure: langsamer Verbraucher → Quelle läuft höchstens Queue-Kapazität voraus
+produced, consumed = [], []
+lock = threading.Lock()
+
+def source():
+    for i in range(40):
+        with lock:
+            produced.append(i)
+            in_flight = len(produced) - len(consumed)
+        # Quelle + 2 Inboxen à 2 + je 1 Item in Arbeit pro Stufe
+        assert in_flight <= 8, in_flight
+        yield i
+
+def slow(x):
+    time.sleep(0.005)
+    with lock:
+        consumed.append(x)
+    return x
+
+pipeline = StreamingPipeline([Stage("double", lambda x: x * 2), Stage("slow", slow)], queue_size=2)
+assert sorted(pipeline.run(source())) == [i * 2 for i in range(40)]
+assert pipeline.stats["slow"]["processed"] == 40
+
+# 2. Überlappung: zwei I/O-Stufen mit je 4 Workern statt sequentieller Wartezeit
+start = time.perf_counter()
+StreamingPipeline([
+    Stage("download", lambda x: time.sleep(0.02) or x, workers=4),
+    Stage("parse", lambda x: time.sleep(0.02) or x, workers=4),
+]).run(range(20))
+assert time.perf_counter() - start < 20 * 0.04 / 2
+
+# 3. Fan-out, Prozess-Pool, Batch-Stufe und Fehlerbehandlung
+batches = []
+
+def batch_fn(items):
+    batches.append(len(items))
+    return [i + 1 for i in items]
+
+def fragile(x):
+    if x == 7:
+        raise ValueError("kaputt")
+    return x
+
+pipeline = StreamingPipeline([
+    Stage("split", lambda x: [x, x], fan_out=True),
+    Stage("compute", math.factorial, workers=2, executor="process"),
+    Stage("score", batch_fn, executor="batch", batch_size=4, batch_wait=0.2),
+    Stage("check", fragile),
+])
+outputs = pipeline.run([1, 2, 3, 4])
+assert sorted(outputs) == [2, 2, 3, 3, 25, 25]  # 3! + 1 = 7 wird verworfen
+assert max(batches) <= 4 and sum(batches) == 8
+assert len(pipeline.errors) == 2 and pipeline.errors[0]["stage"] == "check"
+
+# Fehlerhafte Stufenergebnisse (kein Iterable) blockieren den Lauf nicht
+pipeline = StreamingPipeline([
+    Stage("explode", lambda x: 42 if x == 1 else [x], fan_out=True),
+    Stage("broken_batch", lambda batch: None if 3 in batch else batch, executor="batch", batch_size=1),
+])
+assert sorted(pipeline.run(range(5))) == [0, 2, 4]
+assert sorted((e["stage"], e["item"]) for e in pipeline.errors) == [("broken_batch", 3), ("explode", 1)]
+
+# 4. Filing-Pipeline (nur Kennzahlen, lokale Filings) – gleiche Cache-Schlüssel wie main.py
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    items = []
+    for ticker in ["AAPL", "MSFT", "NVDA"]:
+        filing = tmp / "raw" / ticker / "full-submission.txt"
+        filing.parent.mkdir(parents=True)
+        filing.write_text(R_FILE.replace("416,161", str(len(items) + 1)), encoding="utf-8")
+        items.append({"ticker": ticker, "filing_path": str(filing)})
+    # Zweites 10-K desselben Tickers (andere Accession) darf das erste nicht überschreiben
+    previous = tmp / "raw" / "AAPL-0000320193-24-000123" / "full-submission.txt"
+    previous.parent.mkdir(parents=True)
+    previous.write_text(R_FILE.replace("416,161", "99"), encoding="utf-8")
+    items.append({"key": "AAPL/previous", "ticker": "AAPL", "filing_path": str(previous)})
+    items.append({"ticker": "MISSING", "filing_path": str(tmp / "missing.txt")})
+
+    cache = StageCache(cache_dir=str(tmp / "cache"))
+    runner = FilingPipeline(cache=cache, output_dir=str(tmp / "out"), peer_store_path=None)
+    outputs = runner.run(items)
+    assert sorted(o["ticker"] for o in outputs) == ["AAPL", "AAPL", "MSFT", "NVDA"]
+    assert len(runner.pipeline.errors) == 1 and runner.pipeline.errors[0]["stage"] == "split"
+    assert (tmp / "out" / "filings" / "MSFT" / "MSFT" / "MSFT_financial_metrics.csv").exists()
+    aapl_csvs = sorted((tmp / "out" / "filings" / "AAPL").glob("*/AAPL_financial_metrics.csv"))
+    assert len(aapl_csvs) == 2 and aapl_csvs[0].read_text() != aapl_csvs[1].read_text()
+    assert len(list((tmp / "cache" / "metrics").glob("*.json"))) == 4
+
+print("✅ Streaming-Pipeline OK")
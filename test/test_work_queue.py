@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from src.pipeline.work_queue import DirectoryWorkQueue, SQLiteWorkQueue, open_queue
+
+with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+
+    for queue in [SQLiteWorkQueue(str(tmp / "q.sqlite")), DirectoryWorkQueue(str(tmp / "qdir"))]:
+        tasks = [{"id": t, "payload": {"ticker": t}} for t in ["AAPL", "MSFT", "NVDA"]]
+        assert queue.put(tasks, max_attempts=2) == 3
+        assert queue.put(tasks) == 0  # idempotent
+
+        # Lease + Abschluss
+        task = queue.lease("w1", lease_seconds=60)
+        assert task["attempts"] == 1 and task["payload"]["ticker"] in {"AAPL", "MSFT", "NVDA"}
+        assert queue.heartbeat(task["id"], "w1", 60)
+        assert not queue.heartbeat(task["id"], "w2", 60)
+        queue.complete(task["id"], "w1", {"csv": "x.csv"})
+        queue.complete(task["id"], "w1", {"csv": "other.csv"})  # zweites Complete ändert nichts
+        assert queue.results()[task["id"]]["result"] == {"csv": "x.csv"}
+
+        # Abgelaufener Lease → anderer Worker übernimmt, alter Worker verliert den Lease
+        lost = queue.lease("w1", lease_seconds=0.05)
+        time.sleep(0.1)
+        taken = queue.lease("w2", lease_seconds=60)
+        assert taken["id"] == lost["id"] and taken["attempts"] == 2
+        assert not queue.heartbeat(lost["id"], "w1", 60)
+        queue.complete(taken["id"], "w2")
+
+        # Fehler → erneuter Versuch, nach max_attempts endgültig failed
+        last = queue.lease("w1", 60)
+        queue.fail(last["id"], "w1", "boom")
+        again = queue.lease("w2", 60)
+        assert again["id"] == last["id"] and again["attempts"] == 2
+        queue.fail(again["id"], "w2", "boom")
+        assert queue.lease("w1", 60) is None
+        assert queue.stats() == {"done": 2, "failed": 1}
+
+    # Lease läuft immer wieder ab (Worker stürzt ab) → nach max_attempts failed statt Endlosschleife
+    for queue in [SQLiteWorkQueue(str(tmp / "crash.sqlite")), DirectoryWorkQueue(str(tmp / "crash"))]:
+        queue.put([{"id": "BRK.B", "payload": {}}], max_attempts=2)
+        leases = 0
+        while queue.lease("w1", lease_seconds=0.01) is not None:
+            leases += 1
+            assert leases <= 2
+            time.sleep(0.02)
+        assert leases == 2 and queue.stats() == {"failed": 1}
+
+    # Worker stirbt zwischen Claim und Lease-Eintrag → verwaiste .claim-Datei wird wieder eingereiht
+    queue = DirectoryWorkQueue(str(tmp / "claims"), claim_timeout=0)
+    queue.put([{"id": "BRK.B", "payload": {"n": 1}}])
+    pending = queue._path("pending", "BRK.B")
+    pending.rename(tmp / "claims" / "leased" / f"{pending.stem}.deadbeef.claim")
+    assert queue.stats() == {}
+    time.sleep(0.01)
+    task = queue.lease("w2", 60)
+    assert task["id"] == "BRK.B" and task["attempts"] == 1
+    assert not list((tmp / "claims" / "leased").glob("*.claim"))
+
+    assert isinstance(open_queue(f"dir:{tmp / 'x'}"), DirectoryWorkQueue)
+    assert isinstance(open_queue(str(tmp / "y.sqlite")), SQLiteWorkQueue)
+
+    # Mehrere Worker-Prozesse gegen die dateibasierte Queue
+    for url in [f"dir:{tmp / 'shared'}", f"sqlite:{tmp / 'shared.sqlite'}"]:
+        queue = open_queue(url)
+        queue.put([{"id": f"T{i:02d}", "payload": {"n": i}} for i in range(24)])
+        log = tmp / f"log-{url.split(':')[0]}.jsonl"
+        worker = (
+            "import json, os, time, sys\n"
+            "from src.pipeline.work_queue import open_queue, run_worker\n"
+            "def handle(payload):\n"
+            "    time.sleep(0.01)\n"
+            f"    with open({str(log)!r}, 'a') as f:\n"
+            "        f.write(json.dumps({'n': payload['n'], 'pid': os.getpid()}) + '\\n')\n"
+            "    return {'square': payload['n'] ** 2}\n"
+            f"run_worker(open_queue({url!r}), handle, lease_seconds=30, idle_exit=True)\n"
+        )
+        processes = [subprocess.Popen([sys.executable, "-c", worker], cwd=str(Path.cwd()),
+                                      stdout=subprocess.DEVNULL) for _ in range(4)]
+        assert all(p.wait(timeout=120) == 0 for p in processes)
+
+        handled = [json.loads(line) for line in log.read_text().splitlines()]
+        assert sorted(h["n"] for h in handled) == list(range(24))  # jede Task genau einmal
+        results = queue.results()
+        assert len(results) == 24 and results["T05"]["result"] == {"square": 25}
+        assert queue.stats() == {"done": 24}
+
+print("✅ Work-Queue OK")
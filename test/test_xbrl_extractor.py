@@ -0,0 +1,70 @@
+import tempfile
+from pathlib import Path
+from src.analyzers.xbrl_extractor import XBRLExtractor
+
+# SGML-Wrapper wie in full-submission.txt mit Inline-XBRL (iXBRL) im 10-K
+FULL_SUBMISSION = """<SEC-DOCUMENT>0000320193-25-000079.txt : 20251031
+<DOCUMENT>
+<TYPE>10-K
+<TEXT>
+<html xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">
+<body>
+<div style="display:none"><ix:header><ix:resources>
+  <xbrli:context id="c-1"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2024-09-29</xbrli:startDate><xbrli:endDate>2025-09-27</xbrli:endDate></xbrli:period></xbrli:context>
+  <xbrli:context id="c-2"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2025-06-29</xbrli:startDate><xbrli:endDate>2025-09-27</xbrli:endDate></xbrli:period></xbrli:context>
+  <xbrli:context id="c-3"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:instant>2025-09-27</xbrli:instant></xbrli:period></xbrli:context>
+  <xbrli:context id="c-4"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier>
+    <xbrli:segment><xbrldi:explicitMember dimension="us-gaap:StatementBusinessSegmentsAxis">aapl:AmericasSegmentMember</xbrldi:explicitMember></xbrli:segment></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2024-09-29</xbrli:startDate><xbrli:endDate>2025-09-27</xbrli:endDate></xbrli:period></xbrli:context>
+  <xbrli:context id="c-5"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier>
+    <xbrli:segment><xbrldi:explicitMember dimension="us-gaap:StatementBusinessSegmentsAxis">aapl:EuropeSegmentMember</xbrldi:explicitMember></xbrli:segment></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2024-09-29</xbrli:startDate><xbrli:endDate>2025-09-27</xbrli:endDate></xbrli:period></xbrli:context>
+  <xbrli:context id="c-6"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier>
+    <xbrli:segment><xbrldi:explicitMember dimension="us-gaap:StatementBusinessSegmentsAxis">aapl:AmericasSegmentMember</xbrldi:explicitMember>
+    <xbrldi:explicitMember dimension="srt:ProductOrServiceAxis">us-gaap:ProductMember</xbrldi:explicitMember></xbrli:segment></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2024-09-29</xbrli:startDate><xbrli:endDate>2025-09-27</xbrli:endDate></xbrli:period></xbrli:context>
+  <xbrli:context id="c-7"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2024-09-29</xbrli:startDate><xbrli:endDate>2025-09-27</xbrli:endDate></xbrli:period>
+    <xbrli:scenario><xbrldi:typedMember dimension="aapl:ReportingUnitAxis"><aapl:ReportingUnitDomain>Unit 7</aapl:ReportingUnitDomain></xbrldi:typedMember></xbrli:scenario></xbrli:context>
+</ix:resources></ix:header></div>
+<table>
+  <tr><td>Total net sales</td><td>$&nbsp;<ix:nonFraction name="us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax" contextRef="c-1" unitRef="usd" decimals="-6" scale="6" format="ixt:num-dot-decimal">416,161</ix:nonFraction></td></tr>
+  <tr><td>Q4 net sales</td><td><ix:nonFraction name="us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax" contextRef="c-2" unitRef="usd" decimals="-6" scale="6">102,466</ix:nonFraction></td></tr>
+  <tr><td>Total assets</td><td><ix:nonFraction name="us-gaap:Assets" contextRef="c-3" unitRef="usd" decimals="-6" scale="6">364,980</ix:nonFraction></td></tr>
+  <tr><td>Americas</td><td><ix:nonFraction name="us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax" contextRef="c-4" unitRef="usd" decimals="-6" scale="6">178,353</ix:nonFraction></td></tr>
+  <tr><td>Europe</td><td><ix:nonFraction name="us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax" contextRef="c-5" unitRef="usd" decimals="-6" scale="6">111,032</ix:nonFraction></td></tr>
+  <tr><td>Americas products</td><td><ix:nonFraction name="us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax" contextRef="c-6" unitRef="usd" decimals="-6" scale="6">120,000</ix:nonFraction></td></tr>
+  <tr><td>Unit 7</td><td><ix:nonFraction name="us-gaap:RevenueFromContractWithCustomerExcludingAssessedTax" contextRef="c-7" unitRef="usd" decimals="-6" scale="6">500,000</ix:nonFraction></td></tr>
+</table>
+</body></html>
+</TEXT>
+</DOCUMENT>
+</SEC-DOCUMENT>"""
+
+for backend in ["lxml", "bs4"]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "full-submission.txt"
+        path.write_text(FULL_SUBMISSION, encoding="utf-8")
+        extractor = XBRLExtractor(path, backend=backend)
+
+        assert extractor.contexts["c-1"]["days"] == 363
+        assert extractor.contexts["c-3"]["instant"] == "2025-09-27"
+
+        metrics = extractor.get_clean_metrics()
+        assert metrics["net_sales"] == [416161.0], metrics   # Quartalswert (c-2) gefiltert
+        assert metrics["total_assets"] == [364980.0], metrics
+
+        # Dimensionen: Segmentwerte mischen sich nicht in die konsolidierte Summe
+        assert extractor.contexts["c-4"]["dimensions"] == {"StatementBusinessSegmentsAxis": "AmericasSegmentMember"}
+        assert extractor.contexts["c-7"]["dimensions"] == {"ReportingUnitAxis": "Unit 7"}  # typisiert
+        segments = extractor.get_breakdown("net_sales", "us-gaap:StatementBusinessSegmentsAxis")
+        assert segments == {"AmericasSegmentMember": [178353.0], "EuropeSegmentMember": [111032.0]}, segments
+        assert extractor.breakdown(["us-gaap:Revenues"], "StatementBusinessSegmentsAxis") == {}
+        assert extractor.breakdown(XBRLExtractor.XBRL_TAGS["net_sales"], "ReportingUnitAxis") == {"Unit 7": [500000.0]}
+        americas = extractor.facts_for_member("StatementBusinessSegmentsAxis", "aapl:AmericasSegmentMember")
+        assert sorted(f["value"] for f in americas) == [120000.0, 178353.0]
+
+print("✅ XBRLExtractor OK (lxml + bs4)")